@@ -0,0 +1,137 @@
+"""
+Benchmark do tempo de inicialização do CLI
+Executa main.py com -X importtime em comandos que não usam o banco e
+verifica que o driver ODBC (pyodbc), o .env (dotenv) e o módulo database não
+são importados; comandos sobre um banco SQLite local (--sqlite) podem ler o
+.env, mas não o driver ODBC. Termina com código 1 se algum deles aparecer ou
+se algum comando falhar.
+
+Uso:
+    python benchmarks/inicializacao.py [--repeticoes 5] [--json resultado.json]
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+
+# Módulos que só podem ser carregados por comandos que acessam o banco
+PROIBIDOS = ('pyodbc', 'dotenv', 'database')
+
+# Módulos que não podem ser carregados pelos comandos sobre SQLite (--sqlite)
+PROIBIDOS_SQLITE = ('pyodbc',)
+
+DOCUMENTO = {
+    'versao': '09.91.47.20',
+    'modo': 'ciclo',
+    'novidades': [
+        {'sistema': 'iCRMWeb', 'resumo': 'Ajuste', 'detalhes': 'Detalhes do ajuste', 'numeroTarefa': 1}
+    ],
+}
+
+
+def run_importtime(argumentos):
+    """
+    Executa main.py com -X importtime
+
+    Returns:
+        tuple: (segundos de parede, {modulo: microssegundos acumulados},
+                microssegundos de import somando os módulos de primeiro nível, código de saída)
+    """
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(SRC_DIR / 'main.py'), *argumentos],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    parede = time.perf_counter() - inicio
+
+    # Linhas: "import time: self [us] | cumulative | imported package"
+    modulos = {}
+    total = 0
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, acumulado, nome = linha[len('import time:'):].split('|')
+        modulos[nome.strip()] = int(acumulado)
+
+        # Sem recuo: import de primeiro nível (o acumulado já inclui os aninhados)
+        if not nome[1:].startswith(' '):
+            total += int(acumulado)
+
+    return parede, modulos, total, processo.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark: inicialização do CLI sem banco')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Execuções por comando (padrão: 5)')
+    parser.add_argument('--json', type=str, help='Grava os resultados em JSON (acompanhamento)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        documento = Path(tmp) / 'output_bench.json'
+        documento.write_text(json.dumps(DOCUMENTO), encoding='utf-8')
+
+        banco = Path(tmp) / 'bench.db'
+
+        # Comando -> (argumentos, módulos proibidos)
+        cenarios = {
+            '--help': (['--help'], PROIBIDOS),
+            'summary': (['summary', str(documento)], PROIBIDOS),
+            'diff': (['diff', str(documento), str(documento)], PROIBIDOS),
+            'index --help': (['index', '--help'], PROIBIDOS),
+            'lookup --help': (['lookup', '--help'], PROIBIDOS),
+            'migrate --sqlite': (['migrate', '--sqlite', str(banco)], PROIBIDOS_SQLITE),
+        }
+
+        resultados = {}
+        violacoes = []
+        for nome, (argumentos, proibidos) in cenarios.items():
+            tempos = []
+            for _ in range(args.repeticoes):
+                parede, modulos, imports, codigo = run_importtime(argumentos)
+                tempos.append(parede)
+
+            carregados = [modulo for modulo in proibidos if modulo in modulos]
+            if carregados:
+                violacoes.append(f"'{nome}' importou {', '.join(carregados)}")
+            if codigo != 0:
+                violacoes.append(f"'{nome}' terminou com código {codigo}")
+
+            # Módulos do próprio projeto e tempo total de import (raiz de cada árvore)
+            projeto = sorted(arquivo.stem for arquivo in SRC_DIR.glob('*.py') if arquivo.stem in modulos)
+            resultados[nome] = {
+                'parede_ms': round(min(tempos) * 1000, 1),
+                'imports_ms': round(imports / 1000, 1),
+                'modulos': len(modulos),
+                'modulos_projeto': projeto,
+                'codigo_saida': codigo,
+                'proibidos': carregados,
+            }
+
+    print(f"\nInicialização do CLI, melhor de {args.repeticoes} execuções")
+    print(f"{'comando':<16} {'parede (ms)':>12} {'imports (ms)':>13} {'módulos':>8}")
+    for nome, resultado in resultados.items():
+        print(f"{nome:<16} {resultado['parede_ms']:>12.1f} {resultado['imports_ms']:>13.1f} "
+              f"{resultado['modulos']:>8}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'cenarios': resultados}, f, indent=2)
+            f.write('\n')
+
+    if violacoes:
+        for violacao in violacoes:
+            print(f"ERRO: {violacao}", file=sys.stderr)
+        return 1
+
+    print("\nNenhum comando local importou " + ', '.join(PROIBIDOS)
+          + "; nenhum comando sobre SQLite importou " + ', '.join(PROIBIDOS_SQLITE))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
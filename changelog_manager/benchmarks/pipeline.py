@@ -0,0 +1,332 @@
+"""
+Suíte de benchmark do pipeline sobre dados sintéticos
+Gera, com semente fixa, bancos SQLite com as tabelas TSK_Tarefa e
+TSK_TarefasDocumentadas (migrações de sql/migrations/sqlite) e mede cada
+etapa (consulta, consulta_2fases, generate_json, registro) e o fluxo completo do main.py:
+tempo de parede, pico de memória (RSS) e idas e voltas ao banco.
+
+Cada medição roda em um processo próprio, sobre uma cópia do banco gerado,
+para que o pico de RSS seja o da etapa e o registro não altere as demais.
+
+Uso:
+    python benchmarks/pipeline.py [--tarefas 100,1000,10000,100000] [--seed 42]
+                                  [--saida resultado.json] [--baseline baseline.json]
+"""
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from contextlib import redirect_stderr, nullcontext
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(SRC_DIR))
+
+CICLO = 124
+VERSAO = '09.91.47.20'
+
+ETAPAS = ('consulta', 'consulta_2fases', 'generate_json', 'registro', 'main')
+
+# Prefixos de TrfNome como aparecem no banco (com espaços e apelidos) e pesos relativos
+SISTEMAS = [
+    ('ICRMWEB ', 30), ('ICRM3 ', 20), ('ITASKWEB ', 10), ('ICRMIMPRESSOR ', 6), ('ICRMMOBILE ', 6),
+    ('WEBCONVENIO ', 5), ('WEBCLIENTE ', 5), ('WSICRMREST ', 4), ('APP ', 4), ('ITOTEM V2 ', 3),
+    ('SOLICITAÇÃO 4603 ', 3), ('SOLICITAÇÃO 4657 ', 2), ('TREINAMENTO 05 ', 1), ('PUBLICAÇÃO IOS BRASIL', 1),
+]
+
+PALAVRAS = (
+    'ajuste cadastro cliente convênio relatório impressão nota fiscal cálculo imposto tela '
+    'consulta filtro campo data valor pagamento boleto integração serviço autorização guia '
+    'exportação importação arquivo layout validação regra desconto parcela vencimento usuário '
+    'permissão perfil login senha sincronização aplicativo totem atendimento fila agenda'
+).split()
+
+# Fatias da massa: tarefas fora do ciclo, não concluídas e já documentadas
+OUTRO_CICLO = 0.10
+NAO_CONCLUIDAS = 0.05
+DOCUMENTADAS = 0.10
+
+
+class SyntheticData:
+    """Massa de tarefas determinística (mesma semente, mesmos dados)"""
+
+    def __init__(self, seed):
+        """
+        Prepara os textos a partir da semente
+
+        Os textos são sorteados uma vez (1.000 resumos e detalhes) e
+        combinados por tarefa, mantendo a geração de 1.000.000 de linhas rápida.
+
+        Args:
+            seed (int): Semente do gerador
+        """
+        self.rng = random.Random(seed)
+        self.sistemas = [nome for nome, peso in SISTEMAS for _ in range(peso)]
+
+        # Resumo: 15 a 90 caracteres; Detalhes: ~30% vazios, demais com mediana ~250 e até 2.000
+        self.resumos = [self._texto(self.rng.randint(15, 90)) for _ in range(1000)]
+        self.detalhes = [
+            None if self.rng.random() < 0.3 else self._texto(min(2000, int(self.rng.lognormvariate(5.5, 0.8))))
+            for _ in range(1000)
+        ]
+
+    def _texto(self, tamanho):
+        """Frase com aproximadamente tamanho caracteres"""
+        palavras = []
+        total = 0
+        while total < tamanho:
+            palavra = self.rng.choice(PALAVRAS)
+            palavras.append(palavra)
+            total += len(palavra) + 1
+        return ' '.join(palavras).capitalize()[:tamanho]
+
+    def tasks(self, quantidade):
+        """
+        Linhas de TSK_Tarefa no formato de LocalDatabase.insert_tasks
+
+        Yields:
+            tuple: (Tarefaid, TrfNome, TrfObservacao2, CicloId, TrfFim, trffeito)
+        """
+        rng = self.rng
+        for tarefa_id in range(1, quantidade + 1):
+            ciclo = CICLO - 1 if rng.random() < OUTRO_CICLO else CICLO
+            concluida = rng.random() >= NAO_CONCLUIDAS
+            yield (
+                tarefa_id,
+                f"{rng.choice(self.sistemas)}- {rng.choice(self.resumos)}",
+                rng.choice(self.detalhes),
+                ciclo,
+                '2024-01-01 00:00:00' if concluida and rng.random() < 0.5 else None,
+                1 if concluida else 0,
+            )
+
+    def documented(self, quantidade):
+        """Pares (numero_tarefa, arquivo_md) das tarefas já documentadas"""
+        return [
+            (str(tarefa_id), f"iCRMWeb/{VERSAO}.md")
+            for tarefa_id in range(1, quantidade + 1)
+            if self.rng.random() < DOCUMENTADAS
+        ]
+
+
+def create_database(path, quantidade, seed, verbose=False):
+    """
+    Cria o banco SQLite com a massa sintética (logs da migração só com verbose)
+
+    Returns:
+        float: Segundos gastos na geração
+    """
+    from local_database import LocalDatabase
+
+    inicio = time.perf_counter()
+    dados = SyntheticData(seed)
+    with nullcontext() if verbose else redirect_stderr(io.StringIO()), LocalDatabase(path) as db:
+        db.create_schema()
+        db.insert_tasks(dados.tasks(quantidade))
+        db.register_documented_tasks(dados.documented(quantidade), batch_size=5000)
+    return time.perf_counter() - inicio
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo (None se indisponível na plataforma)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_stage(etapa, banco, tmp):
+    """
+    Executa uma etapa no processo atual (chamado pelo modo --worker)
+
+    A preparação (ex: consulta antes do registro) fica fora da medição.
+
+    Returns:
+        dict: segundos, linhas, idas_e_voltas, commits, rss_mb
+    """
+    from local_database import LocalDatabase
+    from query_executor import QueryExecutor
+    from normalizer import RecordNormalizer
+    from json_generator import JsonGenerator
+    from task_details import DetailsFetcher
+    from metrics import metrics
+    import main
+
+    saida = str(Path(tmp) / 'output.json')
+
+    def consultar(db, duas_fases=False):
+        if duas_fases:
+            leves = QueryExecutor().execute_sql_file(db, 'consulta_tarefas_leve.sql', {'cicloCod': [CICLO]})
+            registros = list(DetailsFetcher(db).attach(leves))
+        else:
+            registros = QueryExecutor().execute_sql_file(db, 'consulta_tarefas.sql', {'cicloCod': [CICLO]})
+        return RecordNormalizer().normalize_all(registros)
+
+    if etapa == 'main':
+        metrics.enable()
+        inicio = time.perf_counter()
+        codigo = main.main(['--modo', 'ciclo', '--ciclo', str(CICLO), '--versao', VERSAO,
+                            '--sqlite', banco, '--output', saida])
+        segundos = time.perf_counter() - inicio
+        if codigo != 0:
+            raise Exception(f"main.py terminou com código {codigo}")
+    else:
+        with LocalDatabase(banco) as db:
+            if etapa in ('consulta', 'consulta_2fases'):
+                metrics.enable()
+                inicio = time.perf_counter()
+                consultar(db, duas_fases=etapa == 'consulta_2fases')
+                segundos = time.perf_counter() - inicio
+            else:
+                registros = consultar(db)
+                generator = JsonGenerator(output_dir=tmp)
+                if etapa == 'generate_json':
+                    metrics.enable()
+                    inicio = time.perf_counter()
+                    generator.generate_json(VERSAO, registros, output_filename='output.json')
+                    segundos = time.perf_counter() - inicio
+                else:
+                    json_data = generator.generate_json(VERSAO, registros)
+                    tarefas = main.documented_files(json_data['novidades'], VERSAO)
+                    metrics.enable()
+                    inicio = time.perf_counter()
+                    db.register_documented_tasks(tarefas)
+                    segundos = time.perf_counter() - inicio
+
+    contadores = metrics.contadores
+    return {
+        'segundos': round(segundos, 4),
+        'linhas': contadores.get('db.linhas', 0),
+        'idas_e_voltas': contadores.get('db.idas_e_voltas', 0),
+        'commits': contadores.get('db.commits', 0),
+        'rss_mb': peak_rss_mb(),
+    }
+
+
+def measure(etapa, base, tmp, verbose):
+    """Roda a etapa em um processo novo, sobre uma cópia do banco base"""
+    banco = Path(tmp) / f"{etapa}.db"
+    shutil.copyfile(base, banco)
+    try:
+        processo = subprocess.run(
+            [sys.executable, __file__, '--worker', etapa, '--banco', str(banco), '--tmp', tmp],
+            stdout=subprocess.PIPE, stderr=None if verbose else subprocess.DEVNULL, text=True
+        )
+        if processo.returncode != 0:
+            raise Exception(f"Etapa {etapa} falhou (código {processo.returncode}); use --verbose")
+        return json.loads(processo.stdout.strip().splitlines()[-1])
+    finally:
+        banco.unlink()
+
+
+def compare(resultados, baseline, tolerancia):
+    """
+    Compara os resultados com um baseline
+
+    Tempo e RSS são regressão acima de (1 + tolerancia) vezes o baseline
+    (tempos abaixo de 5 ms são ignorados, por serem ruído); idas e voltas e
+    commits são determinísticos e qualquer aumento é regressão.
+
+    Returns:
+        list: Descrições das regressões
+    """
+    regressoes = []
+    for tamanho, etapas in resultados['cenarios'].items():
+        for etapa, atual in etapas.items():
+            anterior = baseline.get('cenarios', {}).get(tamanho, {}).get(etapa)
+            if not anterior or etapa == 'geracao':
+                continue
+
+            limite = anterior['segundos'] * (1 + tolerancia)
+            if atual['segundos'] > limite and atual['segundos'] - anterior['segundos'] > 0.005:
+                regressoes.append(f"{tamanho} {etapa}: {atual['segundos']:.4f}s (baseline {anterior['segundos']:.4f}s)")
+
+            if atual['rss_mb'] and anterior.get('rss_mb') and atual['rss_mb'] > anterior['rss_mb'] * (1 + tolerancia):
+                regressoes.append(f"{tamanho} {etapa}: {atual['rss_mb']} MB de RSS (baseline {anterior['rss_mb']} MB)")
+
+            for contador in ('idas_e_voltas', 'commits'):
+                if atual[contador] > anterior.get(contador, atual[contador]):
+                    regressoes.append(f"{tamanho} {etapa}: {atual[contador]} {contador} (baseline {anterior[contador]})")
+
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline sobre dados sintéticos (SQLite)')
+    parser.add_argument('--tarefas', type=str, default='100,1000,10000,100000',
+                        help='Tamanhos da massa, separados por vírgula (até 1000000)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da massa sintética (padrão: 42)')
+    parser.add_argument('--etapas', type=str, default=','.join(ETAPAS),
+                        help=f"Etapas medidas (padrão: {','.join(ETAPAS)})")
+    parser.add_argument('--saida', type=str, help='Grava os resultados em JSON')
+    parser.add_argument('--baseline', type=str, help='Compara com um resultado anterior (código 1 se regredir)')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='Margem de tempo/RSS antes de acusar regressão (padrão: 0.2 = 20%%)')
+    parser.add_argument('--verbose', action='store_true', help='Mostra os logs das etapas')
+    parser.add_argument('--worker', choices=ETAPAS, help=argparse.SUPPRESS)
+    parser.add_argument('--banco', type=str, help=argparse.SUPPRESS)
+    parser.add_argument('--tmp', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_stage(args.worker, args.banco, args.tmp)))
+        return 0
+
+    tamanhos = [int(tamanho) for tamanho in args.tarefas.split(',')]
+    etapas = [etapa.strip() for etapa in args.etapas.split(',')]
+    invalidas = [etapa for etapa in etapas if etapa not in ETAPAS]
+    if invalidas:
+        parser.error(f"Etapa(s) desconhecida(s): {', '.join(invalidas)} (válidas: {', '.join(ETAPAS)})")
+    resultados = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'seed': args.seed,
+        'cenarios': {},
+    }
+
+    print(f"{'tarefas':>9} {'etapa':<16} {'tempo (s)':>10} {'linhas':>9} {'idas/voltas':>12} "
+          f"{'commits':>8} {'RSS (MB)':>9}")
+    for tamanho in tamanhos:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = str(Path(tmp) / 'base.db')
+            geracao = create_database(base, tamanho, args.seed, args.verbose)
+            cenario = resultados['cenarios'][str(tamanho)] = {'geracao': {'segundos': round(geracao, 4)}}
+            print(f"{tamanho:>9} {'(geração)':<16} {geracao:>10.3f}")
+
+            for etapa in etapas:
+                medida = cenario[etapa] = measure(etapa, base, tmp, args.verbose)
+                rss = '-' if medida['rss_mb'] is None else f"{medida['rss_mb']:.1f}"
+                print(f"{tamanho:>9} {etapa:<16} {medida['segundos']:>10.3f} {medida['linhas']:>9} "
+                      f"{medida['idas_e_voltas']:>12} {medida['commits']:>8} {rss:>9}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"\nResultados gravados em: {args.saida}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressoes = compare(resultados, json.load(f), args.tolerancia)
+        if regressoes:
+            print("\nREGRESSÕES em relação ao baseline:", file=sys.stderr)
+            for regressao in regressoes:
+                print(f"  {regressao}", file=sys.stderr)
+            return 1
+        print(f"\nSem regressões em relação a {args.baseline}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Benchmark do tipo de registro das consultas
+Compara, sobre um cursor sintético, o caminho antigo (um dicionário por
+linha) com o Record gerado uma vez por cursor.description, medindo tempo e
+pico de memória de Database.execute_query -> RecordNormalizer -> JsonGenerator
+
+Uso:
+    python benchmarks/registros.py [--linhas 100000] [--repeticoes 5]
+"""
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import Database
+from normalizer import RecordNormalizer
+from json_generator import JsonGenerator
+
+COLUNAS = ('Nome', 'Detalhes', 'NumeroTarefa', 'CicloId')
+
+SISTEMAS = ['ICRMWEB ', 'ITASKWEB ', 'ICRMIMPRESSOR ', 'SOLICITAÇÃO 4603 ', 'WEBCONVENIO ', 'ICRM3 ']
+
+
+class FakeCursor:
+    """Cursor em memória com a mesma interface usada por Database"""
+
+    def __init__(self, linhas):
+        self.description = [(coluna, None) for coluna in COLUNAS]
+        self.linhas = linhas
+
+    def fetchall(self):
+        return list(self.linhas)
+
+
+class BenchDatabase(Database):
+    """Database sobre o cursor sintético (caminho atual: Record)"""
+
+    def __init__(self, linhas):
+        super().__init__()
+        self.connection = True
+        self.cursor = FakeCursor(linhas)
+
+    def _execute(self, query, params=None):
+        pass
+
+
+class LegacyDatabase(BenchDatabase):
+    """Caminho anterior: um dicionário por linha"""
+
+    def execute_query(self, query, params=None):
+        columns = [column[0] for column in self.cursor.description]
+        results = []
+        for row in self.cursor.fetchall():
+            results.append(dict(zip(columns, row)))
+        return results
+
+
+def synthetic_rows(quantidade):
+    """Linhas no formato de consulta_tarefas.sql (TrfNome bruto)"""
+    return [
+        (f"{SISTEMAS[i % len(SISTEMAS)]}- Ajuste na tela de cadastro {i}",
+         f"Corrigido o cálculo do campo {i} na rotina de fechamento.", 10000 + i, 124)
+        for i in range(quantidade)
+    ]
+
+
+def run_pipeline(database):
+    """Consulta, normalização e montagem das novidades (sem serializar)"""
+    registros = database.execute_query('SELECT')
+    registros = RecordNormalizer().normalize_all(registros)
+    return registros, list(JsonGenerator().iter_novidades(registros))
+
+
+def measure(database, repeticoes):
+    """Melhor tempo e pico de memória do pipeline"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        run_pipeline(database)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    resultado = run_pipeline(database)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return min(tempos), pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark: dicionário por linha x Record')
+    parser.add_argument('--linhas', type=int, default=100000, help='Quantidade de linhas (padrão: 100000)')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Execuções por caminho (padrão: 5)')
+    args = parser.parse_args()
+
+    linhas = synthetic_rows(args.linhas)
+
+    # Logs das classes vão para stderr; o resultado do benchmark para stdout
+    resultados = {
+        'dict': measure(LegacyDatabase(linhas), args.repeticoes),
+        'Record': measure(BenchDatabase(linhas), args.repeticoes),
+    }
+
+    print(f"\n{args.linhas} linhas, melhor de {args.repeticoes} execuções")
+    print(f"{'caminho':<8} {'tempo (s)':>10} {'linhas/s':>12} {'pico (MB)':>10}")
+    for nome, (tempo, pico) in resultados.items():
+        print(f"{nome:<8} {tempo:>10.3f} {args.linhas / tempo:>12,.0f} {pico / 1024 / 1024:>10.1f}")
+
+    (tempo_dict, pico_dict), (tempo_record, pico_record) = resultados['dict'], resultados['Record']
+    razao = tempo_dict / tempo_record
+    if razao >= 1:
+        tempo = f"{razao:.2f}x mais rápido"
+    else:
+        tempo = f"{1 / razao:.2f}x mais lento"
+    print(f"\nRecord: {tempo}, {100 * (1 - pico_record / pico_dict):.0f}% menos memória")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+-- ============================================================================
+-- Detalhes de um lote de tarefas (--lazy-details, 2ª fase)
+-- ============================================================================
+-- A tag {tarefaId} é substituída pelos IDs do lote (apenas tarefas com
+-- TamanhoDetalhes maior que zero na consulta_tarefas_leve.sql).
+-- ============================================================================
+
+select
+		t.Tarefaid as NumeroTarefa,
+		t.TrfObservacao2 as Detalhes
+from
+		TSK_Tarefa t
+where
+		t.Tarefaid in ({tarefaId})
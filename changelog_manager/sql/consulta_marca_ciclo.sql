@@ -0,0 +1,18 @@
+-- ============================================================================
+-- Marca d'água dos dados de um ou mais ciclos (cache de saída)
+-- ============================================================================
+-- Uma única linha, barata de calcular pelos índices das migrações 0003/0004,
+-- que muda sempre que o resultado de consulta_tarefas.sql pode mudar:
+--   Tarefas / VersaoTarefas   tarefas dos ciclos e maior TrfVersao (rowversion,
+--                             alterado a cada INSERT/UPDATE da tarefa)
+--   Documentadas / UltimaDocumentada
+--                             tamanho e último ID da tabela de controle
+--
+-- Requer a migração 0004 (coluna TrfVersao).
+-- ============================================================================
+
+select
+		(select count(*) from TSK_Tarefa t where t.CicloId in ({cicloCod})) as Tarefas,
+		(select max(cast(t.TrfVersao as bigint)) from TSK_Tarefa t where t.CicloId in ({cicloCod})) as VersaoTarefas,
+		(select count(*) from TSK_TarefasDocumentadas) as Documentadas,
+		(select max(td.ID) from TSK_TarefasDocumentadas td) as UltimaDocumentada
@@ -0,0 +1,19 @@
+-- ============================================================================
+-- Marca d'água dos dados de tarefas individuais (cache de saída, modo tarefa)
+-- ============================================================================
+-- Mesmas colunas de consulta_marca_ciclo.sql, restritas às tarefas
+-- informadas em {tarefaId} (vinculada uma única vez: a lista conta uma só
+-- vez no limite de parâmetros do SQL Server).
+--
+-- Requer a migração opcional 0004 (coluna TrfVersao).
+-- ============================================================================
+
+select
+		count(*) as Tarefas,
+		max(cast(t.TrfVersao as bigint)) as VersaoTarefas,
+		(select count(*) from TSK_TarefasDocumentadas) as Documentadas,
+		(select max(td.ID) from TSK_TarefasDocumentadas td) as UltimaDocumentada
+from
+		TSK_Tarefa t
+where
+		t.Tarefaid in ({tarefaId})
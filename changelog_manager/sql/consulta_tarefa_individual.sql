@@ -4,23 +4,28 @@
 -- Busca uma tarefa específica por seu ID para documentação
 --
 -- IMPORTANTE: Mantenha as seguintes colunas no SELECT:
---   - Sistema       (nome do sistema/projeto)
---   - Resumo        (descrição resumida da alteração)
+--   - Nome          (nome da tarefa no formato "Sistema - Resumo"; a separação,
+--                    a limpeza e os apelidos de sistema são aplicados pela
+--                    ferramenta - ver src/normalizer.py. Colunas Sistema e
+--                    Resumo já separadas também são aceitas)
 --   - Detalhes      (descrição completa)
 --   - NumeroTarefa  (ID da tarefa para controle)
 --
--- A tag {tarefaId} será substituída automaticamente pelo ID informado
--- na linha de comando via parâmetro --tarefa-id
+-- A tag {tarefaId} será substituída automaticamente pelo(s) ID(s) informado(s)
+-- na linha de comando via parâmetro --tarefa-id (ex: 12345 ou 12345,12350-12355)
+--
+-- Requer as migrações do banco (python src/main.py migrate): coluna NumeroTarefaId.
 -- ============================================================================
 
 SELECT
-    case when CHARINDEX('-', t.TrfNome) > 0 then SUBSTRING(t.TrfNome,1,CHARINDEX('-', t.TrfNome)-1) else t.TrfNome end as Sistema,
-		case when CHARINDEX('-', t.TrfNome) > 0 then SUBSTRING(t.TrfNome,CHARINDEX('-', t.TrfNome)+1, LEN(t.TrfNome)) else t.TrfNome end as Resumo,
+    t.TrfNome AS Nome,
 		t.TrfObservacao2 AS Detalhes,
     t.Tarefaid AS NumeroTarefa
 FROM
     TSK_Tarefa t
-    LEFT JOIN TSK_TarefasDocumentadas td ON (t.Tarefaid = td.NumeroTarefa)
 WHERE
-    t.Tarefaid = {tarefaId}
-    AND td.NumeroTarefa IS NULL
+    t.Tarefaid IN ({tarefaId})
+    AND NOT EXISTS (
+        SELECT 1 FROM TSK_TarefasDocumentadas td
+        WHERE td.NumeroTarefaId = t.Tarefaid
+    )
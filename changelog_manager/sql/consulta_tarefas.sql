@@ -5,24 +5,32 @@
 -- estrutura real do seu banco de dados.
 --
 -- IMPORTANTE: Mantenha as seguintes colunas no SELECT:
---   - Sistema    (nome do sistema/projeto)
---   - Resumo     (descrição resumida da alteração)
+--   - Nome       (nome da tarefa no formato "Sistema - Resumo"; a separação,
+--                 a limpeza e os apelidos de sistema são aplicados pela
+--                 ferramenta - ver src/normalizer.py. Colunas Sistema e
+--                 Resumo já separadas também são aceitas)
 --   - Detalhes   (descrição completa)
 --   - NumeroTarefa (opcional, mas recomendado para controle)
 --
--- A tag {cicloCod} será substituída automaticamente pelo número do ciclo
--- informado na linha de comando.
+-- A tag {cicloCod} será substituída automaticamente pelo(s) número(s) do
+-- ciclo informado(s) na linha de comando (ex: 124 ou 124,125,126).
+-- A coluna CicloId é usada para separar o resultado por ciclo.
+--
+-- Requer as migrações do banco (python src/main.py migrate): a coluna
+-- NumeroTarefaId e o índice IX_TSK_Tarefa_CicloId_Conclusao.
 -- ============================================================================
 
 select
-		case when CHARINDEX('-', t.TrfNome) > 0 then SUBSTRING(t.TrfNome,1,CHARINDEX('-', t.TrfNome)-1) else t.TrfNome end as Sistema,
-		case when CHARINDEX('-', t.TrfNome) > 0 then SUBSTRING(t.TrfNome,CHARINDEX('-', t.TrfNome)+1, LEN(t.TrfNome)) else t.TrfNome end as Resumo,
+		t.TrfNome as Nome,
 		t.TrfObservacao2 as Detalhes,
-		t.Tarefaid as NumeroTarefa
+		t.Tarefaid as NumeroTarefa,
+		t.CicloId as CicloId
 from
 		TSK_Tarefa t
-		left join tsk_tarefasdocumentadas td on (t.Tarefaid = td.NumeroTarefa)
 where
-		td.NumeroTarefa is null
-		and t.CicloId = {cicloCod}
+		t.CicloId in ({cicloCod})
 		and (t.TrfFim is not null or t.trffeito = 1)
+		and not exists (
+			select 1 from TSK_TarefasDocumentadas td
+			where td.NumeroTarefaId = t.Tarefaid
+		)
@@ -0,0 +1,21 @@
+-- ============================================================================
+-- Dados das tarefas alteradas (cache local)
+-- ============================================================================
+-- Busca as colunas de consulta_tarefas.sql apenas para as tarefas que o cache
+-- local identificou como novas ou alteradas. Mantenha as mesmas expressões
+-- de Nome/Detalhes usadas em consulta_tarefas.sql (o cache guarda o Nome
+-- bruto; a normalização acontece a cada leitura).
+--
+-- A tag {tarefaId} recebe a lista de IDs a atualizar.
+-- ============================================================================
+
+select
+		t.TrfNome as Nome,
+		t.TrfObservacao2 as Detalhes,
+		t.Tarefaid as NumeroTarefa,
+		t.CicloId as CicloId,
+		cast(t.TrfVersao as bigint) as Versao
+from
+		TSK_Tarefa t
+where
+		t.Tarefaid in ({tarefaId})
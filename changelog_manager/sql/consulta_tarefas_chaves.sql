@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Chaves e versões das tarefas de um ciclo (cache local)
+-- ============================================================================
+-- Usada pelo cache local (src/task_cache.py) para descobrir, sem transferir
+-- os textos, quais tarefas do ciclo mudaram, saíram do ciclo ou já foram
+-- documentadas. Deve aplicar o mesmo filtro de conclusão de
+-- consulta_tarefas.sql.
+--
+-- Requer a migração 0004 (coluna TrfVersao).
+-- ============================================================================
+
+select
+		t.Tarefaid as NumeroTarefa,
+		t.CicloId as CicloId,
+		cast(t.TrfVersao as bigint) as Versao,
+		case when exists (
+			select 1 from TSK_TarefasDocumentadas td
+			where td.NumeroTarefaId = t.Tarefaid
+		) then 1 else 0 end as Documentada
+from
+		TSK_Tarefa t
+where
+		t.CicloId in ({cicloCod})
+		and (t.TrfFim is not null or t.trffeito = 1)
@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Consulta de tarefas sem o texto dos detalhes (--lazy-details, 1ª fase)
+-- ============================================================================
+-- Mesmos filtros de consulta_tarefas.sql, mas sem TrfObservacao2: no lugar
+-- do texto vem apenas o seu tamanho em bytes (TamanhoDetalhes; 0 para texto
+-- vazio e NULL para detalhes nulos). Os textos das tarefas com detalhes são
+-- buscados em seguida, em lotes por ID (consulta_detalhes.sql).
+--
+-- DATALENGTH é aceito também por colunas text/ntext, diferente de LEN.
+-- ============================================================================
+
+select
+		t.TrfNome as Nome,
+		t.Tarefaid as NumeroTarefa,
+		t.CicloId as CicloId,
+		datalength(t.TrfObservacao2) as TamanhoDetalhes
+from
+		TSK_Tarefa t
+where
+		t.CicloId in ({cicloCod})
+		and (t.TrfFim is not null or t.trffeito = 1)
+		and not exists (
+			select 1 from TSK_TarefasDocumentadas td
+			where td.NumeroTarefaId = t.Tarefaid
+		)
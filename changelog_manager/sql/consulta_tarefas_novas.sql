@@ -0,0 +1,48 @@
+-- ============================================================================
+-- Tarefas concluídas desde a última marca (--modo watch)
+-- ============================================================================
+-- Mesmas colunas e filtros de consulta_tarefas.sql, restritos às tarefas com
+-- TrfVersao (rowversion, migração 0004) maior que a última marca lida. Cada
+-- tarefa que é concluída (TrfFim/trffeito) recebe uma nova versão, então
+-- volta a aparecer aqui sem varrer o ciclo inteiro (índice da migração 0005).
+--
+-- Tags:
+--   {cicloCod}     ciclo(s) monitorado(s)
+--   {ultimaVersao} maior Versao já emitida (0 na primeira consulta)
+--   {tamanhoLote}  quantidade máxima de linhas por consulta
+--
+-- MIN_ACTIVE_ROWVERSION() limita a leitura às versões de transações já
+-- confirmadas: uma transação em andamento, com versão menor, não é pulada
+-- quando confirmar depois que uma versão maior já foi lida.
+-- ============================================================================
+
+select
+		p.Nome,
+		p.Detalhes,
+		p.NumeroTarefa,
+		p.CicloId,
+		p.Versao
+from (
+		select
+				t.TrfNome as Nome,
+				t.TrfObservacao2 as Detalhes,
+				t.Tarefaid as NumeroTarefa,
+				t.CicloId as CicloId,
+				cast(t.TrfVersao as bigint) as Versao,
+				row_number() over (order by t.TrfVersao) as Linha
+		from
+				TSK_Tarefa t
+		where
+				t.TrfVersao > cast(cast({ultimaVersao} as bigint) as binary(8))
+				and t.TrfVersao < min_active_rowversion()
+				and t.CicloId in ({cicloCod})
+				and (t.TrfFim is not null or t.trffeito = 1)
+				and not exists (
+					select 1 from TSK_TarefasDocumentadas td
+					where td.NumeroTarefaId = t.Tarefaid
+				)
+) p
+where
+		p.Linha <= {tamanhoLote}
+order by
+		p.Versao
@@ -0,0 +1,45 @@
+-- ============================================================================
+-- Página da consulta de tarefas (extração paginada, --page-size / --resume)
+-- ============================================================================
+-- Mesmas colunas e filtros de consulta_tarefas.sql, lidas em páginas pela
+-- chave Tarefaid (keyset): cada página começa depois do último Tarefaid da
+-- página anterior, então o custo de cada consulta não depende de quantas
+-- páginas já foram lidas.
+--
+-- Tags:
+--   {cicloCod}      ciclo informado na linha de comando
+--   {ultimaTarefa}  último Tarefaid já confirmado no diário (0 na primeira página)
+--   {tamanhoPagina} quantidade máxima de linhas da página
+--
+-- O filtro por ROW_NUMBER() é convertido em TOP pelo SQL Server e também é
+-- aceito pelo SQLite (banco local). O índice IX_TSK_Tarefa_CicloId_Conclusao
+-- (migração 0003) já entrega as linhas de um ciclo na ordem de Tarefaid.
+-- ============================================================================
+
+select
+		p.Nome,
+		p.Detalhes,
+		p.NumeroTarefa,
+		p.CicloId
+from (
+		select
+				t.TrfNome as Nome,
+				t.TrfObservacao2 as Detalhes,
+				t.Tarefaid as NumeroTarefa,
+				t.CicloId as CicloId,
+				row_number() over (order by t.Tarefaid) as Linha
+		from
+				TSK_Tarefa t
+		where
+				t.CicloId in ({cicloCod})
+				and t.Tarefaid > {ultimaTarefa}
+				and (t.TrfFim is not null or t.trffeito = 1)
+				and not exists (
+					select 1 from TSK_TarefasDocumentadas td
+					where td.NumeroTarefaId = t.Tarefaid
+				)
+) p
+where
+		p.Linha <= {tamanhoPagina}
+order by
+		p.NumeroTarefa
@@ -0,0 +1,35 @@
+-- ============================================================================
+-- Consulta de tarefas em ordem de sistema (--stream --shard-by sistema)
+-- ============================================================================
+-- Mesmas colunas e filtros de consulta_tarefas.sql, ordenadas pelo prefixo
+-- bruto de TrfNome (o trecho antes do primeiro '-', de onde a ferramenta
+-- tira o sistema): as tarefas de um sistema chegam juntas e cada shard é
+-- gravado assim que o sistema muda, sem manter o documento em memória.
+--
+-- Prefixos diferentes com o mesmo nome canônico (apelidos) podem chegar
+-- separados; o shard desse sistema é regravado no final.
+--
+-- A tag {cicloCod} será substituída pelo número do ciclo informado.
+-- ============================================================================
+
+select
+		t.TrfNome as Nome,
+		t.TrfObservacao2 as Detalhes,
+		t.Tarefaid as NumeroTarefa,
+		t.CicloId as CicloId
+from
+		TSK_Tarefa t
+where
+		t.CicloId in ({cicloCod})
+		and (t.TrfFim is not null or t.trffeito = 1)
+		and not exists (
+			select 1 from TSK_TarefasDocumentadas td
+			where td.NumeroTarefaId = t.Tarefaid
+		)
+order by
+		case
+			when charindex('-', t.TrfNome) > 0
+				then substring(t.TrfNome, 1, charindex('-', t.TrfNome) - 1)
+			else t.TrfNome
+		end,
+		t.Tarefaid
@@ -6,6 +6,10 @@
 --
 -- Execute este script no seu banco de dados SQL Server antes de usar
 -- a aplicação pela primeira vez (se desejar usar esse recurso).
+--
+-- Preferencialmente, use o comando de migrações, que cria esta tabela e
+-- também a coluna NumeroTarefaId e os índices exigidos pelas consultas:
+--     python src/main.py migrate
 -- ============================================================================
 
 -- Verifica se a tabela já existe antes de criar
@@ -0,0 +1,26 @@
+-- ============================================================================
+-- Migração 0001 (SQLite) - Estrutura base do banco local
+-- ============================================================================
+-- O banco local substitui o SQL Server em testes e benchmarks, por isso
+-- também cria TSK_Tarefa com as colunas usadas pelas consultas.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS TSK_Tarefa (
+    Tarefaid INTEGER PRIMARY KEY,
+    TrfNome VARCHAR(200) NOT NULL,
+    TrfObservacao2 TEXT,
+    CicloId INTEGER NOT NULL,
+    TrfFim DATETIME,
+    trffeito INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS TSK_TarefasDocumentadas (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    NumeroTarefa VARCHAR(50) NOT NULL,
+    ArquivoMD VARCHAR(200) NOT NULL,
+    DataExportacao DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT UQ_TSK_TarefasDocumentadas_NumeroTarefa UNIQUE (NumeroTarefa)
+);
+
+CREATE INDEX IF NOT EXISTS IX_TSK_TarefasDocumentadas_DataExportacao
+    ON TSK_TarefasDocumentadas (DataExportacao DESC);
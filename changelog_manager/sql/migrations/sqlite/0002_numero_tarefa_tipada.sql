@@ -0,0 +1,15 @@
+-- ============================================================================
+-- Migração 0002 (SQLite) - Chave numérica para NumeroTarefa
+-- ============================================================================
+
+ALTER TABLE TSK_TarefasDocumentadas ADD COLUMN NumeroTarefaId INTEGER
+    GENERATED ALWAYS AS (
+        CASE
+            WHEN NumeroTarefa <> '' AND NumeroTarefa NOT GLOB '*[^0-9]*'
+            THEN CAST(NumeroTarefa AS INTEGER)
+        END
+    ) VIRTUAL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_TSK_TarefasDocumentadas_NumeroTarefaId
+    ON TSK_TarefasDocumentadas (NumeroTarefaId)
+    WHERE NumeroTarefaId IS NOT NULL;
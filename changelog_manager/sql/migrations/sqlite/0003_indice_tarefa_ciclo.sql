@@ -0,0 +1,6 @@
+-- ============================================================================
+-- Migração 0003 (SQLite) - Índice de cobertura para a consulta por ciclo
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS IX_TSK_Tarefa_CicloId_Conclusao
+    ON TSK_Tarefa (CicloId, TrfFim, trffeito, TrfNome);
@@ -0,0 +1,26 @@
+-- ============================================================================
+-- Migração 0004 (SQLite) - Versão de linha em TSK_Tarefa (cache local)
+-- ============================================================================
+-- O SQLite não tem ROWVERSION; os gatilhos abaixo reproduzem o comportamento
+-- (valor crescente atribuído a cada INSERT e UPDATE).
+-- ============================================================================
+
+ALTER TABLE TSK_Tarefa ADD COLUMN TrfVersao INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS IX_TSK_Tarefa_Versao ON TSK_Tarefa (TrfVersao);
+
+CREATE TRIGGER IF NOT EXISTS TR_TSK_Tarefa_Versao_Insert
+AFTER INSERT ON TSK_Tarefa
+BEGIN
+    UPDATE TSK_Tarefa
+       SET TrfVersao = (SELECT MAX(TrfVersao) FROM TSK_Tarefa) + 1
+     WHERE Tarefaid = NEW.Tarefaid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_TSK_Tarefa_Versao_Update
+AFTER UPDATE OF TrfNome, TrfObservacao2, CicloId, TrfFim, trffeito ON TSK_Tarefa
+BEGIN
+    UPDATE TSK_Tarefa
+       SET TrfVersao = (SELECT MAX(TrfVersao) FROM TSK_Tarefa) + 1
+     WHERE Tarefaid = NEW.Tarefaid;
+END;
@@ -0,0 +1,9 @@
+-- ============================================================================
+-- Migração 0005 (SQLite) - Índice por versão de linha em TSK_Tarefa (modo watch)
+-- ============================================================================
+-- Equivalente ao índice com INCLUDE do SQL Server: as colunas dos filtros do
+-- modo watch entram na chave, depois de TrfVersao.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS IX_TSK_Tarefa_Versao_Conclusao
+    ON TSK_Tarefa (TrfVersao, CicloId, TrfFim, trffeito);
@@ -0,0 +1,34 @@
+-- ============================================================================
+-- Migração 0001 - Tabela de controle TSK_TarefasDocumentadas
+-- ============================================================================
+-- Mesmo conteúdo de create_table_documentadas.sql. Em bancos onde a tabela
+-- já foi criada manualmente, esta migração apenas é registrada.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'TSK_TarefasDocumentadas')
+BEGIN
+    CREATE TABLE TSK_TarefasDocumentadas (
+        ID INT IDENTITY(1,1) PRIMARY KEY,
+        NumeroTarefa VARCHAR(50) NOT NULL,
+        ArquivoMD VARCHAR(200) NOT NULL,
+        DataExportacao DATETIME NOT NULL DEFAULT GETDATE(),
+
+        -- Constraint para evitar duplicação de tarefas
+        CONSTRAINT UQ_TSK_TarefasDocumentadas_NumeroTarefa
+            UNIQUE (NumeroTarefa)
+    );
+END
+GO
+
+-- Mantido para o DocumentedSnapshot (server.py --snapshot e --modo watch
+-- --snapshot): refresh() lê MAX(DataExportacao) e as linhas com
+-- DataExportacao >= marca d'água. Também atende as consultas de
+-- manutenção por data de create_table_documentadas.sql. Sem --snapshot,
+-- nenhuma consulta da aplicação filtra por esta coluna.
+IF NOT EXISTS (SELECT * FROM sys.indexes
+               WHERE name = 'IX_TSK_TarefasDocumentadas_DataExportacao')
+BEGIN
+    CREATE INDEX IX_TSK_TarefasDocumentadas_DataExportacao
+        ON TSK_TarefasDocumentadas(DataExportacao DESC);
+END
+GO
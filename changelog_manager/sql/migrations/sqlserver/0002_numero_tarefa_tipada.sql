@@ -0,0 +1,34 @@
+-- ============================================================================
+-- Migração 0002 - Chave numérica para NumeroTarefa
+-- ============================================================================
+-- NumeroTarefa é VARCHAR(50), mas as consultas comparam com TSK_Tarefa.Tarefaid
+-- (INT). A conversão implícita impede seeks no índice da constraint única.
+--
+-- Adiciona a coluna computada persistida NumeroTarefaId (INT) e um índice
+-- simples sobre ela. Os INSERTs existentes continuam gravando apenas
+-- NumeroTarefa; o valor numérico é calculado pelo próprio SQL Server.
+--
+-- O índice não pode ser filtrado: o SQL Server não aceita coluna computada
+-- no WHERE de um índice filtrado (erro 10609). Também não é único, pois
+-- valores não numéricos geram vários NULLs; a unicidade continua garantida
+-- por UQ_TSK_TarefasDocumentadas_NumeroTarefa.
+-- ============================================================================
+
+IF COL_LENGTH('TSK_TarefasDocumentadas', 'NumeroTarefaId') IS NULL
+BEGIN
+    ALTER TABLE TSK_TarefasDocumentadas ADD NumeroTarefaId AS (
+        CASE
+            WHEN NumeroTarefa NOT LIKE '%[^0-9]%' AND LEN(NumeroTarefa) BETWEEN 1 AND 9
+            THEN CAST(NumeroTarefa AS INT)
+        END
+    ) PERSISTED;
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes
+               WHERE name = 'IX_TSK_TarefasDocumentadas_NumeroTarefaId')
+BEGIN
+    CREATE INDEX IX_TSK_TarefasDocumentadas_NumeroTarefaId
+        ON TSK_TarefasDocumentadas (NumeroTarefaId);
+END
+GO
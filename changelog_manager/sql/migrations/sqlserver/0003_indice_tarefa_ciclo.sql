@@ -0,0 +1,16 @@
+-- ============================================================================
+-- Migração 0003 - Índice de cobertura para a consulta por ciclo
+-- ============================================================================
+-- Cobre o predicado CicloId / TrfFim / trffeito de consulta_tarefas.sql e a
+-- coluna TrfNome (Sistema/Resumo). TrfObservacao2 fica de fora por ser texto
+-- longo; ela é lida pela chave primária apenas para as linhas retornadas.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.indexes
+               WHERE name = 'IX_TSK_Tarefa_CicloId_Conclusao')
+BEGIN
+    CREATE INDEX IX_TSK_Tarefa_CicloId_Conclusao
+        ON TSK_Tarefa (CicloId)
+        INCLUDE (TrfFim, trffeito, TrfNome);
+END
+GO
@@ -0,0 +1,26 @@
+-- ============================================================================
+-- Migração 0004 - Versão de linha em TSK_Tarefa (cache local)
+-- ============================================================================
+-- O cache local de tarefas (src/task_cache.py) compara a versão de cada linha
+-- para buscar no banco apenas as tarefas alteradas desde a última execução.
+--
+-- ROWVERSION é atualizada automaticamente pelo SQL Server em todo INSERT e
+-- UPDATE, sem mudança nos sistemas que gravam TSK_Tarefa. Se a tabela já
+-- tiver uma coluna rowversion/timestamp, ajuste consulta_tarefas_chaves.sql
+-- para usá-la e remova o ALTER TABLE abaixo.
+-- ============================================================================
+
+IF COL_LENGTH('TSK_Tarefa', 'TrfVersao') IS NULL
+BEGIN
+    ALTER TABLE TSK_Tarefa ADD TrfVersao ROWVERSION;
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes
+               WHERE name = 'IX_TSK_Tarefa_CicloId_Versao')
+BEGIN
+    CREATE INDEX IX_TSK_Tarefa_CicloId_Versao
+        ON TSK_Tarefa (CicloId)
+        INCLUDE (TrfVersao, TrfFim, trffeito);
+END
+GO
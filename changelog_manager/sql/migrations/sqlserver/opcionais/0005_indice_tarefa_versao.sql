@@ -0,0 +1,17 @@
+-- ============================================================================
+-- Migração 0005 - Índice por versão de linha em TSK_Tarefa (modo watch)
+-- ============================================================================
+-- O modo watch (--modo watch) consulta apenas as tarefas com TrfVersao maior
+-- que a última marca lida (sql/consulta_tarefas_novas.sql). Com este índice,
+-- o custo de cada consulta depende da quantidade de tarefas alteradas desde
+-- a consulta anterior, e não do tamanho do ciclo.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.indexes
+               WHERE name = 'IX_TSK_Tarefa_Versao')
+BEGIN
+    CREATE INDEX IX_TSK_Tarefa_Versao
+        ON TSK_Tarefa (TrfVersao)
+        INCLUDE (CicloId, TrfFim, trffeito);
+END
+GO
@@ -0,0 +1,89 @@
+"""
+Changelog Manager - Cliente do Modo Servidor
+Envia a requisição ao servidor local e imprime o JSON em stdout, como o main.py
+"""
+import os
+import sys
+import argparse
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError, URLError
+
+
+def parse_arguments():
+    """
+    Processa argumentos da linha de comando (os mesmos do main.py)
+
+    Returns:
+        argparse.Namespace: Argumentos processados
+    """
+    parser = argparse.ArgumentParser(
+        description='Cliente do servidor do Changelog Manager',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+    python client.py --modo ciclo --ciclo 124 --versao "09.91.47.20"
+    python client.py --modo tarefa --tarefa-id 12345 --versao "09.91.47.20" --no-register
+        """
+    )
+
+    parser.add_argument('--modo', '-m', type=str, choices=['ciclo', 'tarefa'], required=True,
+                        help='Modo de operação: "ciclo" ou "tarefa"')
+    parser.add_argument('--ciclo', '-c', type=str,
+                        help='Número(s) do ciclo (obrigatório se --modo=ciclo)')
+    parser.add_argument('--tarefa-id', '-t', type=str,
+                        help='ID(s) da tarefa (obrigatório se --modo=tarefa)')
+    parser.add_argument('--versao', '-v', type=str, required=True,
+                        help='Versão do changelog (ex: "09.91.47.20")')
+    parser.add_argument('--output', '-o', type=str,
+                        help='Nome do arquivo JSON de saída (opcional - se omitido, imprime em stdout)')
+    parser.add_argument('--no-register', action='store_true',
+                        help='Não registra as tarefas na tabela de documentadas')
+    parser.add_argument('--url', type=str,
+                        default=os.getenv('CHANGELOG_SERVER_URL', 'http://127.0.0.1:8765'),
+                        help='Endereço do servidor (padrão: CHANGELOG_SERVER_URL ou http://127.0.0.1:8765)')
+    parser.add_argument('--timeout', type=int, default=300,
+                        help='Tempo máximo de espera pela resposta, em segundos')
+
+    return parser.parse_args()
+
+
+def main():
+    """Função principal do cliente"""
+    args = parse_arguments()
+
+    params = {'versao': args.versao}
+    if args.modo == 'ciclo':
+        params['ciclo'] = args.ciclo or ''
+    else:
+        params['tarefa_id'] = args.tarefa_id or ''
+    # GET apenas consulta; o registro das tarefas é feito só via POST
+    url = f"{args.url.rstrip('/')}/{args.modo}"
+    if args.no_register:
+        requisicao = Request(f"{url}?{urlencode(params)}", method='GET')
+    else:
+        requisicao = Request(url, data=urlencode(params).encode('utf-8'), method='POST')
+
+    try:
+        with urlopen(requisicao, timeout=args.timeout) as response:
+            body = response.read().decode('utf-8')
+    except HTTPError as e:
+        print(f"\nERRO ({e.code}): {e.read().decode('utf-8', 'replace')}", file=sys.stderr)
+        return 1
+    except URLError as e:
+        print(f"\nERRO: Servidor indisponível em {args.url}: {e.reason}", file=sys.stderr)
+        print("Inicie o servidor com: python src/server.py", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(body)
+        print(f"Arquivo gerado: {args.output}", file=sys.stderr)
+    else:
+        print(body)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
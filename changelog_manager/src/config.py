@@ -1,43 +1,139 @@
 """
 Módulo de configuração - Carrega variáveis de ambiente do arquivo .env
+O .env só é lido no primeiro acesso a uma configuração, então comandos que
+não usam o banco (--help, summary, index...) não pagam pela carga
 """
 import os
+import re
 from pathlib import Path
-from dotenv import load_dotenv
+from metrics import metrics
 
 
 class Config:
     """Classe para gerenciar configurações da aplicação"""
 
     def __init__(self):
-        """Inicializa e carrega as configurações do .env"""
+        """Inicializa a configuração (o .env é carregado sob demanda)"""
         # Encontra o diretório raiz do projeto
         self.base_dir = Path(__file__).parent.parent
         self.env_path = self.base_dir / '.env'
+        self._loaded = False
 
-        # Carrega variáveis do .env
-        load_dotenv(self.env_path)
+    def __getattr__(self, nome):
+        """Carrega o .env no primeiro acesso a uma configuração ainda não lida"""
+        if nome.startswith('_') or self._loaded:
+            raise AttributeError(nome)
+        self._load()
+        return getattr(self, nome)
 
-        # Configurações do banco de dados
-        self.db_server = os.getenv('DB_SERVER')
-        self.db_database = os.getenv('DB_DATABASE')
-        self.db_username = os.getenv('DB_USERNAME')
-        self.db_password = os.getenv('DB_PASSWORD')
-        self.db_driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-        self.db_table_documentadas = os.getenv('DB_TABLE_DOCUMENTADAS', 'TSK_TarefasDocumentadas')
+    def _load(self):
+        """Lê o .env e as variáveis de ambiente"""
+        from dotenv import load_dotenv
 
-    def validate(self):
+        with metrics.stage('config.carregar'):
+            # Carrega variáveis do .env
+            load_dotenv(self.env_path)
+
+            valores = {
+                # Configurações do banco de dados
+                'db_server': os.getenv('DB_SERVER'),
+                'db_database': os.getenv('DB_DATABASE'),
+                'db_username': os.getenv('DB_USERNAME'),
+                'db_password': os.getenv('DB_PASSWORD'),
+                'db_driver': os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server'),
+                'db_table_documentadas': os.getenv('DB_TABLE_DOCUMENTADAS', 'TSK_TarefasDocumentadas'),
+
+                # Perfis de conexão nomeados (um banco por portal de cliente, --databases):
+                # DB_PROFILES=jacomar,pinheiro e DB_JACOMAR_SERVER, DB_JACOMAR_DATABASE, ...
+                'db_profiles': [nome.strip() for nome in os.getenv('DB_PROFILES', '').split(',') if nome.strip()],
+                'db_timeout': int(os.getenv('DB_TIMEOUT', '120')),
+
+                # Configurações do modo servidor
+                'server_host': os.getenv('SERVER_HOST', '127.0.0.1'),
+                'server_port': int(os.getenv('SERVER_PORT', '8765')),
+                'pool_size': int(os.getenv('DB_POOL_SIZE', '4')),
+
+                # Cache local de tarefas (arquivo SQLite ao lado dos output_*.json)
+                'cache_path': os.getenv('CACHE_PATH', str(self.base_dir / 'tarefas_cache.db')),
+                'cache_max_mb': int(os.getenv('CACHE_MAX_MB', '200')),
+
+                # Cache de saída (documentos gerados, endereçados pelo conteúdo e pela marca d'água)
+                'output_cache_path': os.getenv('OUTPUT_CACHE_PATH', str(self.base_dir / 'saida_cache.db')),
+                'output_cache_max_mb': int(os.getenv('OUTPUT_CACHE_MAX_MB', '100')),
+
+                # Extração paginada (--page-size / --resume): tamanho padrão da página e diários
+                'page_size': int(os.getenv('EXTRACAO_PAGE_SIZE', '500')),
+                'journal_dir': os.getenv('EXTRACAO_JOURNAL_DIR', str(self.base_dir / 'extracoes')),
+
+                # Modo watch: intervalo mínimo e máximo entre consultas (segundos) e linhas por consulta
+                'watch_intervalo': float(os.getenv('WATCH_INTERVALO', '5')),
+                'watch_intervalo_max': float(os.getenv('WATCH_INTERVALO_MAX', '120')),
+                'watch_lote': int(os.getenv('WATCH_LOTE', '500')),
+
+                # Tabela de apelidos de sistema (nome do banco -> diretório de documentação)
+                'sistemas_alias_path': os.getenv('SISTEMAS_ALIAS_PATH',
+                                                 str(self.base_dir / 'sistemas_alias.json')),
+            }
+
+        # Valores atribuídos antes da carga (ex: config.cache_path = ...) são mantidos
+        for nome, valor in valores.items():
+            self.__dict__.setdefault(nome, valor)
+        self._loaded = True
+
+    def get_profile(self, perfil=None):
+        """
+        Configuração de conexão de um perfil nomeado
+
+        Cada valor é lido de DB_{PERFIL}_SERVER, DB_{PERFIL}_DATABASE,
+        DB_{PERFIL}_USERNAME, DB_{PERFIL}_PASSWORD e DB_{PERFIL}_DRIVER; o que
+        não for informado vem do DB_* padrão (ex: mesmo servidor, outro banco).
+
+        Args:
+            perfil (str, optional): Nome listado em DB_PROFILES (None = conexão padrão)
+
+        Returns:
+            dict: {'prefixo', 'server', 'database', 'username', 'password', 'driver'}
+
+        Raises:
+            ValueError: Se o perfil não estiver em DB_PROFILES
+        """
+        padrao = {
+            'server': self.db_server,
+            'database': self.db_database,
+            'username': self.db_username,
+            'password': self.db_password,
+            'driver': self.db_driver,
+        }
+        if perfil is None:
+            return {'prefixo': 'DB_', **padrao}
+
+        if perfil not in self.db_profiles:
+            raise ValueError(
+                f"Perfil de conexão desconhecido: {perfil} "
+                f"(perfis em DB_PROFILES: {', '.join(self.db_profiles) or 'nenhum'})"
+            )
+
+        nome = re.sub(r'\W', '_', perfil).upper()
+        prefixo = f"DB_{nome}_"
+        return {
+            'prefixo': prefixo,
+            **{campo: os.getenv(f"{prefixo}{campo.upper()}", valor) for campo, valor in padrao.items()}
+        }
+
+    def validate(self, perfil=None):
         """
         Valida se todas as configurações obrigatórias estão presentes
 
+        Args:
+            perfil (str, optional): Perfil de conexão nomeado (None = conexão padrão)
+
         Raises:
             ValueError: Se alguma configuração obrigatória estiver faltando
         """
+        dados = self.get_profile(perfil)
         required_fields = {
-            'DB_SERVER': self.db_server,
-            'DB_DATABASE': self.db_database,
-            'DB_USERNAME': self.db_username,
-            'DB_PASSWORD': self.db_password,
+            f"{dados['prefixo']}{campo.upper()}": dados[campo]
+            for campo in ('server', 'database', 'username', 'password')
         }
 
         missing = [key for key, value in required_fields.items() if not value]
@@ -48,19 +144,23 @@ class Config:
                 f"Por favor, copie o arquivo .env.example para .env e preencha os valores."
             )
 
-    def get_connection_string(self):
+    def get_connection_string(self, perfil=None):
         """
         Retorna a string de conexão para o SQL Server
 
+        Args:
+            perfil (str, optional): Perfil de conexão nomeado (None = conexão padrão)
+
         Returns:
             str: String de conexão ODBC
         """
+        dados = self.get_profile(perfil)
         return (
-            f"DRIVER={{{self.db_driver}}};"
-            f"SERVER={self.db_server};"
-            f"DATABASE={self.db_database};"
-            f"UID={self.db_username};"
-            f"PWD={self.db_password};"
+            f"DRIVER={{{dados['driver']}}};"
+            f"SERVER={dados['server']};"
+            f"DATABASE={dados['database']};"
+            f"UID={dados['username']};"
+            f"PWD={dados['password']};"
         )
 
 
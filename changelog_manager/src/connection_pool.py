@@ -0,0 +1,120 @@
+"""
+Módulo de pool de conexões com o banco de dados
+Mantém um conjunto limitado de conexões abertas para o modo servidor
+"""
+import sys
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """Pool limitado de instâncias Database já conectadas, com health check"""
+
+    def __init__(self, factory, size=4, health_check_interval=30):
+        """
+        Inicializa o pool (as conexões são abertas sob demanda)
+
+        Args:
+            factory (callable): Função que cria uma nova instância de Database
+            size (int): Quantidade máxima de conexões abertas
+            health_check_interval (int): Segundos de ociosidade após os quais a
+                                         conexão é verificada antes de ser reutilizada
+        """
+        self.factory = factory
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """Cria e conecta uma nova instância de Database"""
+        db = self.factory()
+        db.connect()
+        return db
+
+    def _checkout(self, timeout):
+        """Obtém uma conexão ociosa ou cria uma nova, respeitando o limite"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                criar = True
+            else:
+                criar = False
+
+        if criar:
+            try:
+                return self._open(), time.monotonic()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"Nenhuma conexão disponível no pool após {timeout}s ({self.size} em uso)"
+            )
+
+    @contextmanager
+    def connection(self, timeout=30):
+        """
+        Empresta uma conexão do pool (context manager)
+
+        Conexões ociosas há mais de health_check_interval segundos são
+        verificadas com ping() e reabertas se não responderem.
+
+        Args:
+            timeout (int): Segundos para aguardar uma conexão livre
+
+        Yields:
+            Database: Instância conectada
+
+        Raises:
+            TimeoutError: Se nenhuma conexão ficar livre dentro do prazo
+        """
+        db, ultimo_uso = self._checkout(timeout)
+
+        if time.monotonic() - ultimo_uso > self.health_check_interval and not db.ping():
+            print("AVISO: Conexão do pool não respondeu. Reconectando...", file=sys.stderr)
+            db.disconnect()
+            try:
+                db.connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        saudavel = True
+        try:
+            yield db
+        except Exception:
+            # Conexão pode ter ficado em estado inválido: confirma antes de devolver
+            saudavel = db.ping()
+            raise
+        finally:
+            if saudavel:
+                self._idle.put((db, time.monotonic()))
+            else:
+                db.disconnect()
+                with self._lock:
+                    self._created -= 1
+
+    def close(self):
+        """Fecha todas as conexões ociosas do pool"""
+        while True:
+            try:
+                db, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            db.disconnect()
+            with self._lock:
+                self._created -= 1
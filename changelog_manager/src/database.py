@@ -1,31 +1,106 @@
 """
 Módulo de conexão com banco de dados SQL Server
 """
-import pyodbc
+import sys
 from config import config
+from records import record_type
+from metrics import metrics
+
+
+class CountingCursor:
+    """
+    Cursor do driver que conta cada chamada ao banco (db.idas_e_voltas)
+
+    Cada execute/executemany/executescript e cada fetch conta uma ida e
+    volta; os demais atributos (description, rowcount, fast_executemany,
+    close...) são repassados ao cursor original.
+    """
+
+    __slots__ = ('_cursor',)
+
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __setattr__(self, nome, valor):
+        setattr(self._cursor, nome, valor)
+
+    def execute(self, *args):
+        metrics.count('db.idas_e_voltas')
+        self._cursor.execute(*args)
+        return self
+
+    def executemany(self, *args):
+        metrics.count('db.idas_e_voltas')
+        self._cursor.executemany(*args)
+        return self
+
+    def executescript(self, script):
+        metrics.count('db.idas_e_voltas')
+        self._cursor.executescript(script)
+        return self
+
+    def fetchone(self):
+        metrics.count('db.idas_e_voltas')
+        return self._cursor.fetchone()
+
+    def fetchmany(self, *args):
+        metrics.count('db.idas_e_voltas')
+        return self._cursor.fetchmany(*args)
+
+    def fetchall(self):
+        metrics.count('db.idas_e_voltas')
+        return self._cursor.fetchall()
 
 
 class Database:
     """Classe para gerenciar conexões com SQL Server"""
 
-    def __init__(self):
-        """Inicializa a classe de conexão"""
+    # Subdiretório de sql/migrations/ usado por esta conexão
+    dialect = 'sqlserver'
+
+    def __init__(self, perfil=None, timeout=None):
+        """
+        Inicializa a classe de conexão
+
+        Args:
+            perfil (str, optional): Perfil de conexão nomeado do .env (None = DB_* padrão)
+            timeout (int, optional): Segundos máximos para conectar e para cada consulta
+        """
+        self.perfil = perfil
+        self.timeout = timeout
         self.connection = None
         self.cursor = None
+        # Exceções do driver tratadas nas consultas (definidas no connect)
+        self.errors = ()
 
     def connect(self):
         """
         Estabelece conexão com o banco de dados SQL Server
 
+        O pyodbc (e o driver ODBC) só é importado aqui: comandos locais e o
+        LocalDatabase (SQLite) não dependem dele.
+
         Raises:
             Exception: Se houver erro na conexão
         """
+        import pyodbc
+        self.errors = pyodbc.Error
+
         try:
-            connection_string = config.get_connection_string()
-            self.connection = pyodbc.connect(connection_string)
-            self.cursor = self.connection.cursor()
-            print(f"Conectado ao banco de dados: {config.db_database}")
-        except pyodbc.Error as e:
+            connection_string = config.get_connection_string(self.perfil)
+            with metrics.stage('db.conectar'):
+                if self.timeout:
+                    self.connection = pyodbc.connect(connection_string, timeout=self.timeout)
+                    # Tempo limite de cada consulta (SQL_ATTR_QUERY_TIMEOUT)
+                    self.connection.timeout = self.timeout
+                else:
+                    self.connection = pyodbc.connect(connection_string)
+            self.cursor = CountingCursor(self.connection.cursor())
+            print(f"Conectado ao banco de dados: {config.get_profile(self.perfil)['database']}", file=sys.stderr)
+        except self.errors as e:
             raise Exception(f"Erro ao conectar ao banco de dados: {e}")
 
     def disconnect(self):
@@ -34,17 +109,42 @@ class Database:
             self.cursor.close()
         if self.connection:
             self.connection.close()
-            print("Conexão com banco de dados fechada")
+            print("Conexão com banco de dados fechada", file=sys.stderr)
+        self.connection = None
+        self.cursor = None
+
+    def identity(self):
+        """Identificação do banco (servidor/banco do perfil), usada nas chaves de cache"""
+        dados = config.get_profile(self.perfil)
+        return f"{dados['server']}/{dados['database']}"
+
+    def ping(self):
+        """
+        Verifica se a conexão ainda responde (health check)
+
+        Returns:
+            bool: True se a conexão está ativa, False caso contrário
+        """
+        if not self.connection:
+            return False
+
+        try:
+            self.cursor.execute("SELECT 1")
+            self.cursor.fetchone()
+            return True
+        except Exception:
+            return False
 
-    def execute_query(self, query):
+    def execute_query(self, query, params=None):
         """
         Executa uma query SELECT e retorna os resultados
 
         Args:
             query (str): Query SQL a ser executada
+            params (list, optional): Valores dos marcadores '?' da query
 
         Returns:
-            list: Lista de dicionários com os resultados
+            list: Registros (records.Record, acesso por nome de coluna)
 
         Raises:
             Exception: Se houver erro na execução da query
@@ -53,19 +153,94 @@ class Database:
             raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
 
         try:
-            self.cursor.execute(query)
-            columns = [column[0] for column in self.cursor.description]
-            results = []
+            self._execute(query, params)
+            # Uma classe de registro por conjunto de colunas, criada uma única vez
+            record = record_type(tuple(column[0] for column in self.cursor.description))
+            with metrics.stage('db.buscar'):
+                results = list(map(record._make, self.cursor.fetchall()))
+            metrics.count('db.linhas', len(results))
 
-            for row in self.cursor.fetchall():
-                results.append(dict(zip(columns, row)))
-
-            print(f"Query executada com sucesso. {len(results)} registro(s) retornado(s).")
+            print(f"Query executada com sucesso. {len(results)} registro(s) retornado(s).",
+                  file=sys.stderr)
             return results
 
-        except pyodbc.Error as e:
+        except self.errors as e:
+            raise Exception(f"Erro ao executar query: {e}")
+
+    def iter_query(self, query, params=None, chunk_size=500):
+        """
+        Executa uma query SELECT e entrega os resultados sob demanda
+
+        As linhas são lidas do cursor em blocos (fetchmany), de modo que a
+        memória usada fica limitada ao tamanho do bloco e o primeiro registro
+        fica disponível antes de o resultado completo ser transferido.
+
+        Args:
+            query (str): Query SQL a ser executada
+            params (list, optional): Valores dos marcadores '?' da query
+            chunk_size (int): Quantidade de linhas lidas por vez do cursor
+
+        Yields:
+            Record: Um registro por vez
+
+        Raises:
+            Exception: Se houver erro na execução da query
+        """
+        if not self.connection:
+            raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
+
+        try:
+            self._execute(query, params)
+            record = record_type(tuple(column[0] for column in self.cursor.description))
+            total = 0
+
+            while True:
+                with metrics.stage('db.buscar'):
+                    rows = self.cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                metrics.count('db.linhas', len(rows))
+                total += len(rows)
+                yield from map(record._make, rows)
+
+            print(f"Query executada com sucesso. {total} registro(s) retornado(s).",
+                  file=sys.stderr)
+
+        except self.errors as e:
             raise Exception(f"Erro ao executar query: {e}")
 
+    def execute_script(self, script):
+        """
+        Executa um batch de comandos (DDL) sem confirmar a transação
+
+        Args:
+            script (str): Batch T-SQL (sem separadores GO)
+
+        Raises:
+            Exception: Se houver erro na execução
+        """
+        if not self.connection:
+            raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
+
+        try:
+            self.cursor.execute(script)
+        except self.errors as e:
+            raise Exception(f"Erro ao executar script: {e}")
+
+    def _execute(self, query, params=None):
+        """Executa a query no cursor, com parâmetros vinculados quando houver"""
+        with metrics.stage('db.executar'):
+            if params:
+                self.cursor.execute(query, params)
+            else:
+                self.cursor.execute(query)
+
+    def _commit(self):
+        """Confirma a transação (uma ida e volta ao banco)"""
+        self.connection.commit()
+        metrics.count('db.idas_e_voltas')
+        metrics.count('db.commits')
+
     def execute_insert(self, query, params):
         """
         Executa um INSERT no banco de dados
@@ -82,10 +257,11 @@ class Database:
 
         try:
             self.cursor.execute(query, params)
-            self.connection.commit()
-            print(f"INSERT executado com sucesso. {self.cursor.rowcount} linha(s) afetada(s).")
+            self._commit()
+            print(f"INSERT executado com sucesso. {self.cursor.rowcount} linha(s) afetada(s).",
+                  file=sys.stderr)
 
-        except pyodbc.Error as e:
+        except self.errors as e:
             self.connection.rollback()
             raise Exception(f"Erro ao executar INSERT: {e}")
 
@@ -112,9 +288,62 @@ class Database:
             result = self.cursor.fetchone()
             return result[0] > 0
         except Exception as e:
-            print(f"AVISO: Erro ao verificar tarefa documentada {task_id}: {e}")
+            print(f"AVISO: Erro ao verificar tarefa documentada {task_id}: {e}", file=sys.stderr)
             return False
 
+    def documented_subset(self, task_ids):
+        """
+        Retorna quais das tarefas informadas já estão na tabela de documentadas
+
+        Os IDs são enviados de uma vez (fast_executemany) para uma tabela
+        temporária e cruzados com a tabela de controle em uma única consulta,
+        em vez de um COUNT(*) por tarefa.
+
+        Args:
+            task_ids (iterable): IDs das tarefas
+
+        Returns:
+            set: IDs (str) que já foram documentados
+
+        Raises:
+            Exception: Se houver erro na execução da consulta
+        """
+        if not self.connection:
+            raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
+
+        ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+        if not ids:
+            return set()
+
+        table_name = config.db_table_documentadas
+
+        try:
+            self.cursor.execute(
+                "CREATE TABLE #TarefasConsulta (NumeroTarefa VARCHAR(50) NOT NULL PRIMARY KEY)"
+            )
+            self.cursor.fast_executemany = True
+            self.cursor.executemany(
+                "INSERT INTO #TarefasConsulta (NumeroTarefa) VALUES (?)",
+                [(task_id,) for task_id in ids]
+            )
+            self.cursor.execute(f"""
+                SELECT td.NumeroTarefa
+                FROM #TarefasConsulta c
+                    INNER JOIN {table_name} td ON (td.NumeroTarefa = c.NumeroTarefa)
+            """)
+            documentadas = {str(row[0]) for row in self.cursor.fetchall()}
+            self.cursor.execute("DROP TABLE #TarefasConsulta")
+            self._commit()
+
+        except self.errors as e:
+            self.connection.rollback()
+            raise Exception(f"Erro ao verificar tarefas documentadas: {e}")
+
+        finally:
+            self.cursor.fast_executemany = False
+
+        return documentadas
+
     def register_documented_task(self, numero_tarefa, arquivo_md):
         """
         Registra uma tarefa como documentada na tabela de controle
@@ -135,7 +364,101 @@ class Database:
         try:
             self.execute_insert(query, (numero_tarefa, arquivo_md))
         except Exception as e:
-            print(f"AVISO: Não foi possível registrar tarefa {numero_tarefa}: {e}")
+            print(f"AVISO: Não foi possível registrar tarefa {numero_tarefa}: {e}", file=sys.stderr)
+
+    def register_documented_tasks(self, tasks, batch_size=1000):
+        """
+        Registra várias tarefas como documentadas em uma única transação
+
+        As linhas são enviadas em lotes (fast_executemany) para uma tabela
+        temporária de staging e aplicadas na tabela de controle com um único
+        MERGE por lote. Tarefas que violariam a constraint
+        UQ_TSK_TarefasDocumentadas_NumeroTarefa são reportadas como conflito
+        sem abortar o lote.
+
+        Args:
+            tasks (iterable): Pares (numero_tarefa, arquivo_md)
+            batch_size (int): Quantidade de linhas enviadas por lote
+
+        Returns:
+            dict: {'registradas': [numeros], 'conflitos': [numeros]}
+
+        Raises:
+            Exception: Se houver erro na execução (a transação é desfeita)
+        """
+        if not self.connection:
+            raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
+
+        table_name = config.db_table_documentadas
+        resultado = {'registradas': [], 'conflitos': []}
+
+        # Remove duplicatas da própria entrada (também violariam a constraint)
+        rows = []
+        vistos = set()
+        for numero_tarefa, arquivo_md in tasks:
+            numero = str(numero_tarefa)
+            if numero in vistos:
+                resultado['conflitos'].append(numero)
+                continue
+            vistos.add(numero)
+            rows.append((numero, arquivo_md))
+
+        if not rows:
+            return resultado
+
+        merge_query = f"""
+            MERGE {table_name} WITH (HOLDLOCK) AS td
+            USING #TarefasDocumentadasStaging AS s
+                ON td.NumeroTarefa = s.NumeroTarefa
+            WHEN NOT MATCHED THEN
+                INSERT (NumeroTarefa, ArquivoMD, DataExportacao)
+                VALUES (s.NumeroTarefa, s.ArquivoMD, GETDATE())
+            OUTPUT inserted.NumeroTarefa;
+        """
+
+        try:
+            self.cursor.execute("""
+                CREATE TABLE #TarefasDocumentadasStaging (
+                    NumeroTarefa VARCHAR(50) NOT NULL PRIMARY KEY,
+                    ArquivoMD VARCHAR(200) NOT NULL
+                )
+            """)
+            self.cursor.fast_executemany = True
+
+            for inicio in range(0, len(rows), batch_size):
+                lote = rows[inicio:inicio + batch_size]
+
+                self.cursor.execute("TRUNCATE TABLE #TarefasDocumentadasStaging")
+                self.cursor.executemany(
+                    "INSERT INTO #TarefasDocumentadasStaging (NumeroTarefa, ArquivoMD) VALUES (?, ?)",
+                    lote
+                )
+                self.cursor.execute(merge_query)
+                inseridas = {str(row[0]) for row in self.cursor.fetchall()}
+
+                for numero, _ in lote:
+                    if numero in inseridas:
+                        resultado['registradas'].append(numero)
+                    else:
+                        resultado['conflitos'].append(numero)
+
+            self.cursor.execute("DROP TABLE #TarefasDocumentadasStaging")
+            self._commit()
+            metrics.count('db.tarefas_registradas', len(resultado['registradas']))
+
+        except self.errors as e:
+            self.connection.rollback()
+            raise Exception(f"Erro ao registrar tarefas em lote: {e}")
+
+        finally:
+            self.cursor.fast_executemany = False
+
+        print(
+            f"Registro em lote concluído. {len(resultado['registradas'])} registrada(s), "
+            f"{len(resultado['conflitos'])} conflito(s).",
+            file=sys.stderr
+        )
+        return resultado
 
     def __enter__(self):
         """Suporte para context manager (with statement)"""
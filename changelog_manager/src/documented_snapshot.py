@@ -0,0 +1,125 @@
+"""
+Módulo de snapshot das tarefas documentadas
+Mantém em memória o conjunto de TSK_TarefasDocumentadas nos processos de
+longa duração (modo servidor e --modo watch), atualizado de forma
+incremental pela coluna DataExportacao
+"""
+import sys
+import threading
+from config import config
+
+
+class DocumentedSnapshot:
+    """Cópia em memória dos números de tarefas já documentadas"""
+
+    def __init__(self, database=None):
+        """
+        Inicializa o snapshot (a carga acontece no primeiro refresh ou uso)
+
+        Args:
+            database (optional): Instância conectada de Database usada quando
+                                 nenhuma conexão é informada a load/refresh
+                                 (no modo servidor, cada requisição informa a
+                                 conexão emprestada do pool)
+        """
+        self.db = database
+        self.tarefas = set()
+        self.watermark = None
+        self.loaded = False
+
+        # O servidor atende requisições em threads que compartilham o snapshot
+        self._lock = threading.Lock()
+
+    def load(self, database=None):
+        """
+        Carrega a tabela de documentadas inteira (uma única consulta)
+
+        Args:
+            database (optional): Conexão a usar (padrão: a informada no construtor)
+        """
+        with self._lock:
+            self._load(database or self.db)
+
+    def _load(self, database):
+        """Carga completa (chamada com o lock adquirido)"""
+        table_name = config.db_table_documentadas
+        rows = database.execute_query(
+            f"SELECT NumeroTarefa, DataExportacao FROM {table_name}"
+        )
+
+        self.tarefas = {str(row['NumeroTarefa']) for row in rows}
+        self.watermark = max((row['DataExportacao'] for row in rows), default=None)
+        self.loaded = True
+        print(f"Snapshot de tarefas documentadas carregado: {len(self.tarefas)} tarefa(s)",
+              file=sys.stderr)
+
+    def refresh(self, database=None):
+        """
+        Atualiza o snapshot trazendo apenas as linhas novas
+
+        Usa MAX(DataExportacao) como marca d'água. Se a quantidade de linhas
+        no banco divergir do snapshot (ex: registros removidos para
+        re-documentar), recarrega a tabela inteira.
+
+        Args:
+            database (optional): Conexão a usar (padrão: a informada no construtor)
+        """
+        database = database or self.db
+        with self._lock:
+            if not self.loaded:
+                self._load(database)
+                return
+
+            table_name = config.db_table_documentadas
+            estado = database.execute_query(
+                f"SELECT COUNT(*) AS Total, MAX(DataExportacao) AS Ultima FROM {table_name}"
+            )[0]
+
+            ultima = estado['Ultima']
+            if ultima is not None and (self.watermark is None or ultima > self.watermark):
+                # >= para não perder linhas gravadas no mesmo instante da marca d'água
+                if self.watermark is None:
+                    rows = database.execute_query(f"SELECT NumeroTarefa, DataExportacao FROM {table_name}")
+                else:
+                    rows = database.execute_query(
+                        f"SELECT NumeroTarefa, DataExportacao FROM {table_name} "
+                        f"WHERE DataExportacao >= ?",
+                        [self.watermark]
+                    )
+                self.tarefas.update(str(row['NumeroTarefa']) for row in rows)
+                self.watermark = ultima
+
+            if estado['Total'] != len(self.tarefas):
+                self._load(database)
+
+    def add(self, task_ids):
+        """
+        Inclui tarefas recém-registradas sem consultar o banco
+
+        Args:
+            task_ids (iterable): IDs registrados nesta sessão
+        """
+        with self._lock:
+            self.tarefas.update(str(task_id) for task_id in task_ids)
+
+    def documented_subset(self, task_ids):
+        """
+        Retorna quais das tarefas informadas já estão documentadas (sem consultar o banco)
+
+        Args:
+            task_ids (iterable): IDs das tarefas
+
+        Returns:
+            set: IDs (str) que já foram documentados
+        """
+        if not self.loaded:
+            self.load()
+        with self._lock:
+            return {str(task_id) for task_id in task_ids} & self.tarefas
+
+    def __contains__(self, task_id):
+        """Permite usar 'task_id in snapshot'"""
+        if not self.loaded:
+            self.load()
+        with self._lock:
+            return str(task_id) in self.tarefas
@@ -0,0 +1,188 @@
+"""
+Módulo do diário (journal) da extração paginada
+Arquivo local, apenas de acréscimo, com os registros de cada página lida do
+banco e a situação do registro das tarefas, permitindo retomar (--resume) uma
+extração interrompida a partir da última página confirmada
+"""
+import os
+import re
+import sys
+import json
+from pathlib import Path
+from config import config
+from records import record_type
+
+
+class ExtractionJournal:
+    """
+    Diário de uma extração paginada (NDJSON, uma entrada por linha)
+
+    Entradas, na ordem em que são gravadas:
+        {"tipo": "inicio", ...parâmetros da extração}
+        {"tipo": "pagina", "pagina": n, "ultimaTarefa": id, "colunas": [...], "linhas": [[...]]}
+        {"tipo": "registro", "pagina": n, "tarefas": k}
+
+    Cada entrada é gravada com fsync; uma página só é considerada confirmada
+    quando a linha inteira chegou ao disco.
+    """
+
+    def __init__(self, chave, journal_dir=None):
+        """
+        Inicializa o diário (o arquivo só é criado em start)
+
+        Args:
+            chave (str): Identificação da extração (ex: "ciclo_124_09.91.47.20")
+            journal_dir (str, optional): Diretório dos diários (padrão: EXTRACAO_JOURNAL_DIR)
+        """
+        nome = re.sub(r'[^\w.-]', '_', chave)
+        self.path = Path(journal_dir or config.journal_dir) / f"{nome}.jsonl"
+        self.cabecalho = None
+        self.paginas = []
+        self.registradas = set()
+
+    @staticmethod
+    def key(args):
+        """Chave do diário para os argumentos de uma execução no modo ciclo"""
+        return f"ciclo_{args.ciclos[0]}_{args.versao}"
+
+    def exists(self):
+        """Indica se há uma extração interrompida com esta chave"""
+        return self.path.exists()
+
+    def start(self, cabecalho):
+        """
+        Inicia um diário novo (descarta qualquer conteúdo anterior)
+
+        Args:
+            cabecalho (dict): Parâmetros da extração (ciclo, versão, tamanho da página...)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(b'')
+        self.cabecalho = cabecalho
+        self.paginas = []
+        self.registradas = set()
+        self._append({'tipo': 'inicio', **cabecalho})
+
+    def load(self):
+        """
+        Lê o diário de uma extração interrompida
+
+        Uma última linha incompleta (queda durante a gravação) é descartada e
+        removida do arquivo; a página correspondente será lida novamente.
+
+        Raises:
+            Exception: Se o diário não existir ou não tiver cabeçalho
+        """
+        if not self.path.exists():
+            raise Exception(f"Nenhuma extração interrompida encontrada ({self.path})")
+
+        self.cabecalho = None
+        self.paginas = []
+        self.registradas = set()
+        confirmado = 0
+
+        with open(self.path, 'rb') as f:
+            for linha in f:
+                try:
+                    entrada = json.loads(linha)
+                except ValueError:
+                    break
+                if not linha.endswith(b'\n'):
+                    break
+                confirmado += len(linha)
+
+                tipo = entrada.pop('tipo')
+                if tipo == 'inicio':
+                    self.cabecalho = entrada
+                elif tipo == 'pagina':
+                    self.paginas.append((entrada['pagina'], entrada['ultimaTarefa'], len(entrada['linhas'])))
+                elif tipo == 'registro':
+                    self.registradas.add(entrada['pagina'])
+
+        if self.cabecalho is None:
+            raise Exception(f"Diário de extração sem cabeçalho: {self.path}")
+
+        if confirmado < self.path.stat().st_size:
+            print("AVISO: Última entrada do diário incompleta; a página será lida novamente",
+                  file=sys.stderr)
+            with open(self.path, 'r+b') as f:
+                f.truncate(confirmado)
+
+    @property
+    def ultima_tarefa(self):
+        """Maior Tarefaid já confirmado (0 se nenhuma página foi gravada)"""
+        return self.paginas[-1][1] if self.paginas else 0
+
+    @property
+    def total(self):
+        """Quantidade de registros nas páginas confirmadas"""
+        return sum(quantidade for _, _, quantidade in self.paginas)
+
+    def pending_registration(self):
+        """Páginas confirmadas cujas tarefas ainda não foram registradas"""
+        return [pagina for pagina, _, _ in self.paginas if pagina not in self.registradas]
+
+    def append_page(self, registros, ultima_tarefa):
+        """
+        Confirma uma página lida do banco
+
+        Args:
+            registros (list): Registros normalizados da página (Record)
+            ultima_tarefa (int): Maior Tarefaid da página (próxima chave)
+
+        Returns:
+            int: Número da página
+        """
+        pagina = self.paginas[-1][0] + 1 if self.paginas else 1
+        self._append({
+            'tipo': 'pagina',
+            'pagina': pagina,
+            'ultimaTarefa': ultima_tarefa,
+            'colunas': list(registros[0]._fields),
+            'linhas': [list(registro) for registro in registros],
+        })
+        self.paginas.append((pagina, ultima_tarefa, len(registros)))
+        return pagina
+
+    def mark_registered(self, pagina, tarefas):
+        """
+        Confirma o registro das tarefas de uma página
+
+        Args:
+            pagina (int): Número da página
+            tarefas (int): Quantidade de tarefas enviadas ao registro
+        """
+        self._append({'tipo': 'registro', 'pagina': pagina, 'tarefas': tarefas})
+        self.registradas.add(pagina)
+
+    def iter_records(self, paginas=None):
+        """
+        Registros gravados, página por página (sem carregar o diário inteiro)
+
+        Args:
+            paginas (set, optional): Apenas estas páginas (padrão: todas)
+
+        Yields:
+            Record: Registros na ordem em que foram lidos do banco
+        """
+        with open(self.path, 'rb') as f:
+            for linha in f:
+                entrada = json.loads(linha)
+                if entrada['tipo'] != 'pagina':
+                    continue
+                if paginas is not None and entrada['pagina'] not in paginas:
+                    continue
+                tipo = record_type(tuple(entrada['colunas']))
+                yield from map(tipo._make, entrada['linhas'])
+
+    def remove(self):
+        """Remove o diário de uma extração concluída"""
+        if self.path.exists():
+            self.path.unlink()
+
+    def _append(self, entrada):
+        """Acrescenta uma entrada e só retorna depois que ela está em disco"""
+        with open(self.path, 'ab') as f:
+            f.write(json.dumps(entrada, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
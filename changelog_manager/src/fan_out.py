@@ -0,0 +1,83 @@
+"""
+Módulo da consulta em vários bancos (--databases)
+Executa a mesma operação em bancos com o mesmo esquema (um por portal de
+cliente) ao mesmo tempo, com uma conexão por banco e tempo limite por banco:
+a duração total fica próxima à do banco mais lento, e não à soma de todos
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class FanOut:
+    """Executa uma função em vários perfis de conexão, em paralelo"""
+
+    def __init__(self, perfis, timeout, factory=None):
+        """
+        Inicializa a execução em vários bancos
+
+        Args:
+            perfis (list): Nomes dos perfis de conexão (DB_PROFILES)
+            timeout (int): Segundos máximos por banco (conexão + operação)
+            factory (callable, optional): Cria a conexão de um perfil
+                                          (padrão: Database(perfil, timeout))
+        """
+        self.perfis = list(perfis)
+        self.timeout = timeout
+        self.factory = factory or self._database
+
+    def _database(self, perfil):
+        """Conexão SQL Server do perfil, com o tempo limite aplicado a cada consulta"""
+        from database import Database
+        return Database(perfil, timeout=self.timeout)
+
+    def run(self, operacao):
+        """
+        Executa operacao(db, perfil) em todos os bancos ao mesmo tempo
+
+        Cada banco tem a sua própria thread e a sua própria conexão. Bancos
+        que não terminam dentro do tempo limite são dados como falha sem
+        atrasar os demais; a thread deles é encerrada pelo tempo limite da
+        consulta (Database.timeout).
+
+        Args:
+            operacao (callable): Recebe (db conectado, perfil) e retorna o resultado
+
+        Returns:
+            dict: {perfil: {'resultado', 'segundos'} ou {'erro'}}, na ordem dos perfis
+        """
+        def executar(perfil):
+            inicio = time.perf_counter()
+            with self.factory(perfil) as db:
+                resultado = operacao(db, perfil)
+            return resultado, time.perf_counter() - inicio
+
+        # Uma thread por banco: todos começam juntos, então um único prazo vale para cada um
+        pool = ThreadPoolExecutor(max_workers=len(self.perfis), thread_name_prefix='fan-out')
+        futuros = {}
+        try:
+            futuros = {perfil: pool.submit(executar, perfil) for perfil in self.perfis}
+            wait(futuros.values(), timeout=self.timeout)
+        finally:
+            # shutdown(cancel_futures=True) só existe a partir do Python 3.9
+            for futuro in futuros.values():
+                futuro.cancel()
+            pool.shutdown(wait=False)
+
+        resultados = {}
+        for perfil, futuro in futuros.items():
+            if not futuro.done():
+                resultados[perfil] = {'erro': f"sem resposta em {self.timeout}s"}
+                continue
+            try:
+                resultado, segundos = futuro.result()
+            except Exception as e:
+                resultados[perfil] = {'erro': str(e)}
+            else:
+                resultados[perfil] = {'resultado': resultado, 'segundos': segundos}
+
+        for perfil, situacao in resultados.items():
+            if 'erro' in situacao:
+                print(f"  {perfil}: ERRO - {situacao['erro']}", file=sys.stderr)
+
+        return resultados
@@ -0,0 +1,69 @@
+"""
+Módulo de utilitários de arquivo compartilhados
+Gravação atômica, nomes de diretório de sistema, diretórios da raiz que
+não são sistemas e o número da tarefa nos changelogs, usados pela geração
+do JSON, dos changelogs em Markdown, dos índices da documentação e pela
+normalização dos registros
+"""
+import os
+import re
+import tempfile
+
+
+# Permissões de arquivos novos (mkstemp cria com 0600); lida uma vez, pois
+# os.umask altera o processo inteiro e as escritas acontecem em threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Diretórios da raiz que não são sistemas
+IGNORED_DIRS = {'changelog_manager', 'node_modules', 'search'}
+
+# Número da tarefa em um changelog publicado: "Tarefa: 12345",
+# "Solicitação: 4657 | Tarefa: 16330" ou "**Número da Tarefa:** 16116"
+TAREFA_DOCUMENTADA = re.compile(r'\bTarefa:\**\s*(\d+)')
+
+# Caracteres não permitidos em nomes de diretório
+_NOME_INVALIDO = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+def atomic_write(destino, conteudo):
+    """
+    Grava o arquivo por completo ou não grava: escreve em um temporário no
+    mesmo diretório e renomeia sobre o destino
+
+    Args:
+        destino (Path): Arquivo de destino
+        conteudo (str | bytes): Texto a gravar (UTF-8, quebras de linha '\\n') ou bytes
+    """
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=destino.parent, prefix=f".{destino.name}.", suffix='.tmp')
+
+    try:
+        if isinstance(conteudo, bytes):
+            abrir = {'mode': 'wb'}
+        else:
+            abrir = {'mode': 'w', 'encoding': 'utf-8', 'newline': '\n'}
+        with os.fdopen(fd, **abrir) as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        modo = destino.stat().st_mode & 0o777 if destino.exists() else 0o666 & ~_UMASK
+        os.chmod(temporario, modo)
+        os.replace(temporario, destino)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def system_dirname(sistema):
+    """
+    Nome do diretório de um sistema (sem espaços nas pontas e sem caracteres inválidos)
+
+    Args:
+        sistema (str): Nome do sistema
+
+    Returns:
+        str: Nome do diretório
+    """
+    return _NOME_INVALIDO.sub('_', str(sistema).strip()) or 'SemSistema'
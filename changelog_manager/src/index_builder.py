@@ -0,0 +1,345 @@
+"""
+Módulo de atualização dos índices da documentação
+Regenera _sidebar.md e as tabelas "Última versão" do README.md da raiz a
+partir dos diretórios de sistema, reprocessando apenas os que mudaram
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+from urllib.parse import quote
+from file_utils import IGNORED_DIRS, atomic_write
+
+
+# Arquivo de changelog: {versao}.md, com a versão em números separados por ponto
+_VERSION_FILE = re.compile(r'^(\d+(?:\.\d+)+)\.md$')
+
+# Seção de um sistema no _sidebar.md: **Sistema** seguido da lista de versões
+_SIDEBAR_SECTION = re.compile(r'^\*\*(?P<sistema>[^*\n]+)\*\*\n\n(?P<itens>(?:- \[.*\n?)*)', re.MULTILINE)
+
+# Linha das tabelas do README: | [Sistema](Sistema/versao.md) | Descrição | versao |
+# (o destino do link pode estar codificado, ex: ITOTEM%20V2/versao.md)
+_README_ROW = re.compile(
+    r'^\| \[(?P<sistema>[^\]]+)\]\([^)]*\.md\) \| (?P<descricao>.*?) \| [^|]* \|$',
+    re.MULTILINE
+)
+
+
+def markdown_link(sistema, versao):
+    """
+    Destino de link Markdown para o changelog de uma versão
+
+    Nomes de sistema com espaço ou acento (ex: "ITOTEM V2") são codificados
+    (ITOTEM%20V2/...): um destino com espaço não é reconhecido como link.
+    """
+    return quote(f"{sistema}/{versao}.md")
+
+
+def version_key(versao):
+    """
+    Chave de ordenação numérica de uma versão
+
+    Compara cada parte como número, de modo que "9.90.45.44" fica antes de
+    "09.91.47.00" e "09.92.48.11" depois de "09.92.48.00".
+
+    Args:
+        versao (str): Versão (ex: "09.91.47.00")
+
+    Returns:
+        tuple: Partes da versão como inteiros
+    """
+    return tuple(int(parte) for parte in versao.split('.'))
+
+
+def changelog_files(docs_dir):
+    """
+    Arquivos de changelog dos diretórios de sistema
+
+    Args:
+        docs_dir (Path): Raiz dos changelogs
+
+    Yields:
+        tuple: (sistema, versao, Path do arquivo)
+    """
+    for diretorio in os.scandir(docs_dir):
+        if not diretorio.is_dir() or diretorio.name.startswith('.') or diretorio.name in IGNORED_DIRS:
+            continue
+        for entrada in os.scandir(diretorio.path):
+            match = _VERSION_FILE.match(entrada.name)
+            if match and entrada.is_file():
+                yield diretorio.name, match.group(1), Path(entrada.path)
+
+
+def file_hash(path):
+    """
+    SHA-256 do conteúdo de um arquivo
+
+    Args:
+        path (Path): Arquivo
+
+    Returns:
+        str: Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(65536), b''):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+class IndexBuilder:
+    """Mantém _sidebar.md e README.md em dia com os arquivos de changelog"""
+
+    def __init__(self, docs_dir=None, manifest_path=None):
+        """
+        Inicializa o construtor de índices
+
+        Args:
+            docs_dir (str, optional): Raiz dos changelogs (padrão: raiz do repositório)
+            manifest_path (str, optional): Arquivo do manifesto
+                                           (padrão: changelog_manager/indice_manifest.json)
+        """
+        if docs_dir:
+            self.docs_dir = Path(docs_dir)
+        else:
+            self.docs_dir = Path(__file__).parent.parent.parent
+
+        if manifest_path:
+            self.manifest_path = Path(manifest_path)
+        else:
+            self.manifest_path = Path(__file__).parent.parent / 'indice_manifest.json'
+
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        """
+        Lê o manifesto da última execução
+
+        Retorna um manifesto vazio se o arquivo não existir, estiver
+        corrompido ou tiver sido gerado para outro diretório de documentação.
+        """
+        vazio = {'docs_dir': str(self.docs_dir.resolve()), 'sistemas': {}}
+        if not self.manifest_path.exists():
+            return vazio
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            print(f"AVISO: Manifesto inválido, reconstruindo: {self.manifest_path}", file=sys.stderr)
+            return vazio
+
+        if manifest.get('docs_dir') != vazio['docs_dir']:
+            return vazio
+        manifest.setdefault('sistemas', {})
+        return manifest
+
+    def save_manifest(self):
+        """Grava o manifesto"""
+        atomic_write(self.manifest_path, json.dumps(self.manifest, ensure_ascii=False, indent=2))
+
+    def scan(self, check_files=False):
+        """
+        Atualiza o manifesto com os diretórios de sistema
+
+        Só lista o conteúdo dos diretórios cujo mtime mudou desde a última
+        execução; nesses, só recalcula o hash dos arquivos com mtime ou
+        tamanho diferentes.
+
+        Args:
+            check_files (bool): Se True, também compara o mtime de cada arquivo
+                                (detecta edições que não alteram o diretório)
+
+        Returns:
+            tuple: (alterados, removidos) - nomes dos sistemas
+        """
+        anteriores = self.manifest['sistemas']
+        atuais = {}
+        alterados = []
+
+        for entrada in os.scandir(self.docs_dir):
+            if not entrada.is_dir() or entrada.name.startswith('.') or entrada.name in IGNORED_DIRS:
+                continue
+
+            mtime = entrada.stat().st_mtime
+            anterior = anteriores.get(entrada.name)
+            if anterior is not None and anterior['mtime'] == mtime and not check_files:
+                atuais[entrada.name] = anterior
+                continue
+
+            arquivos = self._scan_system(Path(entrada.path), anterior['arquivos'] if anterior else {})
+            if not arquivos:
+                continue
+
+            atuais[entrada.name] = {'mtime': mtime, 'arquivos': arquivos}
+            if anterior is None or anterior['arquivos'] != arquivos:
+                alterados.append(entrada.name)
+
+        removidos = [sistema for sistema in anteriores if sistema not in atuais]
+        self.manifest['sistemas'] = atuais
+        return alterados, removidos
+
+    @staticmethod
+    def _scan_system(diretorio, anteriores):
+        """Arquivos de versão de um diretório: {nome: {'mtime', 'tamanho', 'hash'}}"""
+        arquivos = {}
+
+        for entrada in os.scandir(diretorio):
+            if not entrada.is_file() or not _VERSION_FILE.match(entrada.name):
+                continue
+
+            stat = entrada.stat()
+            anterior = anteriores.get(entrada.name)
+            if anterior and anterior['mtime'] == stat.st_mtime and anterior['tamanho'] == stat.st_size:
+                arquivos[entrada.name] = anterior
+            else:
+                arquivos[entrada.name] = {
+                    'mtime': stat.st_mtime,
+                    'tamanho': stat.st_size,
+                    'hash': file_hash(Path(entrada.path))
+                }
+
+        return arquivos
+
+    def versions(self, sistema):
+        """
+        Versões de um sistema, da mais recente para a mais antiga
+
+        Args:
+            sistema (str): Nome do diretório do sistema
+
+        Returns:
+            list: Versões (str)
+        """
+        nomes = self.manifest['sistemas'].get(sistema, {}).get('arquivos', {})
+        versoes = [_VERSION_FILE.match(nome).group(1) for nome in nomes]
+        return sorted(versoes, key=version_key, reverse=True)
+
+    def build(self, force=False):
+        """
+        Atualiza _sidebar.md e README.md para os sistemas alterados
+
+        Args:
+            force (bool): Se True, regenera todos os sistemas (ignora o manifesto)
+
+        Returns:
+            list: Sistemas alterados ou removidos
+        """
+        if force:
+            self.manifest['sistemas'] = {}
+
+        alterados, removidos = self.scan()
+        mudancas = alterados + removidos
+
+        if mudancas:
+            self._update_file('_sidebar.md', self.update_sidebar, alterados, removidos)
+            self._update_file('README.md', self.update_readme, alterados, removidos)
+            for sistema in mudancas:
+                print(f"  Índices atualizados: {sistema}", file=sys.stderr)
+        else:
+            print("Índices já estão atualizados.", file=sys.stderr)
+
+        self.save_manifest()
+        return mudancas
+
+    def _update_file(self, nome, atualizar, alterados, removidos):
+        """Aplica a atualização ao arquivo e grava apenas se o conteúdo mudou"""
+        caminho = self.docs_dir / nome
+        if not caminho.exists():
+            print(f"AVISO: {nome} não encontrado em {self.docs_dir}", file=sys.stderr)
+            return
+
+        with open(caminho, 'r', encoding='utf-8') as f:
+            original = f.read()
+
+        conteudo = atualizar(original, alterados, removidos)
+        if conteudo != original:
+            atomic_write(caminho, conteudo)
+
+    def sidebar_section(self, sistema):
+        """Seção de um sistema no _sidebar.md"""
+        itens = ''.join(
+            f"- [{versao}]({markdown_link(sistema, versao)})\n" for versao in self.versions(sistema)
+        )
+        return f"**{sistema}**\n\n{itens}"
+
+    def update_sidebar(self, conteudo, alterados, removidos):
+        """
+        Reescreve no _sidebar.md apenas as seções dos sistemas informados
+
+        Sistemas novos entram no final; a ordem das seções existentes é mantida.
+
+        Args:
+            conteudo (str): Conteúdo atual do _sidebar.md
+            alterados (list): Sistemas a regenerar
+            removidos (list): Sistemas a retirar
+
+        Returns:
+            str: Novo conteúdo
+        """
+        pendentes = set(alterados)
+
+        def substituir(match):
+            sistema = match.group('sistema')
+            if sistema in removidos:
+                return ''
+            if sistema in pendentes:
+                pendentes.discard(sistema)
+                return self.sidebar_section(sistema)
+            return match.group(0)
+
+        conteudo = _SIDEBAR_SECTION.sub(substituir, conteudo)
+        conteudo = re.sub(r'\n{3,}', '\n\n', conteudo)
+
+        for sistema in alterados:
+            if sistema in pendentes:
+                conteudo = f"{conteudo.rstrip()}\n\n{self.sidebar_section(sistema)}"
+
+        return conteudo.rstrip('\n') + '\n'
+
+    def update_readme(self, conteudo, alterados, removidos):
+        """
+        Atualiza a coluna "Última versão" (e o link) dos sistemas informados
+
+        Sistemas sem linha nas tabelas do README entram na tabela "Outros".
+
+        Args:
+            conteudo (str): Conteúdo atual do README.md
+            alterados (list): Sistemas a atualizar
+            removidos (list): Sistemas a retirar
+
+        Returns:
+            str: Novo conteúdo
+        """
+        pendentes = set(alterados)
+
+        def substituir(match):
+            sistema = match.group('sistema')
+            if sistema in removidos:
+                return '\x00'
+            if sistema in pendentes:
+                pendentes.discard(sistema)
+                return self._readme_row(sistema, match.group('descricao'))
+            return match.group(0)
+
+        conteudo = _README_ROW.sub(substituir, conteudo).replace('\x00\n', '').replace('\x00', '')
+
+        novos = [sistema for sistema in alterados if sistema in pendentes]
+        if novos:
+            linhas = ''.join(f"{self._readme_row(sistema, '')}\n" for sistema in novos)
+            if '### Outros\n' in conteudo:
+                conteudo = f"{conteudo.rstrip()}\n{linhas}"
+            else:
+                conteudo = (
+                    f"{conteudo.rstrip()}\n\n### Outros\n\n"
+                    f"| Sistema | Descrição | Última versão |\n|---|---|---|\n{linhas}"
+                )
+
+        return conteudo
+
+    def _readme_row(self, sistema, descricao):
+        """Linha da tabela do README com a versão mais recente do sistema"""
+        ultima = self.versions(sistema)[0]
+        return f"| [{sistema}]({markdown_link(sistema, ultima)}) | {descricao} | {ultima} |"
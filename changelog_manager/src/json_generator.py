@@ -1,9 +1,33 @@
 """
 Módulo para gerar arquivo JSON estruturado a partir dos resultados do banco
 """
+import io
+import os
 import json
 import sys
+import struct
+import hashlib
+import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from file_utils import atomic_write, system_dirname
+from records import Record
+from metrics import metrics
+
+
+# Formatos de saída aceitos por --format
+FORMATOS = ('json', 'ndjson', 'binary')
+
+# Assinatura do formato binário, seguida de registros [tamanho uint32 big-endian][JSON UTF-8]
+BINARY_MAGIC = b'CLGB\x01'
+_TAMANHO = struct.Struct('>I')
+
+# Tamanho dos blocos lidos de arquivos grandes: caracteres de um JSON indentado
+# (read_novidades) ou bytes de um shard (stream_system_shards)
+BLOCO_JSON = 1024 * 1024
+
+# Extensão dos arquivos de shard por formato
+EXTENSOES = {'json': '.json', 'ndjson': '.ndjson', 'binary': '.bin'}
 
 
 class JsonGenerator:
@@ -23,7 +47,7 @@ class JsonGenerator:
             # Diretório padrão: raiz do projeto
             self.output_dir = Path(__file__).parent.parent
 
-    def generate_json(self, versao, data_results, modo='ciclo', output_filename=None):
+    def generate_json(self, versao, data_results, modo='ciclo', output_filename=None, formato='json'):
         """
         Gera JSON estruturado (retorna dados, opcionalmente salva arquivo)
 
@@ -33,6 +57,7 @@ class JsonGenerator:
             modo (str): Modo de operação ('ciclo' ou 'tarefa')
             output_filename (str, optional): Nome do arquivo de saída.
                                             Se None, não salva arquivo (apenas retorna dados)
+            formato (str): Formato do arquivo salvo ('json', 'ndjson' ou 'binary')
 
         Returns:
             dict: Estrutura JSON gerada
@@ -52,17 +77,562 @@ class JsonGenerator:
                 ...
             ]
         """
+        with metrics.stage('json.gerar'):
+            novidades = list(self.iter_novidades(data_results))
+
+        # Estrutura final do JSON
+        output_data = {
+            'versao': versao,
+            'modo': modo,
+            'novidades': novidades
+        }
+
+        self._save_json(output_data, output_filename, len(novidades), formato)
+
+        return output_data
+
+    def generate_cycles_json(self, versoes, data_results, output_filename=None, formato='json'):
+        """
+        Gera um único JSON para vários ciclos, agrupado por ciclo
+
+        Args:
+            versoes (dict): Versão de cada ciclo ({124: "09.91.47.20", ...})
+            data_results (list): Registros do banco, com a coluna 'CicloId'
+            output_filename (str, optional): Nome do arquivo de saída
+            formato (str): Formato do arquivo salvo ('json', 'ndjson' ou 'binary')
+
+        Returns:
+            dict: {'modo': 'ciclo', 'ciclos': {'124': {'versao': ..., 'novidades': [...]}}}
+        """
+        with metrics.stage('json.gerar'):
+            registros_por_ciclo = {str(ciclo): [] for ciclo in versoes}
+            for record in data_results:
+                ciclo = str(record.get('CicloId'))
+                if ciclo not in registros_por_ciclo:
+                    print(f"AVISO: Registro de ciclo não solicitado ({ciclo}). Ignorando registro.",
+                          file=sys.stderr)
+                    continue
+                registros_por_ciclo[ciclo].append(record)
+
+            ciclos = {}
+            total = 0
+            for ciclo, versao in versoes.items():
+                novidades = list(self.iter_novidades(registros_por_ciclo[str(ciclo)]))
+                ciclos[str(ciclo)] = {'versao': versao, 'novidades': novidades}
+                total += len(novidades)
+
+        output_data = {
+            'modo': 'ciclo',
+            'ciclos': ciclos
+        }
+
+        self._save_json(output_data, output_filename, total, formato)
+
+        return output_data
+
+    def merge_json(self, versao, partes, modo='ciclo', output_filename=None, formato='json'):
+        """
+        Gera um único JSON com as novidades de vários bancos (--databases)
+
+        As novidades seguem a ordem dos bancos informada em partes e cada uma
+        recebe o campo 'origem' com o nome do perfil de conexão.
+
+        Args:
+            versao (str): Versão do changelog
+            partes (dict): {perfil: novidades} (novidades de iter_novidades)
+            modo (str): Modo de operação ('ciclo' ou 'tarefa')
+            output_filename (str, optional): Nome do arquivo de saída
+            formato (str): Formato do arquivo salvo ('json', 'ndjson' ou 'binary')
+
+        Returns:
+            dict: Estrutura JSON gerada (mesmo formato de generate_json)
+        """
+        with metrics.stage('json.gerar'):
+            novidades = [
+                {**novidade, 'origem': origem}
+                for origem, itens in partes.items()
+                for novidade in itens
+            ]
+
+        output_data = {
+            'versao': versao,
+            'modo': modo,
+            'novidades': novidades
+        }
+
+        self._save_json(output_data, output_filename, len(novidades), formato)
+
+        return output_data
+
+    def save_json(self, output_data, output_filename=None, formato='json'):
+        """
+        Salva um documento já montado (ex: vindo do cache de saída)
+
+        Args:
+            output_data (dict): Documento no formato de generate_json/generate_cycles_json
+            output_filename (str, optional): Nome do arquivo de saída (None = apenas registra o total)
+            formato (str): Formato do arquivo salvo ('json', 'ndjson' ou 'binary')
+        """
+        total = sum(1 for registro in self.document_records(output_data) if 'modo' not in registro)
+        self._save_json(output_data, output_filename, total, formato)
+
+    def _save_json(self, output_data, output_filename, total, formato='json'):
+        """Salva o JSON em arquivo (se solicitado) e registra o total em stderr"""
+        # Salva o arquivo JSON apenas se output_filename for fornecido
+        if output_filename:
+            output_path = self.output_dir / output_filename
+            with open(output_path, 'wb') as f:
+                self.write_document(f, output_data, formato)
+
+            print(f"\nJSON gerado com sucesso: {output_path}", file=sys.stderr)
+            print(f"Total de novidades: {total}", file=sys.stderr)
+        else:
+            # Modo stdout: apenas log em stderr
+            print(f"Total de novidades: {total}", file=sys.stderr)
+
+    @staticmethod
+    def document_records(output_data):
+        """
+        Decompõe o documento em registros: cabeçalho(s) seguido(s) das novidades
+
+        O cabeçalho tem 'versao' e 'modo' (e 'ciclo' no JSON de vários ciclos,
+        com um cabeçalho antes das novidades de cada ciclo).
+
+        Args:
+            output_data (dict): Documento no formato de generate_json/generate_cycles_json
+
+        Yields:
+            dict: Cabeçalhos e novidades, na ordem de gravação
+        """
+        if 'ciclos' in output_data:
+            for ciclo, dados in output_data['ciclos'].items():
+                yield {'versao': dados['versao'], 'modo': output_data.get('modo'), 'ciclo': ciclo}
+                yield from dados['novidades']
+        else:
+            yield {'versao': output_data['versao'], 'modo': output_data.get('modo')}
+            yield from output_data['novidades']
+
+    def write_document(self, f, output_data, formato='json'):
+        """
+        Grava o documento no formato escolhido
+
+        Args:
+            f (file): Destino aberto em modo binário (ex: sys.stdout.buffer)
+            output_data (dict): Documento no formato de generate_json/generate_cycles_json
+            formato (str): 'json' (indentado), 'ndjson' ou 'binary'
+
+        Raises:
+            ValueError: Se o formato não for suportado
+        """
+        with metrics.stage('json.serializar'):
+            if formato == 'json':
+                dados = json.dumps(output_data, ensure_ascii=False, indent=2).encode('utf-8') + b'\n'
+                f.write(dados)
+                metrics.count('saida.bytes', len(dados))
+                return
+
+            self._check_format(formato)
+            total = 0
+            if formato == 'binary':
+                total += f.write(BINARY_MAGIC)
+            for registro in self.document_records(output_data):
+                dados = self.encode_record(registro, formato)
+                f.write(dados)
+                total += len(dados)
+            metrics.count('saida.bytes', total)
+
+    @staticmethod
+    def encode_record(registro, formato):
+        """
+        Serializa um registro (cabeçalho ou novidade) em JSON compacto
+
+        Args:
+            registro (dict): Cabeçalho ou novidade
+            formato (str): 'ndjson' (uma linha) ou 'binary' (prefixado pelo tamanho)
+
+        Returns:
+            bytes: Registro pronto para gravação
+        """
+        dados = json.dumps(registro, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if formato == 'binary':
+            return _TAMANHO.pack(len(dados)) + dados
+        return dados + b'\n'
+
+    @staticmethod
+    def encode_event(evento, formato):
+        """
+        Serializa um evento do modo watch
+
+        Args:
+            evento (dict): Evento com 'evento', 'ciclo', 'versao', 'marca' e 'novidades'
+            formato (str): 'json' (um documento indentado por evento), 'ndjson'
+                           (uma linha por evento) ou 'binary' (prefixado pelo tamanho)
+
+        Returns:
+            bytes: Evento pronto para gravação
+        """
+        if formato == 'json':
+            return json.dumps(evento, ensure_ascii=False, indent=2).encode('utf-8') + b'\n'
+        return JsonGenerator.encode_record(evento, formato)
+
+    @staticmethod
+    def _check_format(formato):
+        """Valida o nome do formato de saída"""
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de saída inválido: {formato} (use {', '.join(FORMATOS)})")
+
+    @staticmethod
+    def split_by_system(output_data):
+        """
+        Separa o documento em um documento por sistema, na ordem em que os sistemas aparecem
+
+        Cada parte mantém a estrutura original (simples ou agrupada por ciclo,
+        sem os ciclos em que o sistema não tem novidades).
+
+        Args:
+            output_data (dict): Documento no formato de generate_json/generate_cycles_json
+
+        Returns:
+            dict: {nome do diretório do sistema: documento}
+        """
+        partes = {}
+        if 'ciclos' in output_data:
+            for ciclo, dados in output_data['ciclos'].items():
+                for novidade in dados['novidades']:
+                    parte = partes.setdefault(
+                        system_dirname(novidade['sistema']),
+                        {'modo': output_data.get('modo'), 'ciclos': {}}
+                    )
+                    parte['ciclos'].setdefault(
+                        ciclo, {'versao': dados['versao'], 'novidades': []}
+                    )['novidades'].append(novidade)
+        else:
+            for novidade in output_data['novidades']:
+                partes.setdefault(
+                    system_dirname(novidade['sistema']),
+                    {'versao': output_data['versao'], 'modo': output_data.get('modo'), 'novidades': []}
+                )['novidades'].append(novidade)
+        return partes
+
+    def iter_shards(self, output_data, formato='json', max_workers=4):
+        """
+        Serializa os documentos de cada sistema em paralelo, entregando cada
+        um assim que fica pronto
+
+        Args:
+            output_data (dict): Documento completo
+            formato (str): 'json', 'ndjson' ou 'binary'
+            max_workers (int): Quantidade de sistemas serializados em paralelo
+
+        Yields:
+            tuple: (entrada do manifesto, conteúdo em bytes) - a entrada tem
+                   sistema, arquivo, novidades, bytes e sha256
+        """
+        self._check_format(formato)
+
+        def serializar(sistema, documento):
+            buffer = io.BytesIO()
+            self.write_document(buffer, documento, formato)
+            conteudo = buffer.getvalue()
+            entrada = {
+                'sistema': sistema,
+                'arquivo': f"{sistema}{EXTENSOES[formato]}",
+                'novidades': sum(1 for registro in self.document_records(documento) if 'modo' not in registro),
+                'bytes': len(conteudo),
+                'sha256': hashlib.sha256(conteudo).hexdigest(),
+            }
+            return entrada, conteudo
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futuros = [
+                pool.submit(serializar, sistema, documento)
+                for sistema, documento in self.split_by_system(output_data).items()
+            ]
+            for futuro in as_completed(futuros):
+                yield futuro.result()
+
+    def write_shards(self, output_data, output_dirname, formato='json'):
+        """
+        Grava um arquivo por sistema e o manifesto (manifest.json) em um diretório
+
+        Cada shard é gravado (de forma atômica) assim que fica pronto; o
+        manifesto é gravado por último, indicando que o conjunto está completo.
+
+        Args:
+            output_data (dict): Documento completo
+            output_dirname (str): Diretório de saída (relativo a output_dir)
+            formato (str): 'json', 'ndjson' ou 'binary'
+
+        Returns:
+            dict: Manifesto gravado
+        """
+        destino = self.output_dir / output_dirname
+        shards = []
+        for entrada, conteudo in self.iter_shards(output_data, formato):
+            atomic_write(destino / entrada['arquivo'], conteudo)
+            shards.append(entrada)
+            print(f"  Shard {entrada['arquivo']}: {entrada['novidades']} novidade(s)", file=sys.stderr)
+
+        manifesto = self._manifest(output_data, formato, shards)
+        atomic_write(destino / 'manifest.json', json.dumps(manifesto, ensure_ascii=False, indent=2) + '\n')
+        print(f"\nShards gerados com sucesso: {destino}", file=sys.stderr)
+        return manifesto
+
+    def stream_shards(self, f, output_data, formato='json'):
+        """
+        Escreve os documentos de cada sistema em f como quadros independentes
+
+        Cada quadro é uma linha JSON com a entrada do manifesto (sistema,
+        arquivo, novidades, bytes, sha256) seguida de exatamente 'bytes' bytes
+        do documento. A última linha é {"manifesto": {...}}.
+
+        Args:
+            f (file): Destino aberto em modo binário (ex: sys.stdout.buffer)
+            output_data (dict): Documento completo
+            formato (str): 'json', 'ndjson' ou 'binary'
+
+        Returns:
+            dict: Manifesto emitido
+        """
+        shards = []
+        for entrada, conteudo in self.iter_shards(output_data, formato):
+            f.write(self.encode_record(entrada, 'ndjson'))
+            f.write(conteudo)
+            f.flush()
+            shards.append(entrada)
+
+        manifesto = self._manifest(output_data, formato, shards)
+        f.write(self.encode_record({'manifesto': manifesto}, 'ndjson'))
+        f.flush()
+        return manifesto
+
+    def stream_system_shards(self, versao, data_results, modo='ciclo', output_dirname=None,
+                             stream=None, formato='json', ao_emitir=None):
+        """
+        Gera um documento por sistema à medida que os registros chegam (--stream --shard-by)
+
+        As novidades de cada sistema são acumuladas em um arquivo temporário
+        (uma por linha), e não em memória. Com output_dirname, o shard de um
+        sistema é gravado assim que o sistema muda na sequência dos registros
+        (consulta_tarefas_sistema.sql os ordena pelo prefixo de TrfNome); um
+        sistema que reaparece depois (ex: dois prefixos com o mesmo apelido)
+        tem o shard regravado no final, antes do manifesto. Sem
+        output_dirname, os quadros de stream_shards são escritos em stream
+        no final, já que um quadro emitido não pode ser refeito.
+
+        Args:
+            versao (str): Versão do changelog
+            data_results (iterable): Registros do banco (normalmente um gerador)
+            modo (str): Modo de operação ('ciclo' ou 'tarefa')
+            output_dirname (str, optional): Diretório de saída (relativo a output_dir)
+            stream (file, optional): Destino dos quadros sem diretório (padrão: stdout)
+            formato (str): 'json', 'ndjson' ou 'binary'
+            ao_emitir (callable, optional): Recebe cada novidade emitida (ex: para
+                                            o registro das tarefas)
+
+        Returns:
+            tuple: (manifesto, quantidade de novidades emitidas)
+        """
+        self._check_format(formato)
+        cabecalho = {'versao': versao, 'modo': modo}
+        destino = self.output_dir / output_dirname if output_dirname else None
+        if destino is not None:
+            destino.mkdir(parents=True, exist_ok=True)
+
+        contagens = {}
+        shards = {}
+        reabertos = {}
+        emitidas = 0
+        atual = None
+        spool = None
+
+        # No mesmo diretório dos shards, para que a troca pelo arquivo final seja atômica
+        with tempfile.TemporaryDirectory(prefix='.shards_', dir=destino) as tmp, \
+                metrics.stage('json.stream'):
+            tmp = Path(tmp)
+
+            def concluir(sistema):
+                entrada, caminho = self._spooled_shard(tmp, sistema, contagens[sistema], cabecalho, formato)
+                shards[sistema] = entrada
+                if destino is not None:
+                    os.replace(caminho, destino / entrada['arquivo'])
+                    print(f"  Shard {entrada['arquivo']}: {entrada['novidades']} novidade(s)", file=sys.stderr)
+
+            try:
+                for novidade in self.iter_novidades(data_results):
+                    sistema = system_dirname(novidade['sistema'])
+                    if sistema != atual:
+                        if spool is not None:
+                            spool.close()
+                            if destino is not None and atual not in reabertos:
+                                concluir(atual)
+                        if sistema in shards:
+                            reabertos[sistema] = True
+                        atual = sistema
+                        spool = open(tmp / f"{sistema}.spool", 'a', encoding='utf-8')
+                        contagens.setdefault(sistema, 0)
+
+                    spool.write(json.dumps(novidade, ensure_ascii=False))
+                    spool.write('\n')
+                    contagens[sistema] += 1
+                    emitidas += 1
+                    if ao_emitir is not None:
+                        ao_emitir(novidade)
+            finally:
+                if spool is not None:
+                    spool.close()
+
+            # Último sistema, sistemas que reapareceram e, sem diretório, todos
+            pendentes = [sistema for sistema in contagens
+                         if destino is None or sistema == atual or sistema in reabertos]
+            for sistema in pendentes:
+                concluir(sistema)
+
+            manifesto = self._manifest(cabecalho, formato, list(shards.values()))
+            if destino is not None:
+                atomic_write(destino / 'manifest.json', json.dumps(manifesto, ensure_ascii=False, indent=2) + '\n')
+                print(f"\nShards gerados com sucesso: {destino}", file=sys.stderr)
+            else:
+                f = stream or sys.stdout.buffer
+                for entrada in manifesto['shards']:
+                    f.write(self.encode_record(entrada, 'ndjson'))
+                    with open(tmp / entrada['arquivo'], 'rb') as conteudo:
+                        for bloco in iter(lambda: conteudo.read(BLOCO_JSON), b''):
+                            f.write(bloco)
+                    f.flush()
+                f.write(self.encode_record({'manifesto': manifesto}, 'ndjson'))
+                f.flush()
+
+        print(f"Total de novidades: {emitidas}", file=sys.stderr)
+        return manifesto, emitidas
+
+    def _spooled_shard(self, tmp, sistema, quantidade, cabecalho, formato):
+        """
+        Serializa o shard de um sistema a partir do seu arquivo temporário
+
+        Returns:
+            tuple: (entrada do manifesto, caminho do documento serializado em tmp)
+        """
+        caminho = tmp / f"{sistema}{EXTENSOES[formato]}"
+        with open(tmp / f"{sistema}.spool", 'r', encoding='utf-8') as spool:
+            novidades = (json.loads(linha) for linha in spool)
+            if formato == 'json':
+                with open(caminho, 'w', encoding='utf-8', newline='\n') as f:
+                    self._write_stream(f, cabecalho['versao'], cabecalho['modo'], novidades, flush=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                with open(caminho, 'wb') as f:
+                    self._write_records(f, cabecalho['versao'], cabecalho['modo'], novidades, formato,
+                                        flush=False)
+                    os.fsync(f.fileno())
+
+        sha256 = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(BLOCO_JSON), b''):
+                sha256.update(bloco)
+        entrada = {
+            'sistema': sistema,
+            'arquivo': caminho.name,
+            'novidades': quantidade,
+            'bytes': caminho.stat().st_size,
+            'sha256': sha256.hexdigest(),
+        }
+        return entrada, caminho
+
+    def read_shards(self, f):
+        """
+        Lê os quadros escritos por stream_shards
+
+        Args:
+            f (file): Origem aberta em modo binário (ex: sys.stdin.buffer)
+
+        Yields:
+            tuple: (entrada do manifesto, documento)
+
+        Raises:
+            ValueError: Se um quadro estiver truncado ou com checksum diferente
+        """
+        for linha in f:
+            if not linha.strip():
+                continue
+            entrada = json.loads(linha)
+            if 'manifesto' in entrada:
+                return
+
+            conteudo = f.read(entrada['bytes'])
+            if len(conteudo) != entrada['bytes'] or hashlib.sha256(conteudo).hexdigest() != entrada['sha256']:
+                raise ValueError(f"Shard inválido ou truncado: {entrada['arquivo']}")
+
+            formato = next(nome for nome, extensao in EXTENSOES.items() if entrada['arquivo'].endswith(extensao))
+            if formato == 'json':
+                yield entrada, json.loads(conteudo)
+            else:
+                yield entrada, self.assemble_document(
+                    self._iter_records(io.BytesIO(conteudo), formato, entrada['arquivo'])
+                )
+
+    def _manifest(self, output_data, formato, shards):
+        """Manifesto do conjunto de shards (ordenado por sistema)"""
+        manifesto = {'modo': output_data.get('modo'), 'formato': formato}
+        if 'ciclos' in output_data:
+            manifesto['ciclos'] = {ciclo: dados['versao'] for ciclo, dados in output_data['ciclos'].items()}
+        else:
+            manifesto['versao'] = output_data['versao']
+        manifesto['total'] = sum(entrada['novidades'] for entrada in shards)
+        manifesto['shards'] = sorted(shards, key=lambda entrada: entrada['sistema'])
+        return manifesto
+
+    def iter_novidades(self, data_results):
+        """
+        Normaliza os registros do banco em novidades, um a um
+
+        Para registros do tipo Record, as colunas obrigatórias são verificadas
+        uma única vez por tipo (conjunto de colunas do resultado), e não a cada
+        registro.
+
+        Args:
+            data_results (iterable): Registros do banco (lista ou gerador)
+
+        Yields:
+            dict: Novidade normalizada (sistema, resumo, detalhes, numeroTarefa)
+        """
         # Valida campos necessários
         required_fields = ['Sistema', 'Resumo', 'Detalhes']
 
-        novidades = []
+        # Tipo de Record -> posições (sistema, resumo, detalhes, numeroTarefa), ou None se inválido
+        layouts = {}
+
+        # Acesso posicional direto, sem passar pelo __getitem__ de Record
+        valor = tuple.__getitem__
+
         for idx, record in enumerate(data_results):
+            if isinstance(record, Record):
+                tipo = record.__class__
+                if tipo not in layouts:
+                    layouts[tipo] = self._record_layout(tipo, required_fields)
+                layout = layouts[tipo]
+                if layout is None:
+                    continue
+
+                sistema, resumo, detalhes, numero = layout
+                novidade = {
+                    'sistema': valor(record, sistema),
+                    'resumo': valor(record, resumo),
+                    'detalhes': valor(record, detalhes)
+                }
+                if numero is not None:
+                    novidade['numeroTarefa'] = valor(record, numero)
+                yield novidade
+                continue
+
             # Verifica se os campos obrigatórios existem
             missing_fields = [field for field in required_fields if field not in record]
             if missing_fields:
                 print(
                     f"AVISO: Registro {idx + 1} não possui os campos: {', '.join(missing_fields)}. "
-                    f"Ignorando registro."
+                    f"Ignorando registro.",
+                    file=sys.stderr
                 )
                 continue
 
@@ -76,38 +646,124 @@ class JsonGenerator:
             if 'NumeroTarefa' in record:
                 novidade['numeroTarefa'] = record['NumeroTarefa']
 
-            novidades.append(novidade)
+            yield novidade
 
-        # Estrutura final do JSON
-        output_data = {
-            'versao': versao,
-            'modo': modo,
-            'novidades': novidades
-        }
+    @staticmethod
+    def _record_layout(tipo, required_fields):
+        """Posições das colunas de um tipo de Record (None se faltar coluna obrigatória)"""
+        missing_fields = [field for field in required_fields if field not in tipo._positions]
+        if missing_fields:
+            print(
+                f"AVISO: O resultado não possui os campos: {', '.join(missing_fields)}. "
+                f"Ignorando os registros.",
+                file=sys.stderr
+            )
+            return None
 
-        # Salva o arquivo JSON apenas se output_filename for fornecido
-        if output_filename:
-            output_path = self.output_dir / output_filename
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+        posicoes = tipo._positions
+        return posicoes['Sistema'], posicoes['Resumo'], posicoes['Detalhes'], posicoes.get('NumeroTarefa')
 
-            print(f"\nJSON gerado com sucesso: {output_path}", file=sys.stderr)
-            print(f"Total de novidades: {len(novidades)}", file=sys.stderr)
+    def stream_json(self, versao, data_results, modo='ciclo', output_filename=None, stream=None,
+                    formato='json', ao_emitir=None):
+        """
+        Gera o JSON de forma incremental, escrevendo cada novidade assim que
+        o registro correspondente chega do banco
+
+        O documento produzido é idêntico ao de generate_json (mesma
+        formatação com indent=2, ou os mesmos registros em NDJSON/binário),
+        mas nunca é mantido inteiro em memória; as novidades emitidas também
+        não são guardadas (ao_emitir recebe cada uma, se informado).
+
+        Args:
+            versao (str): Versão do changelog
+            data_results (iterable): Registros do banco (normalmente um gerador)
+            modo (str): Modo de operação ('ciclo' ou 'tarefa')
+            output_filename (str, optional): Arquivo de saída. Se None, escreve em stream
+            stream (file, optional): Destino quando não há arquivo (padrão: stdout)
+            formato (str): 'json', 'ndjson' ou 'binary'
+            ao_emitir (callable, optional): Recebe cada novidade depois de escrita
+                                            (ex: para o registro das tarefas)
+
+        Returns:
+            int: Quantidade de novidades emitidas
+        """
+        if formato == 'json':
+            abrir, escrever, destino = {'mode': 'w', 'encoding': 'utf-8'}, self._write_stream, sys.stdout
         else:
-            # Modo stdout: apenas log em stderr
-            print(f"Total de novidades: {len(novidades)}", file=sys.stderr)
+            self._check_format(formato)
+            abrir, escrever, destino = {'mode': 'wb'}, self._write_records, sys.stdout.buffer
 
-        return output_data
+        # Inclui a leitura do banco: os registros são consumidos à medida que são escritos
+        with metrics.stage('json.stream'):
+            novidades = self.iter_novidades(data_results)
+            if output_filename:
+                output_path = self.output_dir / output_filename
+                with open(output_path, **abrir) as f:
+                    emitidas = escrever(f, versao, modo, novidades, formato, ao_emitir=ao_emitir)
+                print(f"\nJSON gerado com sucesso: {output_path}", file=sys.stderr)
+            else:
+                emitidas = escrever(stream or destino, versao, modo, novidades, formato, ao_emitir=ao_emitir)
+
+        print(f"Total de novidades: {emitidas}", file=sys.stderr)
+        return emitidas
+
+    def _write_stream(self, f, versao, modo, novidades, formato='json', flush=True, ao_emitir=None):
+        """Escreve o documento JSON em f, novidade por novidade (flush a cada uma, se flush); retorna a quantidade"""
+        f.write('{\n')
+        f.write(f'  "versao": {json.dumps(versao, ensure_ascii=False)},\n')
+        f.write(f'  "modo": {json.dumps(modo, ensure_ascii=False)},\n')
+        f.write('  "novidades": [')
+
+        emitidas = 0
+        for novidade in novidades:
+            item = json.dumps(novidade, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+            trecho = ('\n    ' if not emitidas else ',\n    ') + item
+            f.write(trecho)
+            if flush:
+                f.flush()
+            if metrics.enabled:
+                metrics.count('saida.bytes', len(trecho.encode('utf-8')))
+
+            emitidas += 1
+            if ao_emitir is not None:
+                ao_emitir(novidade)
+
+        f.write('\n  ]\n}\n' if emitidas else ']\n}\n')
+        f.flush()
+        return emitidas
+
+    def _write_records(self, f, versao, modo, novidades, formato, flush=True, ao_emitir=None):
+        """Escreve o cabeçalho e cada novidade como um registro NDJSON/binário em f (binário); retorna a quantidade"""
+        if formato == 'binary':
+            f.write(BINARY_MAGIC)
+        f.write(self.encode_record({'versao': versao, 'modo': modo}, formato))
+
+        emitidas = 0
+        for novidade in novidades:
+            dados = self.encode_record(novidade, formato)
+            f.write(dados)
+            if flush:
+                f.flush()
+            metrics.count('saida.bytes', len(dados))
+            emitidas += 1
+            if ao_emitir is not None:
+                ao_emitir(novidade)
 
-    def read_json(self, filename='output.json'):
+        f.flush()
+        return emitidas
+
+    def read_json(self, filename='output.json', formato=None):
         """
-        Lê um arquivo JSON gerado anteriormente
+        Lê um arquivo gerado anteriormente, em qualquer um dos formatos
 
         Args:
-            filename (str): Nome do arquivo JSON
+            filename (str): Nome do arquivo
+            formato (str, optional): 'json', 'ndjson' ou 'binary'. Se None, detecta
+                                     pela assinatura do binário ou pela extensão
+                                     (.ndjson/.jsonl)
 
         Returns:
-            dict: Dados do JSON
+            dict: Dados do JSON (mesma estrutura de generate_json/generate_cycles_json)
 
         Raises:
             FileNotFoundError: Se o arquivo não existir
@@ -117,10 +773,195 @@ class JsonGenerator:
         if not json_path.exists():
             raise FileNotFoundError(f"Arquivo JSON não encontrado: {json_path}")
 
+        formato = formato or self._detect_format(json_path)
+        if formato == 'json':
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        return self.assemble_document(self.read_records(filename, formato))
+
+    def read_novidades(self, filename, formato=None):
+        """
+        Novidades de um arquivo gerado, sem os cabeçalhos
+
+        Arquivos NDJSON/binários são lidos registro a registro; de um JSON
+        indentado, as novidades são decodificadas uma a uma, em blocos de
+        BLOCO_JSON caracteres, sem carregar o documento inteiro.
+
+        Args:
+            filename (str): Nome do arquivo
+            formato (str, optional): 'json', 'ndjson' ou 'binary' (padrão: detecta)
+
+        Returns:
+            generator: Novidades, na ordem do arquivo
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+            ValueError: Se o JSON estiver truncado ou não tiver o campo novidades
+        """
+        json_path = self.output_dir / filename
+        if not json_path.exists():
+            raise FileNotFoundError(f"Arquivo JSON não encontrado: {json_path}")
+
+        formato = formato or self._detect_format(json_path)
+        if formato == 'json':
+            return self._read_json_novidades(json_path)
+        registros = self.read_records(filename, formato)
+        return (registro for registro in registros if 'modo' not in registro)
+
+    @staticmethod
+    def _read_json_novidades(json_path):
+        """
+        Itens dos arrays "novidades" de um documento JSON (um por documento ou por ciclo)
+
+        Fora desses arrays, apenas as strings são decodificadas (para achar a
+        chave "novidades"); cada item é decodificado com raw_decode assim que
+        está inteiro no bloco lido.
+        """
+        decoder = json.JSONDecoder()
+        texto = ''
+        pos = 0
+        chave = None
+        dentro = False
+        arrays = 0
+
         with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            def ler():
+                """Acrescenta o próximo bloco ao texto pendente (False no fim do arquivo)"""
+                nonlocal texto, pos
+                bloco = f.read(BLOCO_JSON)
+                if not bloco:
+                    return False
+                texto = texto[pos:] + bloco
+                pos = 0
+                return True
+
+            while True:
+                if pos >= len(texto):
+                    if ler():
+                        continue
+                    break
+
+                caractere = texto[pos]
+                if caractere in ' \t\r\n,:':
+                    pos += 1
+                elif dentro:
+                    if caractere == ']':
+                        dentro = False
+                        pos += 1
+                        continue
+                    try:
+                        novidade, pos = decoder.raw_decode(texto, pos)
+                    except json.JSONDecodeError:
+                        # Item ainda incompleto no bloco lido
+                        if ler():
+                            continue
+                        raise ValueError(f"JSON truncado ou inválido: {json_path}")
+                    yield novidade
+                elif caractere == '"':
+                    try:
+                        chave, pos = json.decoder.scanstring(texto, pos + 1)
+                    except json.JSONDecodeError:
+                        if ler():
+                            continue
+                        raise ValueError(f"JSON truncado ou inválido: {json_path}")
+                elif caractere == '[' and chave == 'novidades':
+                    dentro = True
+                    arrays += 1
+                    pos += 1
+                else:
+                    pos += 1
 
-        return data
+        if dentro:
+            raise ValueError(f"JSON truncado ou inválido: {json_path}")
+        if not arrays:
+            raise ValueError(f"Arquivo sem o campo novidades: {json_path}")
+
+    def read_records(self, filename, formato=None):
+        """
+        Lê um arquivo NDJSON/binário registro a registro, sem carregá-lo inteiro
+
+        Args:
+            filename (str): Nome do arquivo
+            formato (str, optional): 'ndjson' ou 'binary' (padrão: detecta)
+
+        Yields:
+            dict: Cabeçalhos ('versao'/'modo') e novidades, na ordem do arquivo
+
+        Raises:
+            ValueError: Se o arquivo estiver truncado ou não for NDJSON/binário
+        """
+        json_path = self.output_dir / filename
+        formato = formato or self._detect_format(json_path)
+        if formato not in ('ndjson', 'binary'):
+            raise ValueError(f"Leitura por registros requer NDJSON ou binário: {json_path}")
+
+        with open(json_path, 'rb') as f:
+            yield from self._iter_records(f, formato, json_path)
+
+    @staticmethod
+    def _iter_records(f, formato, origem):
+        """Registros de um conteúdo NDJSON/binário aberto em modo binário"""
+        if formato == 'ndjson':
+            for linha in f:
+                if linha.strip():
+                    yield json.loads(linha)
+            return
+
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"Arquivo binário inválido: {origem}")
+        while True:
+            prefixo = f.read(_TAMANHO.size)
+            if not prefixo:
+                return
+            if len(prefixo) < _TAMANHO.size:
+                raise ValueError(f"Arquivo binário truncado: {origem}")
+
+            tamanho, = _TAMANHO.unpack(prefixo)
+            dados = f.read(tamanho)
+            if len(dados) < tamanho:
+                raise ValueError(f"Arquivo binário truncado: {origem}")
+            yield json.loads(dados)
+
+    @staticmethod
+    def assemble_document(registros):
+        """
+        Monta o documento a partir dos registros de read_records
+
+        Args:
+            registros (iterable): Cabeçalhos e novidades
+
+        Returns:
+            dict: Documento simples ou agrupado por ciclo
+        """
+        documento = None
+        novidades = None
+        for registro in registros:
+            if 'modo' not in registro:
+                if novidades is None:
+                    raise ValueError("Novidade encontrada antes do cabeçalho do arquivo")
+                novidades.append(registro)
+            elif 'ciclo' in registro:
+                documento = documento or {'modo': registro['modo'], 'ciclos': {}}
+                novidades = []
+                documento['ciclos'][registro['ciclo']] = {'versao': registro['versao'], 'novidades': novidades}
+            else:
+                novidades = []
+                documento = {'versao': registro['versao'], 'modo': registro['modo'], 'novidades': novidades}
+
+        if documento is None:
+            raise ValueError("Arquivo sem cabeçalho (versao/modo)")
+        return documento
+
+    @staticmethod
+    def _detect_format(path):
+        """Formato de um arquivo existente: assinatura binária, extensão ou JSON"""
+        with open(path, 'rb') as f:
+            if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+                return 'binary'
+        if path.suffix in ('.ndjson', '.jsonl'):
+            return 'ndjson'
+        return 'json'
 
     def display_summary(self, json_data):
         """
@@ -129,6 +970,17 @@ class JsonGenerator:
         Args:
             json_data (dict): Dados do JSON
         """
+        # JSON de vários ciclos: um resumo por ciclo
+        if 'ciclos' in json_data:
+            for ciclo, dados in json_data['ciclos'].items():
+                print(f"\nCiclo {ciclo}", file=sys.stderr)
+                self.display_summary({
+                    'versao': dados['versao'],
+                    'modo': json_data.get('modo'),
+                    'novidades': dados['novidades']
+                })
+            return
+
         print("\n" + "=" * 60, file=sys.stderr)
         print(f"RESUMO - Versão: {json_data['versao']} (Modo: {json_data.get('modo', 'N/A')})",
               file=sys.stderr)
@@ -142,6 +994,8 @@ class JsonGenerator:
             print(f"   Resumo: {resumo}", file=sys.stderr)
             if 'numeroTarefa' in novidade:
                 print(f"   Tarefa: {novidade['numeroTarefa']}", file=sys.stderr)
+            if 'origem' in novidade:
+                print(f"   Origem: {novidade['origem']}", file=sys.stderr)
 
         print("\n" + "=" * 60, file=sys.stderr)
         print(f"Total: {len(json_data['novidades'])} novidade(s)", file=sys.stderr)
@@ -0,0 +1,233 @@
+"""
+Módulo de banco de dados local (SQLite) com a mesma interface de Database
+Permite testar e desenvolver sem acesso ao SQL Server de produção
+"""
+import sys
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+from database import Database, CountingCursor
+from config import config
+from metrics import metrics
+
+
+# create_function(deterministic=...) só existe a partir do Python 3.8 (SQLite 3.8.3+)
+_DETERMINISTICA = {'deterministic': True} if sys.version_info >= (3, 8) else {}
+
+
+def _charindex(substring, texto):
+    """Equivalente ao CHARINDEX do SQL Server (posição 1-based, 0 se ausente)"""
+    if substring is None or texto is None:
+        return None
+    return str(texto).find(str(substring)) + 1
+
+
+def _len(texto):
+    """Equivalente ao LEN do SQL Server (ignora espaços à direita)"""
+    if texto is None:
+        return None
+    return len(str(texto).rstrip(' '))
+
+
+def _datalength(texto):
+    """Equivalente ao DATALENGTH do SQL Server (tamanho em bytes, sem descartar espaços)"""
+    if texto is None:
+        return None
+    return len(str(texto).encode('utf-8'))
+
+
+def _substring(texto, inicio, tamanho):
+    """Equivalente ao SUBSTRING do SQL Server (início 1-based; o SQLite só o tem a partir da 3.34)"""
+    if texto is None or inicio is None or tamanho is None:
+        return None
+    inicio = int(inicio)
+    fim = inicio + int(tamanho)
+    return str(texto)[max(inicio, 1) - 1:max(fim - 1, 0)]
+
+
+def _min_active_rowversion():
+    """Equivalente ao MIN_ACTIVE_ROWVERSION do SQL Server (sem transações concorrentes: sem limite)"""
+    return 2 ** 63 - 1
+
+
+def _getdate():
+    """Equivalente ao GETDATE do SQL Server"""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class LocalDatabase(Database):
+    """Substituto local do Database sobre SQLite, com as funções T-SQL usadas nas queries"""
+
+    dialect = 'sqlite'
+
+    def __init__(self, path=':memory:'):
+        """
+        Inicializa o banco local
+
+        Args:
+            path (str): Arquivo SQLite (':memory:' para banco em memória)
+        """
+        super().__init__()
+        self.path = str(path)
+
+    def identity(self):
+        """Identificação do banco (caminho absoluto do arquivo), usada nas chaves de cache"""
+        return f"sqlite:{Path(self.path).resolve()}"
+
+    def connect(self):
+        """
+        Abre o arquivo SQLite e registra CHARINDEX, LEN, DATALENGTH, SUBSTRING, MIN_ACTIVE_ROWVERSION e GETDATE
+
+        Raises:
+            Exception: Se houver erro na conexão
+        """
+        self.errors = sqlite3.Error
+        try:
+            # check_same_thread=False: o pool empresta a conexão a threads diferentes
+            with metrics.stage('db.conectar'):
+                self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.create_function('CHARINDEX', 2, _charindex, **_DETERMINISTICA)
+            self.connection.create_function('LEN', 1, _len, **_DETERMINISTICA)
+            self.connection.create_function('DATALENGTH', 1, _datalength, **_DETERMINISTICA)
+            self.connection.create_function('SUBSTRING', 3, _substring, **_DETERMINISTICA)
+            self.connection.create_function('MIN_ACTIVE_ROWVERSION', 0, _min_active_rowversion)
+            self.connection.create_function('GETDATE', 0, _getdate)
+            self.cursor = CountingCursor(self.connection.cursor())
+            print(f"Conectado ao banco local: {self.path}", file=sys.stderr)
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao conectar ao banco local: {e}")
+
+    def create_schema(self):
+        """Cria as tabelas TSK_Tarefa e de documentadas aplicando todas as migrações do SQLite (inclusive as opcionais)"""
+        from migrator import Migrator
+        Migrator(self).migrate(opcionais=True)
+
+    def execute_script(self, script):
+        """
+        Executa um script com vários comandos sem confirmar a transação
+
+        O executescript do sqlite3 confirma a transação pendente antes de
+        rodar o script; o BEGIN inicial mantém o script dentro de uma nova
+        transação, confirmada ou desfeita por quem chamou.
+
+        Args:
+            script (str): Comandos SQL separados por ';'
+
+        Raises:
+            Exception: Se houver erro na execução
+        """
+        if not self.connection:
+            raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
+
+        try:
+            self.cursor.executescript(f"BEGIN;\n{script}")
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao executar script: {e}")
+
+    def insert_tasks(self, tasks):
+        """
+        Insere tarefas em TSK_Tarefa (massa de dados para testes)
+
+        Args:
+            tasks (iterable): Tuplas (Tarefaid, TrfNome, TrfObservacao2, CicloId, TrfFim, trffeito)
+        """
+        self.cursor.executemany(
+            "INSERT INTO TSK_Tarefa (Tarefaid, TrfNome, TrfObservacao2, CicloId, TrfFim, trffeito) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            tasks
+        )
+        self.connection.commit()
+
+    def documented_subset(self, task_ids, batch_size=500):
+        """
+        Versão SQLite da consulta em lote de tarefas documentadas (IN-list por lote)
+
+        Args:
+            task_ids (iterable): IDs das tarefas
+            batch_size (int): Quantidade de IDs por consulta
+
+        Returns:
+            set: IDs (str) que já foram documentados
+        """
+        if not self.connection:
+            raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
+
+        table_name = config.db_table_documentadas
+        ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+        documentadas = set()
+
+        for inicio in range(0, len(ids), batch_size):
+            lote = ids[inicio:inicio + batch_size]
+            marcadores = ', '.join('?' for _ in lote)
+            self.cursor.execute(
+                f"SELECT NumeroTarefa FROM {table_name} WHERE NumeroTarefa IN ({marcadores})",
+                lote
+            )
+            documentadas.update(str(row[0]) for row in self.cursor.fetchall())
+
+        return documentadas
+
+    def register_documented_tasks(self, tasks, batch_size=500):
+        """
+        Versão SQLite do registro em lote (INSERT OR IGNORE em vez de MERGE)
+
+        Args:
+            tasks (iterable): Pares (numero_tarefa, arquivo_md)
+            batch_size (int): Quantidade de linhas enviadas por lote (o SQLite
+                anterior à 3.32 aceita no máximo 999 parâmetros por comando)
+
+        Returns:
+            dict: {'registradas': [numeros], 'conflitos': [numeros]}
+        """
+        if not self.connection:
+            raise Exception("Conexão não estabelecida. Execute connect() primeiro.")
+
+        table_name = config.db_table_documentadas
+        resultado = {'registradas': [], 'conflitos': []}
+
+        rows = []
+        vistos = set()
+        for numero_tarefa, arquivo_md in tasks:
+            numero = str(numero_tarefa)
+            if numero in vistos:
+                resultado['conflitos'].append(numero)
+                continue
+            vistos.add(numero)
+            rows.append((numero, arquivo_md))
+
+        try:
+            for inicio in range(0, len(rows), batch_size):
+                lote = rows[inicio:inicio + batch_size]
+                marcadores = ', '.join('?' for _ in lote)
+
+                self.cursor.execute(
+                    f"SELECT NumeroTarefa FROM {table_name} WHERE NumeroTarefa IN ({marcadores})",
+                    [numero for numero, _ in lote]
+                )
+                existentes = {str(row[0]) for row in self.cursor.fetchall()}
+
+                self.cursor.executemany(
+                    f"INSERT OR IGNORE INTO {table_name} (NumeroTarefa, ArquivoMD, DataExportacao) "
+                    f"VALUES (?, ?, GETDATE())",
+                    lote
+                )
+
+                for numero, _ in lote:
+                    if numero in existentes:
+                        resultado['conflitos'].append(numero)
+                    else:
+                        resultado['registradas'].append(numero)
+
+            self._commit()
+            metrics.count('db.tarefas_registradas', len(resultado['registradas']))
+
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            raise Exception(f"Erro ao registrar tarefas em lote: {e}")
+
+        print(
+            f"Registro em lote concluído. {len(resultado['registradas'])} registrada(s), "
+            f"{len(resultado['conflitos'])} conflito(s).",
+            file=sys.stderr
+        )
+        return resultado
@@ -3,23 +3,38 @@ Changelog Manager - Entry Point
 Aplicação para gerar JSON estruturado de changelogs a partir do banco de dados
 """
 import sys
+import json
 import argparse
+import itertools
 from pathlib import Path
 
 # Adiciona o diretório src ao path para imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import config
-from database import Database
-from query_executor import QueryExecutor
-from json_generator import JsonGenerator
+from metrics import metrics
+from query_executor import QueryExecutor, parse_id_list
+from json_generator import JsonGenerator, FORMATOS, BINARY_MAGIC
 from task_manager import TaskManager
+from normalizer import RecordNormalizer
+from markdown_renderer import MarkdownRenderer, markdown_path
 
 
-def parse_arguments():
+# Valor de --page-size sem número: o tamanho vem do .env (EXTRACAO_PAGE_SIZE), lido
+# apenas quando necessário. Não é str porque o argparse converteria o valor com type=int
+PAGE_SIZE_ENV = object()
+
+# Tarefas por transação no registro ao final do modo streaming
+REGISTRO_LOTE = 1000
+
+
+def parse_arguments(argv=None):
     """
     Processa argumentos da linha de comando
 
+    Args:
+        argv (list, optional): Argumentos (padrão: sys.argv[1:])
+
     Returns:
         argparse.Namespace: Argumentos processados
     """
@@ -36,34 +51,88 @@ Exemplos de uso:
 
   Salvar em arquivo (opcional, para compatibilidade):
     python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --output resultado.json
+
+  Vários ciclos / tarefas em uma única execução:
+    python main.py --modo ciclo --ciclo 124,125 --versao "09.91.47.20,09.92.48.00"
+    python main.py --modo tarefa --tarefa-id 12345,12350-12355 --versao "09.91.47.20"
+
+  Streaming (memória constante para ciclos grandes):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --stream
+
+  Saída compacta (uma novidade por linha, processável à medida que chega):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --stream --format ndjson
+
+  Um documento por sistema (diretório com manifest.json, ou quadros em stdout):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --shard-by sistema --output output_124
+
+  Migrações do banco (antes do primeiro uso e após atualizar a ferramenta):
+    python main.py migrate
+    python main.py migrate --status
+    python main.py migrate --opcionais   # também TrfVersao em TSK_Tarefa (--cache e --modo watch)
+
+  Gerar os arquivos .md diretamente (segue convencoes.md):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --render
+
+  Atualizar _sidebar.md, as tabelas do README.md e o índice de busca:
+    python main.py index
+    python main.py search-index
+
+  Extração paginada e retomável (continua da última página após uma queda):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --page-size 500 --output output_124.json
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --resume --output output_124.json
+
+  Resumo de um documento já gerado (sem banco e sem .env):
+    python main.py summary output_124.json
+
+  Diferenças entre duas saídas (arquivos gerados ou ciclo:N consultado no banco):
+    python main.py diff output_275.json output_277.json --format ndjson
+    python main.py diff output_275.json ciclo:277
+
+  Detalhes em duas fases (consulta leve + textos por lote, só onde existem):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --lazy-details
+
+  Mesmo ciclo em vários bancos ao mesmo tempo (perfis DB_PROFILES do .env):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --databases jacomar,pinheiro
+
+  Acompanhamento contínuo: emite as tarefas concluídas a cada consulta (Ctrl+C encerra):
+    python main.py --modo watch --ciclo 124 --versao "09.91.47.20" --format ndjson --output eventos_124.ndjson
+
+  Cache local de tarefas (modo ciclo):
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --cache
+    python main.py cache --invalidar 124
+    python main.py cache --invalidar-saida
+
+  Tempo por etapa (stderr) e métricas em JSON:
+    python main.py --modo ciclo --ciclo 124 --versao "09.91.47.20" --profile --metrics-out metricas.json
         """
     )
 
     parser.add_argument(
         '--modo', '-m',
         type=str,
-        choices=['ciclo', 'tarefa'],
+        choices=['ciclo', 'tarefa', 'watch'],
         required=True,
-        help='Modo de operação: "ciclo" (ciclo completo) ou "tarefa" (tarefa individual)'
+        help='Modo de operação: "ciclo" (ciclo completo), "tarefa" (tarefa individual) ou '
+             '"watch" (acompanha o(s) ciclo(s) e emite as tarefas à medida que são concluídas)'
     )
 
     parser.add_argument(
         '--ciclo', '-c',
         type=str,
-        help='Número do ciclo para consulta (obrigatório se --modo=ciclo)'
+        help='Número(s) do ciclo para consulta, separados por vírgula (obrigatório se --modo=ciclo ou watch)'
     )
 
     parser.add_argument(
         '--tarefa-id', '-t',
         type=str,
-        help='ID da tarefa para consulta (obrigatório se --modo=tarefa)'
+        help='ID(s) da tarefa: lista e/ou intervalos, ex: 12345,12350-12355 (obrigatório se --modo=tarefa)'
     )
 
     parser.add_argument(
         '--versao', '-v',
         type=str,
         required=True,
-        help='Versão do changelog (ex: "09.91.47.20")'
+        help='Versão do changelog (ex: "09.91.47.20"). Com vários ciclos, aceita uma versão por ciclo'
     )
 
     parser.add_argument(
@@ -72,41 +141,1424 @@ Exemplos de uso:
         help='Nome do arquivo JSON de saída (opcional - se omitido, imprime em stdout)'
     )
 
+    parser.add_argument(
+        '--format', '-f',
+        dest='formato',
+        choices=FORMATOS,
+        default='json',
+        help='Formato da saída: json (indentado, padrão), ndjson (cabeçalho + uma novidade '
+             'por linha) ou binary (registros prefixados pelo tamanho)'
+    )
+
+    parser.add_argument(
+        '--shard-by',
+        choices=['sistema'],
+        help='Separa a saída em um documento por sistema: com --output, um diretório com um '
+             'arquivo por sistema e manifest.json; sem --output, quadros independentes em stdout'
+    )
+
     parser.add_argument(
         '--no-register',
         action='store_true',
         help='Não registra as tarefas na tabela de documentadas'
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Lê o resultado em blocos e escreve o JSON à medida que os registros chegam'
+    )
+
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        nargs='?',
+        const=PAGE_SIZE_ENV,
+        metavar='N',
+        help='Extração paginada e retomável (modo ciclo): lê N tarefas por vez pela chave '
+             'Tarefaid, gravando cada página em um diário local (padrão: EXTRACAO_PAGE_SIZE do .env)'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Retoma a extração paginada interrompida deste ciclo/versão a partir da última '
+             'página confirmada no diário'
+    )
+
+    parser.add_argument(
+        '--lazy-details',
+        action='store_true',
+        help='Busca em duas fases (modo ciclo): a consulta traz só nome, número e tamanho dos '
+             'detalhes, e os textos são buscados depois, em lotes, apenas das tarefas que os têm'
+    )
+
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Usa o cache local de tarefas (modo ciclo) e o cache de saída (documentos já '
+             'gerados); requer a migração opcional 0004 (migrate --opcionais)'
+    )
+
+    # Sem efeito: o cache passou a ser opcional (--cache); aceito para não quebrar scripts
+    parser.add_argument('--no-cache', action='store_true', help=argparse.SUPPRESS)
+
+    parser.add_argument(
+        '--render',
+        action='store_true',
+        help='Gera/atualiza os arquivos {Sistema}/{versao}.md seguindo convencoes.md'
+    )
+
+    parser.add_argument(
+        '--docs-dir',
+        type=str,
+        help='Raiz dos changelogs .md (padrão: raiz do repositório)'
+    )
+
+    parser.add_argument(
+        '--sqlite',
+        type=str,
+        metavar='ARQUIVO',
+        help='Usa um banco SQLite local (mesmas tabelas) em vez do SQL Server do .env'
+    )
+
+    parser.add_argument(
+        '--databases',
+        type=str,
+        metavar='PERFIS',
+        help='Executa a consulta em vários bancos ao mesmo tempo: perfis de DB_PROFILES '
+             'separados por vírgula, ou "todos"; cada novidade recebe o campo "origem"'
+    )
+
+    parser.add_argument(
+        '--db-timeout',
+        type=int,
+        metavar='SEGUNDOS',
+        help='Tempo limite de cada banco com --databases (padrão: DB_TIMEOUT do .env)'
+    )
+
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        metavar='SEGUNDOS',
+        help='Modo watch: intervalo mínimo entre consultas; dobra a cada consulta sem '
+             'novidades até --poll-max (padrão: WATCH_INTERVALO do .env)'
+    )
+
+    parser.add_argument(
+        '--poll-max',
+        type=float,
+        metavar='SEGUNDOS',
+        help='Modo watch: intervalo máximo entre consultas e após falhas (padrão: WATCH_INTERVALO_MAX do .env)'
+    )
+
+    parser.add_argument(
+        '--since',
+        type=int,
+        default=0,
+        metavar='MARCA',
+        help='Modo watch: começa após esta marca (campo "marca" do último evento recebido); '
+             'padrão: todas as tarefas concluídas ainda não documentadas'
+    )
+
+    parser.add_argument(
+        '--max-polls',
+        type=int,
+        metavar='N',
+        help='Modo watch: encerra após N consultas (padrão: até Ctrl+C)'
+    )
+
+    parser.add_argument(
+        '--snapshot',
+        action='store_true',
+        help='Modo watch: mantém as tarefas documentadas em memória, atualizadas pela '
+             'DataExportacao a cada consulta, e não emite as que já foram registradas'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Exibe em stderr o tempo de cada etapa e os contadores da execução'
+    )
+
+    parser.add_argument(
+        '--metrics-out',
+        type=str,
+        metavar='ARQUIVO',
+        help='Grava as métricas da execução em JSON (para acompanhar a evolução entre execuções)'
+    )
+
+    parser.add_argument(
+        '--cprofile',
+        type=str,
+        metavar='ARQUIVO',
+        help='Grava o perfil completo do cProfile (ler com python -m pstats ARQUIVO)'
+    )
+
+    return parser.parse_args(argv)
+
+
+def fetch_results(db, args, stream=False, snapshot=None):
+    """
+    Executa a consulta correspondente ao modo de operação
+
+    Args:
+        db (Database): Conexão ativa
+        args (argparse.Namespace): Argumentos da linha de comando
+        stream (bool): Se True, retorna um gerador que lê o cursor em blocos
+        snapshot (DocumentedSnapshot, optional): Tarefas documentadas em memória,
+            usadas no modo tarefa no lugar da consulta ao banco
+
+    Returns:
+        list | generator: Registros retornados pelo banco
+    """
+    # Separação de Sistema/Resumo, limpeza e apelidos de sistema (src/normalizer.py)
+    normalizer = RecordNormalizer(docs_dir=args.docs_dir)
+
+    if args.modo == 'ciclo' and args.lazy_details:
+        # Duas fases: colunas leves primeiro, detalhes por lote (src/task_details.py)
+        from task_details import DetailsFetcher
+
+        print("Executando consulta SQL sem detalhes (modo ciclo)...", file=sys.stderr)
+        with metrics.stage('tarefas.consultar'):
+            leves = QueryExecutor().execute_sql_file(db, 'consulta_tarefas_leve.sql', {'cicloCod': args.ciclos})
+
+        # No streaming, a lista leve fica em memória e só os detalhes de um lote por vez
+        results = DetailsFetcher(db, compartilhar=not stream).attach(leves)
+        return normalizer.normalize_all(results if stream else list(results))
+
+    if args.modo == 'ciclo':
+        # Modo Ciclo - busca todas as tarefas do ciclo
+        if args.cache:
+            results = fetch_cached_cycles(db, args.ciclos)
+            if results is not None:
+                results = normalizer.normalize_all(results)
+                return iter(results) if stream else results
+
+        print("Executando consulta SQL (modo ciclo)...", file=sys.stderr)
+        executor = QueryExecutor()
+        parameters = {'cicloCod': args.ciclos}
+        if stream and args.shard_by:
+            # Em ordem de sistema: cada shard é gravado assim que o sistema muda
+            results = executor.iter_sql_file(db, 'consulta_tarefas_sistema.sql', parameters)
+        elif stream:
+            results = executor.iter_sql_file(db, 'consulta_tarefas.sql', parameters)
+        else:
+            results = executor.execute_sql_file(db, 'consulta_tarefas.sql', parameters)
+        return normalizer.normalize_all(results)
+
+    # Modo Tarefa - busca tarefa(s) individual(is)
+    task_mgr = TaskManager(db, snapshot=snapshot, normalizer=normalizer)
+    if len(args.tarefa_ids) == 1:
+        print(f"Buscando tarefa {args.tarefa_ids[0]}...", file=sys.stderr)
+        return task_mgr.get_task_by_id(args.tarefa_ids[0])
+
+    print(f"Buscando {len(args.tarefa_ids)} tarefas...", file=sys.stderr)
+    return task_mgr.get_tasks_by_ids(args.tarefa_ids)
+
+
+def fetch_cached_cycles(db, ciclos):
+    """
+    Busca as tarefas dos ciclos pelo cache local
+
+    Args:
+        db (Database): Conexão ativa
+        ciclos (list): IDs inteiros dos ciclos
+
+    Returns:
+        list | None: Registros, ou None se o cache não puder ser usado
+                     (nesse caso a consulta completa é executada)
+    """
+    from task_cache import TaskCache
+
+    print("Atualizando cache local de tarefas (modo ciclo)...", file=sys.stderr)
+    try:
+        with TaskCache() as cache:
+            return cache.fetch_cycles(db, ciclos)
+    except Exception as e:
+        print(f"AVISO: Cache local indisponível ({e}). Consultando o banco diretamente.",
+              file=sys.stderr)
+        return None
+
+
+def print_no_results(modo):
+    """Exibe orientações quando a consulta não retorna registros"""
+    print("\nNENHUM RESULTADO ENCONTRADO!", file=sys.stderr)
+    if modo == 'ciclo':
+        print("Verifique se:", file=sys.stderr)
+        print("  1. O ciclo informado está correto", file=sys.stderr)
+        print("  2. Existem tarefas para documentar neste ciclo", file=sys.stderr)
+        print("  3. As tarefas não foram documentadas anteriormente", file=sys.stderr)
+    else:
+        print("Verifique se:", file=sys.stderr)
+        print("  1. O ID da tarefa está correto", file=sys.stderr)
+        print("  2. A tarefa não foi documentada anteriormente", file=sys.stderr)
+        print("  3. A tarefa está concluída (TrfFim ou trffeito = 1)", file=sys.stderr)
+
+
+def spill_documented(arquivo, versao):
+    """
+    Função que grava em arquivo o par (numero_tarefa, arquivo_md) de cada novidade
+
+    Args:
+        arquivo (file): Arquivo de texto temporário (uma lista JSON por linha)
+        versao (str): Versão do changelog (define o arquivo .md)
+
+    Returns:
+        callable: Recebe cada novidade emitida (ignora as sem 'numeroTarefa')
+    """
+    def gravar(novidade):
+        if 'numeroTarefa' in novidade:
+            par = [novidade['numeroTarefa'], markdown_path(novidade['sistema'], versao)]
+            arquivo.write(json.dumps(par, ensure_ascii=False))
+            arquivo.write('\n')
+    return gravar
+
+
+def documented_files(novidades, versao):
+    """
+    Monta os pares (numero_tarefa, arquivo_md) a registrar
+
+    Args:
+        novidades (list): Novidades com 'sistema' e 'numeroTarefa'
+        versao (str): Versão do changelog (define o arquivo .md)
+
+    Returns:
+        list: Pares (numero_tarefa, "{Sistema}/{versao}.md")
+    """
+    return [
+        (novidade['numeroTarefa'], markdown_path(novidade['sistema'], versao))
+        for novidade in novidades
+        if 'numeroTarefa' in novidade
+    ]
+
+
+def register_tasks(db, tarefas, propagar=False, lote=None, snapshot=None):
+    """
+    Registra as tarefas como documentadas em uma única transação (ou uma por lote)
+
+    Args:
+        db (Database): Conexão ativa
+        tarefas (iterable): Pares (numero_tarefa, arquivo_md)
+        propagar (bool): Se True, uma falha no registro é repassada a quem
+                         chamou (em vez de apenas exibida)
+        lote (int, optional): Tarefas por transação, lidas de tarefas aos
+                              poucos; uma falha interrompe os lotes seguintes
+        snapshot (DocumentedSnapshot, optional): Recebe as tarefas registradas,
+                                                 sem nova consulta ao banco
+    """
+    print("Registrando tarefas como documentadas...", file=sys.stderr)
+
+    tarefas = iter(tarefas)
+    try:
+        with metrics.stage('main.registro'):
+            while True:
+                parte = list(itertools.islice(tarefas, lote)) if lote else list(tarefas)
+                if not parte:
+                    break
+                resultado = db.register_documented_tasks(parte)
+                if snapshot is not None:
+                    snapshot.add(resultado['registradas'])
+                for numero_tarefa in resultado['conflitos']:
+                    print(f"  Tarefa {numero_tarefa} já registrada (ignorada)", file=sys.stderr)
+                if not lote:
+                    break
+    except Exception as e:
+        print(f"  Erro ao registrar tarefas: {e}", file=sys.stderr)
+        if propagar:
+            raise
+
+
+def render_markdown(args, json_data):
+    """
+    Gera os arquivos .md de todas as versões do JSON em uma única passada
+
+    Args:
+        args (argparse.Namespace): Argumentos (usa args.docs_dir)
+        json_data (dict): JSON gerado (formato simples ou agrupado por ciclo)
+    """
+    print("\nGerando changelogs em Markdown...", file=sys.stderr)
+    renderer = MarkdownRenderer(docs_dir=args.docs_dir)
+
+    with metrics.stage('main.render'):
+        if 'ciclos' in json_data:
+            for dados in json_data['ciclos'].values():
+                renderer.render(dados['versao'], dados['novidades'])
+        else:
+            renderer.render(json_data['versao'], json_data['novidades'])
+
+    # Mantém _sidebar.md, README.md e o índice de busca em dia com os arquivos gerados
+    from index_builder import IndexBuilder
+    from search_index import SearchIndexBuilder
+    with metrics.stage('main.indices'):
+        IndexBuilder(docs_dir=args.docs_dir).build()
+        SearchIndexBuilder(docs_dir=args.docs_dir).build()
+
+
+def build_json(generator, args, results, output_filename=None):
+    """
+    Gera o JSON de saída e a lista de tarefas a registrar
+
+    Args:
+        generator (JsonGenerator): Gerador de JSON
+        args (argparse.Namespace): Argumentos já resolvidos (resolve_batch_arguments)
+        results (list): Registros retornados pelo banco
+        output_filename (str, optional): Arquivo de saída (None = apenas retorna)
+
+    Returns:
+        tuple: (json_data, tarefas) - tarefas são pares (numero_tarefa, arquivo_md)
+    """
+    if len(args.ciclos) > 1:
+        # Vários ciclos: um único documento agrupado por ciclo
+        json_data = generator.generate_cycles_json(
+            versoes=args.versoes,
+            data_results=results,
+            output_filename=output_filename,
+            formato=args.formato
+        )
+    else:
+        json_data = generator.generate_json(
+            versao=args.versao,
+            data_results=results,
+            modo=args.modo,
+            output_filename=output_filename,  # None = stdout, string = arquivo
+            formato=args.formato
+        )
+    return json_data, document_tasks(json_data)
+
+
+def document_tasks(json_data):
+    """
+    Pares (numero_tarefa, arquivo_md) de todas as versões de um documento
+
+    Args:
+        json_data (dict): Documento simples ou agrupado por ciclo
+
+    Returns:
+        list: Pares (numero_tarefa, "{Sistema}/{versao}.md")
+    """
+    if 'ciclos' not in json_data:
+        return documented_files(json_data['novidades'], json_data['versao'])
+
+    tarefas = []
+    for dados in json_data['ciclos'].values():
+        tarefas.extend(documented_files(dados['novidades'], dados['versao']))
+    return tarefas
+
+
+def lookup_output_cache(db, args):
+    """
+    Consulta o cache de saída (uma ida ao banco: a marca d'água dos dados)
+
+    Args:
+        db (Database): Conexão ativa
+        args (argparse.Namespace): Argumentos já resolvidos
+
+    Returns:
+        tuple: (chave, documento) - documento é None em caso de falta; chave
+               é None se o cache não puder ser usado (ex: migração opcional 0004 não aplicada)
+    """
+    from output_cache import OutputCache
+
+    try:
+        with OutputCache() as cache:
+            with metrics.stage('cache_saida.marca'):
+                chave = cache.key(args, db.identity(), cache.watermark(db, args))
+            json_data = cache.get(chave)
+            cache.report('acerto' if json_data is not None else 'falta', chave)
+            return chave, json_data
+    except Exception as e:
+        print(f"AVISO: Cache de saída indisponível ({e}). Gerando o documento.", file=sys.stderr)
+        return None, None
+
+
+def store_output_cache(chave, json_data):
+    """Guarda o documento gerado no cache de saída (falhas apenas geram aviso)"""
+    from output_cache import OutputCache
+
+    novidades = sum(1 for registro in JsonGenerator.document_records(json_data) if 'modo' not in registro)
+    try:
+        with OutputCache() as cache:
+            descartados = cache.put(chave, json_data, novidades)
+            if descartados:
+                print(f"Cache de saída: {descartados} documento(s) antigo(s) descartado(s)", file=sys.stderr)
+    except Exception as e:
+        print(f"AVISO: Não foi possível guardar o documento no cache de saída ({e})", file=sys.stderr)
+
+
+def write_shards(generator, args, json_data):
+    """
+    Emite um documento por sistema (--shard-by sistema)
+
+    Com --output, grava {output}/{Sistema}.{ext} e {output}/manifest.json;
+    sem --output, escreve os quadros de JsonGenerator.stream_shards em stdout.
+
+    Args:
+        generator (JsonGenerator): Gerador de JSON
+        args (argparse.Namespace): Argumentos (usa output e formato)
+        json_data (dict): JSON gerado
+
+    Returns:
+        dict: Manifesto dos shards
+    """
+    print(f"\nGerando um documento por sistema ({args.formato})...", file=sys.stderr)
+    if args.output:
+        return generator.write_shards(json_data, args.output, args.formato)
+
+    sys.stdout.flush()
+    return generator.stream_shards(sys.stdout.buffer, json_data, args.formato)
+
+
+def resolve_batch_arguments(args):
+    """
+    Interpreta as listas de --ciclo, --tarefa-id e --versao
+
+    Preenche args.ciclos, args.tarefa_ids e args.versoes (versão por ciclo).
+
+    Args:
+        args (argparse.Namespace): Argumentos da linha de comando
+
+    Raises:
+        ValueError: Se as listas forem inválidas ou incompatíveis
+    """
+    versoes = [versao.strip() for versao in args.versao.split(',') if versao.strip()]
+    args.ciclos = []
+    args.tarefa_ids = []
+    args.versoes = {}
+
+    if args.modo in ('ciclo', 'watch'):
+        args.ciclos = parse_id_list(args.ciclo)
+        if len(versoes) == 1:
+            versoes = versoes * len(args.ciclos)
+        elif len(versoes) != len(args.ciclos):
+            raise ValueError(
+                f"Informe uma versão para todos os ciclos ou uma versão por ciclo "
+                f"({len(args.ciclos)} ciclo(s), {len(versoes)} versão(ões))"
+            )
+        args.versoes = dict(zip(args.ciclos, versoes))
+        args.versao = versoes[0]
+    else:
+        args.tarefa_ids = parse_id_list(args.tarefa_id)
+        if len(versoes) != 1:
+            raise ValueError("O modo 'tarefa' aceita apenas uma versão")
+
+    if args.modo == 'watch':
+        if (args.stream or args.render or args.shard_by or args.page_size is not None or args.resume
+                or args.lazy_details or args.databases):
+            raise ValueError("O modo 'watch' não pode ser combinado com --stream, --render, --shard-by, "
+                             "--page-size, --resume, --lazy-details ou --databases")
+        if args.poll_interval is not None and args.poll_interval <= 0:
+            raise ValueError("O intervalo entre consultas (--poll-interval) deve ser maior que zero")
+        if args.max_polls is not None and args.max_polls < 1:
+            raise ValueError("A quantidade de consultas (--max-polls) deve ser maior que zero")
+    elif args.snapshot:
+        raise ValueError("--snapshot é usado apenas no modo 'watch' (no servidor: server.py --snapshot)")
+
+    if args.stream and len(args.ciclos) > 1:
+        raise ValueError("O modo --stream não suporta vários ciclos na mesma execução")
+
+    if args.stream and args.render:
+        raise ValueError("O modo --stream não pode ser combinado com --render")
+
+    if args.page_size is PAGE_SIZE_ENV:
+        args.page_size = config.page_size
+
+    if args.databases:
+        if args.sqlite:
+            raise ValueError("--databases usa os perfis do .env e não pode ser combinado com --sqlite")
+        if len(args.ciclos) > 1 or args.stream or args.page_size is not None or args.resume:
+            raise ValueError("A consulta em vários bancos (--databases) aceita um ciclo por execução "
+                             "e não pode ser combinada com --stream, --page-size ou --resume")
+        perfis = [perfil.strip() for perfil in args.databases.split(',') if perfil.strip()]
+        args.databases = config.db_profiles if perfis == ['todos'] else perfis
+        if not args.databases:
+            raise ValueError("Nenhum perfil de conexão informado (defina DB_PROFILES no .env)")
+        # O cache local é um único arquivo e os IDs de tarefa se repetem entre os bancos
+        if args.cache:
+            raise ValueError("--databases não pode ser combinado com --cache")
+
+    if args.lazy_details and args.modo != 'ciclo':
+        raise ValueError("A busca em duas fases (--lazy-details) está disponível apenas no modo 'ciclo'")
+
+    if args.page_size is not None or args.resume:
+        if args.lazy_details:
+            raise ValueError("A extração paginada não pode ser combinada com --lazy-details")
+        if args.modo != 'ciclo' or len(args.ciclos) > 1:
+            raise ValueError("A extração paginada (--page-size/--resume) aceita apenas um ciclo no modo 'ciclo'")
+        if args.page_size is not None and args.page_size < 1:
+            raise ValueError("O tamanho da página (--page-size) deve ser maior que zero")
+        if args.stream or args.render or args.shard_by:
+            raise ValueError("A extração paginada não pode ser combinada com --stream, --render ou --shard-by")
+
+
+def run_streaming(db, args):
+    """
+    Executa o fluxo completo em modo streaming
+
+    Os registros são lidos do cursor em blocos e cada novidade é escrita na
+    saída (stdout ou --output) assim que chega, mantendo a memória constante
+    independentemente do tamanho do ciclo. Com --shard-by, as novidades vão
+    para um arquivo temporário por sistema e cada shard é gravado quando o
+    sistema muda (JsonGenerator.stream_system_shards). As tarefas a registrar
+    também vão para um arquivo temporário (nada é guardado com --no-register)
+    e são registradas depois da saída completa, em lotes de REGISTRO_LOTE: o
+    cursor da consulta ocupa a conexão enquanto a saída é escrita.
+
+    Args:
+        db (Database): Conexão ativa
+        args (argparse.Namespace): Argumentos da linha de comando
+
+    Returns:
+        int: Código de saída
+    """
+    results = iter(fetch_results(db, args, stream=True))
+
+    # Lê o primeiro registro antes de abrir o documento JSON
+    primeiro = next(results, None)
+    if primeiro is None:
+        print_no_results(args.modo)
+        return 1
+
+    import tempfile
+
+    generator = JsonGenerator()
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as pendentes:
+        ao_emitir = None if args.no_register else spill_documented(pendentes, args.versao)
+        if args.shard_by:
+            print(f"\nGerando um documento por sistema ({args.formato}, streaming)...", file=sys.stderr)
+            sys.stdout.flush()
+            generator.stream_system_shards(
+                versao=args.versao,
+                data_results=itertools.chain([primeiro], results),
+                modo=args.modo,
+                output_dirname=args.output,
+                formato=args.formato,
+                ao_emitir=ao_emitir
+            )
+        else:
+            print("\nGerando JSON (streaming)...", file=sys.stderr)
+            generator.stream_json(
+                versao=args.versao,
+                data_results=itertools.chain([primeiro], results),
+                modo=args.modo,
+                output_filename=args.output,
+                formato=args.formato,
+                ao_emitir=ao_emitir
+            )
+
+        if not args.no_register:
+            pendentes.seek(0)
+            register_tasks(db, (tuple(json.loads(linha)) for linha in pendentes), lote=REGISTRO_LOTE)
+
+    print("\n" + "=" * 70, file=sys.stderr)
+    print("PROCESSAMENTO CONCLUÍDO COM SUCESSO!", file=sys.stderr)
+    print("=" * 70, file=sys.stderr)
+    if args.output:
+        print(f"\nArquivo gerado: {args.output}", file=sys.stderr)
+
+    return 0
+
+
+def run_watch(db, args):
+    """
+    Acompanha o(s) ciclo(s) e emite as tarefas concluídas à medida que aparecem (--modo watch)
+
+    A mesma conexão é usada em todas as consultas; cada lote de tarefas
+    concluídas vira um evento por ciclo, gravado e descarregado (flush)
+    imediatamente em stdout ou no final de --output, e as tarefas são
+    registradas como documentadas em seguida (salvo --no-register). Se o
+    registro falhar, a marca não avança e o lote é emitido de novo na
+    próxima tentativa.
+
+    Args:
+        db (Database): Conexão ativa
+        args (argparse.Namespace): Argumentos da linha de comando
+
+    Returns:
+        int: Código de saída
+    """
+    from task_watcher import TaskWatcher
+
+    snapshot = None
+    if args.snapshot:
+        from documented_snapshot import DocumentedSnapshot
+        snapshot = DocumentedSnapshot(db)
+
+    watcher = TaskWatcher(
+        db, args.versoes,
+        normalizer=RecordNormalizer(docs_dir=args.docs_dir),
+        intervalo=args.poll_interval,
+        intervalo_max=args.poll_max,
+        marca=args.since,
+        snapshot=snapshot
+    )
+
+    try:
+        watcher.check()
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+    # Com --output, os eventos são acrescentados ao arquivo (reinícios com --since continuam nele)
+    destino = open(args.output, 'ab') if args.output else sys.stdout.buffer
+    if args.formato == 'binary' and (not args.output or destino.tell() == 0):
+        destino.write(BINARY_MAGIC)
+
+    def emitir(evento):
+        dados = JsonGenerator.encode_event(evento, args.formato)
+        destino.write(dados)
+        destino.flush()
+        metrics.count('saida.bytes', len(dados))
+        if not args.no_register:
+            register_tasks(db, documented_files(evento['novidades'], evento['versao']), propagar=True,
+                           snapshot=snapshot)
+
+    print(f"Acompanhando ciclo(s) {', '.join(map(str, args.ciclos))} a partir da marca {watcher.marca} "
+          f"(consulta a cada {watcher.intervalo:g}s a {watcher.intervalo_max:g}s; Ctrl+C encerra)...",
+          file=sys.stderr)
+    try:
+        watcher.run(emitir, max_consultas=args.max_polls)
+    except KeyboardInterrupt:
+        print("\nAcompanhamento interrompido", file=sys.stderr)
+    finally:
+        if args.output:
+            destino.close()
+
+    print(f"Última marca: {watcher.marca} (retome com --since {watcher.marca})", file=sys.stderr)
+    return 0
+
+
+def run_fan_out(args):
+    """
+    Executa a consulta em vários bancos ao mesmo tempo (--databases)
+
+    Cada perfil de conexão é consultado em sua própria thread e conexão; as
+    novidades são reunidas em um único documento, na ordem dos perfis, com
+    o campo 'origem'. O registro das tarefas é feito em cada banco de origem.
+    Bancos com erro ou sem resposta no prazo ficam de fora do documento.
+
+    Args:
+        args (argparse.Namespace): Argumentos da linha de comando
+
+    Returns:
+        int: Código de saída (1 se algum banco falhar na consulta ou no registro,
+             mesmo com documento gerado)
+    """
+    from fan_out import FanOut
+
+    timeout = args.db_timeout or config.db_timeout
+    for perfil in args.databases:
+        config.validate(perfil)
+
+    generator = JsonGenerator()
+
+    def consultar(db, perfil):
+        with metrics.stage('main.consulta'):
+            return list(generator.iter_novidades(fetch_results(db, args)))
+
+    print(f"Consultando {len(args.databases)} banco(s) em paralelo (tempo limite: {timeout}s)...",
+          file=sys.stderr)
+    partes = {}
+    for perfil, situacao in FanOut(args.databases, timeout).run(consultar).items():
+        if 'resultado' in situacao:
+            partes[perfil] = situacao['resultado']
+            print(f"  {perfil}: {len(partes[perfil])} novidade(s) em {situacao['segundos']:.2f}s",
+                  file=sys.stderr)
+
+    falhas = len(args.databases) - len(partes)
+    if not any(partes.values()):
+        if falhas:
+            print(f"\nERRO: Nenhum banco respondeu com novidades ({falhas} falha(s))", file=sys.stderr)
+        else:
+            print_no_results(args.modo)
+        return 1
+
+    print("\nGerando JSON...", file=sys.stderr)
+    with metrics.stage('main.json'):
+        json_data = generator.merge_json(
+            versao=args.versao,
+            partes=partes,
+            modo=args.modo,
+            output_filename=None if args.shard_by else args.output,
+            formato=args.formato
+        )
+
+    if args.shard_by:
+        with metrics.stage('main.shards'):
+            write_shards(generator, args, json_data)
+
+    generator.display_summary(json_data)
+
+    if args.render:
+        render_markdown(args, json_data)
+
+    # Cada banco registra apenas as suas tarefas
+    falhas_registro = 0
+    if not args.no_register:
+        print("Registrando tarefas como documentadas em cada banco...", file=sys.stderr)
+        registrar = {perfil: documented_files(novidades, args.versao) for perfil, novidades in partes.items()}
+        perfis = [perfil for perfil in registrar if registrar[perfil]]
+        if perfis:
+            situacoes = FanOut(perfis, timeout).run(
+                lambda db, perfil: register_tasks(db, registrar[perfil], propagar=True)
+            )
+            falhas_registro = sum(1 for situacao in situacoes.values() if 'erro' in situacao)
+
+    print("\n" + "=" * 70, file=sys.stderr)
+    if falhas:
+        print(f"PROCESSAMENTO CONCLUÍDO COM {falhas} BANCO(S) COM FALHA (fora do documento)", file=sys.stderr)
+    elif falhas_registro:
+        print(f"PROCESSAMENTO CONCLUÍDO COM FALHA NO REGISTRO EM {falhas_registro} BANCO(S)", file=sys.stderr)
+    else:
+        print("PROCESSAMENTO CONCLUÍDO COM SUCESSO!", file=sys.stderr)
+    print("=" * 70, file=sys.stderr)
+
+    if args.output:
+        print(f"\nArquivo gerado: {args.output}", file=sys.stderr)
+    elif not args.shard_by:
+        sys.stdout.flush()
+        with metrics.stage('main.saida'):
+            generator.write_document(sys.stdout.buffer, json_data, args.formato)
+            sys.stdout.buffer.flush()
+
+    return 1 if falhas or falhas_registro else 0
+
+
+def register_page(db, journal, pagina, registros, versao):
+    """
+    Registra as tarefas de uma página da extração paginada e anota no diário
+
+    Diferente de register_tasks, erros não são ignorados: a página continua
+    pendente no diário e o registro é refeito pelo --resume.
+
+    Args:
+        db (Database): Conexão ativa
+        journal (ExtractionJournal): Diário da extração
+        pagina (int): Número da página
+        registros (iterable): Registros normalizados da página
+        versao (str): Versão do changelog (define o arquivo .md)
+    """
+    tarefas = documented_files(JsonGenerator().iter_novidades(registros), versao)
+    if tarefas:
+        with metrics.stage('main.registro'):
+            resultado = db.register_documented_tasks(tarefas)
+        for numero_tarefa in resultado['conflitos']:
+            print(f"  Tarefa {numero_tarefa} já registrada (ignorada)", file=sys.stderr)
+    journal.mark_registered(pagina, len(tarefas))
+
+
+def run_paged(db, args):
+    """
+    Executa a extração paginada e retomável (--page-size / --resume)
+
+    As tarefas do ciclo são lidas em páginas pela chave Tarefaid. Cada
+    página é gravada no diário local antes de as suas tarefas serem
+    registradas, e o registro também é anotado no diário; após uma queda,
+    --resume continua depois da última página confirmada. O documento é
+    escrito no final, a partir do diário, sem manter o ciclo inteiro em
+    memória.
+
+    Args:
+        db (Database): Conexão ativa
+        args (argparse.Namespace): Argumentos da linha de comando
+
+    Returns:
+        int: Código de saída
+
+    Raises:
+        Exception: Se houver extração interrompida sem --resume, ou erro ao
+                   consultar/registrar (o diário é mantido para o --resume)
+    """
+    from extraction_journal import ExtractionJournal
+
+    journal = ExtractionJournal(ExtractionJournal.key(args))
+
+    if args.resume:
+        journal.load()
+        tamanho = args.page_size or journal.cabecalho['tamanhoPagina']
+        print(f"Retomando extração: {len(journal.paginas)} página(s) e {journal.total} registro(s) "
+              f"já confirmados no diário", file=sys.stderr)
+    elif journal.exists():
+        raise Exception(
+            f"Existe uma extração interrompida deste ciclo/versão ({journal.path}). "
+            f"Use --resume para continuar ou remova o arquivo para recomeçar"
+        )
+    else:
+        tamanho = args.page_size
+        journal.start({
+            'ciclo': args.ciclos[0],
+            'versao': args.versao,
+            'tamanhoPagina': tamanho,
+            'registrar': not args.no_register,
+        })
+
+    # O registro (ou não) das tarefas é definido no início da extração
+    registrar = journal.cabecalho['registrar']
+    normalizer = RecordNormalizer(docs_dir=args.docs_dir)
+    executor = QueryExecutor()
+
+    try:
+        # Páginas confirmadas antes da interrupção cujo registro não chegou ao diário
+        if registrar:
+            for pagina in journal.pending_registration():
+                register_page(db, journal, pagina, journal.iter_records({pagina}), args.versao)
+
+        while True:
+            print(f"\nLendo página {len(journal.paginas) + 1} "
+                  f"(tarefas após {journal.ultima_tarefa})...", file=sys.stderr)
+            registros = executor.execute_sql_file(db, 'consulta_tarefas_pagina.sql', {
+                'cicloCod': args.ciclos,
+                'ultimaTarefa': journal.ultima_tarefa,
+                'tamanhoPagina': tamanho,
+            })
+            if not registros:
+                break
+
+            registros = normalizer.normalize_all(registros)
+            pagina = journal.append_page(registros, registros[-1]['NumeroTarefa'])
+            if registrar:
+                register_page(db, journal, pagina, registros, args.versao)
+
+            if len(registros) < tamanho:
+                break
+
+    except Exception:
+        print(f"\nExtração interrompida; {len(journal.paginas)} página(s) confirmada(s) em {journal.path}. "
+              f"Execute novamente com --resume para continuar.", file=sys.stderr)
+        raise
+
+    if not journal.total:
+        journal.remove()
+        print_no_results(args.modo)
+        return 1
+
+    print(f"\nGerando JSON a partir do diário ({journal.total} registro(s))...", file=sys.stderr)
+    JsonGenerator().stream_json(
+        versao=args.versao,
+        data_results=journal.iter_records(),
+        modo=args.modo,
+        output_filename=args.output,
+        formato=args.formato
+    )
+    journal.remove()
+
+    print("\n" + "=" * 70, file=sys.stderr)
+    print("PROCESSAMENTO CONCLUÍDO COM SUCESSO!", file=sys.stderr)
+    print("=" * 70, file=sys.stderr)
+    if args.output:
+        print(f"\nArquivo gerado: {args.output}", file=sys.stderr)
+
+    return 0
+
+
+def run_migrate(argv):
+    """
+    Comando 'migrate': aplica as migrações pendentes do banco
+
+    Args:
+        argv (list): Argumentos após o nome do comando
+
+    Returns:
+        int: Código de saída
+    """
+    from migrator import Migrator, compare_plans
+
+    parser = argparse.ArgumentParser(
+        prog='main.py migrate',
+        description='Aplica as migrações versionadas de sql/migrations/'
+    )
+    parser.add_argument('--status', action='store_true',
+                        help='Apenas lista as migrações aplicadas e pendentes')
+    parser.add_argument('--sqlite', type=str,
+                        help='Aplica no banco SQLite informado em vez do SQL Server do .env')
+    parser.add_argument('--compare-plans', action='store_true',
+                        help='Compara o plano da consulta por ciclo antes/depois (SQLite em memória)')
+    parser.add_argument('--opcionais', action='store_true',
+                        help='Aplica também as migrações de sql/migrations/<dialeto>/opcionais/, que '
+                             'alteram TSK_Tarefa (coluna TrfVersao, usada por --cache e --modo watch)')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.compare_plans:
+            planos = compare_plans()
+            for fase in ('antes', 'depois'):
+                print(f"\nPlano {fase} das migrações:", file=sys.stderr)
+                for linha in planos[fase]:
+                    print(f"  {linha}", file=sys.stderr)
+            return 0
 
+        if args.sqlite:
+            from local_database import LocalDatabase
+            db = LocalDatabase(args.sqlite)
+        else:
+            from database import Database
+            config.validate()
+            db = Database()
+
+        with db:
+            migrator = Migrator(db)
+
+            if args.status:
+                for migration, situacao in migrator.status():
+                    print(f"  {migration.path.name:<40} {situacao}", file=sys.stderr)
+                return 0
+
+            aplicadas = migrator.migrate(opcionais=args.opcionais)
+            if not aplicadas:
+                print("Nenhuma migração pendente.", file=sys.stderr)
+            if not args.opcionais:
+                opcionais = [migration.path.name for migration, situacao in migrator.status()
+                             if situacao == 'opcional']
+                if opcionais:
+                    print(f"Migrações opcionais não aplicadas: {', '.join(opcionais)} "
+                          f"(use --opcionais)", file=sys.stderr)
+            return 0
+
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+
+def run_cache(argv):
+    """
+    Comando 'cache': consulta e invalida o cache local de tarefas e o cache de saída
+
+    Args:
+        argv (list): Argumentos após o nome do comando
+
+    Returns:
+        int: Código de saída
+    """
+    from task_cache import TaskCache
+    from output_cache import OutputCache
 
-def main():
+    parser = argparse.ArgumentParser(
+        prog='main.py cache',
+        description='Gerencia o cache local de tarefas por ciclo e o cache de saída'
+    )
+    parser.add_argument('--invalidar', nargs='?', const='todos', metavar='CICLOS',
+                        help='Descarta os ciclos informados (ex: 124,125) ou o cache inteiro')
+    parser.add_argument('--invalidar-saida', action='store_true',
+                        help='Descarta os documentos guardados no cache de saída')
+    args = parser.parse_args(argv)
+
+    try:
+        with TaskCache() as cache:
+            if args.invalidar == 'todos':
+                cache.invalidate()
+                print("Cache local esvaziado.", file=sys.stderr)
+            elif args.invalidar:
+                ciclos = parse_id_list(args.invalidar)
+                cache.invalidate(ciclos)
+                print(f"Ciclo(s) removido(s) do cache: {', '.join(map(str, ciclos))}", file=sys.stderr)
+
+            print(f"\nCache local: {cache.path}", file=sys.stderr)
+            for ciclo in cache.status():
+                print(f"  Ciclo {ciclo['CicloId']} ({ciclo['Banco']}): {ciclo['Tarefas']} tarefa(s), "
+                      f"{ciclo['Bytes'] / 1024:.1f} KB", file=sys.stderr)
+
+        with OutputCache() as cache:
+            if args.invalidar_saida:
+                cache.invalidate()
+                print("\nCache de saída esvaziado.", file=sys.stderr)
+
+            totais = cache.stats()
+            print(f"\nCache de saída: {cache.path}", file=sys.stderr)
+            print(f"  {totais['documentos']} documento(s), {totais['bytes'] / 1024:.1f} KB "
+                  f"(limite: {cache.max_bytes / (1024 * 1024):.0f} MB)", file=sys.stderr)
+            print(f"  {totais['acertos']} acerto(s), {totais['faltas']} falta(s), "
+                  f"{totais['descartes']} descarte(s)", file=sys.stderr)
+            return 0
+
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+
+def run_index(argv):
+    """
+    Comando 'index': atualiza _sidebar.md e as tabelas do README.md da raiz
+
+    Args:
+        argv (list): Argumentos após o nome do comando
+
+    Returns:
+        int: Código de saída
+    """
+    from index_builder import IndexBuilder
+
+    parser = argparse.ArgumentParser(
+        prog='main.py index',
+        description='Atualiza _sidebar.md e README.md a partir dos diretórios de sistema'
+    )
+    parser.add_argument('--docs-dir', type=str,
+                        help='Raiz dos changelogs .md (padrão: raiz do repositório)')
+    parser.add_argument('--force', action='store_true',
+                        help='Regenera todos os sistemas, ignorando o manifesto')
+    args = parser.parse_args(argv)
+
+    try:
+        IndexBuilder(docs_dir=args.docs_dir).build(force=args.force)
+        return 0
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+
+def run_search_index(argv):
+    """
+    Comando 'search-index': gera o índice de busca usado pelo index.html
+
+    Args:
+        argv (list): Argumentos após o nome do comando
+
+    Returns:
+        int: Código de saída
+    """
+    from search_index import SearchIndexBuilder
+
+    parser = argparse.ArgumentParser(
+        prog='main.py search-index',
+        description='Gera os shards do índice de busca em search/ (um por sistema)'
+    )
+    parser.add_argument('--docs-dir', type=str,
+                        help='Raiz dos changelogs .md (padrão: raiz do repositório)')
+    parser.add_argument('--force', action='store_true',
+                        help='Tokeniza todos os arquivos novamente')
+    args = parser.parse_args(argv)
+
+    try:
+        SearchIndexBuilder(docs_dir=args.docs_dir).build(force=args.force)
+        return 0
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+
+def run_lookup(argv):
+    """
+    Comando 'lookup': localiza tarefas nos changelogs publicados
+
+    Imprime uma linha por ocorrência no stdout:
+    numero<TAB>sistema<TAB>versao<TAB>arquivo:posicao
+
+    Args:
+        argv (list): Argumentos após o nome do comando
+
+    Returns:
+        int: Código de saída (1 se nenhuma ocorrência for encontrada)
+    """
+    from task_lookup import TaskLookupIndex
+
+    parser = argparse.ArgumentParser(
+        prog='main.py lookup',
+        description='Localiza em quais sistemas/versões uma tarefa foi documentada'
+    )
+    parser.add_argument('tarefas', nargs='*', type=int, metavar='TAREFA',
+                        help='Números das tarefas')
+    parser.add_argument('--texto', type=str,
+                        help='Busca por texto livre (sem diferenciar acentos)')
+    parser.add_argument('--limite', type=int, default=20,
+                        help='Máximo de resultados da busca por texto (padrão: 20)')
+    parser.add_argument('--docs-dir', type=str,
+                        help='Raiz dos changelogs .md (padrão: raiz do repositório)')
+    parser.add_argument('--no-refresh', action='store_true',
+                        help='Consulta o índice sem verificar arquivos alterados')
+    args = parser.parse_args(argv)
+
+    if not args.tarefas and not args.texto:
+        parser.error('informe ao menos um número de tarefa ou --texto')
+
+    try:
+        with TaskLookupIndex(docs_dir=args.docs_dir) as indice:
+            if not args.no_refresh:
+                indice.refresh()
+
+            encontrados = 0
+            for numero in args.tarefas:
+                ocorrencias = indice.lookup(numero)
+                if not ocorrencias:
+                    print(f"Tarefa {numero} não encontrada nos changelogs", file=sys.stderr)
+                for item in ocorrencias:
+                    print(f"{numero}\t{item['Sistema']}\t{item['Versao']}\t"
+                          f"{item['Caminho']}:{item['Posicao']}")
+                encontrados += len(ocorrencias)
+
+            if args.texto:
+                resultados = indice.search(args.texto, limite=args.limite)
+                if not resultados:
+                    print(f"Nenhum trecho encontrado para: {args.texto}", file=sys.stderr)
+                for item in resultados:
+                    print(f"{item['Sistema']}\t{item['Versao']}\t"
+                          f"{item['Caminho']}:{item['Posicao']}\t{' '.join(item['Trecho'].split())}")
+                encontrados += len(resultados)
+
+            return 0 if encontrados else 1
+
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+
+def run_summary(argv):
+    """
+    Comando 'summary': resume um documento gerado anteriormente
+
+    Não usa o banco nem o .env. Exibe o resumo em stderr e imprime no stdout
+    uma linha por sistema: versao<TAB>sistema<TAB>novidades
+
+    Args:
+        argv (list): Argumentos após o nome do comando
+
+    Returns:
+        int: Código de saída
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py summary',
+        description='Resume um documento gerado (json, ndjson ou binary) sem acessar o banco'
+    )
+    parser.add_argument('arquivo', type=str,
+                        help='Documento gerado (mesmo caminho usado em --output)')
+    parser.add_argument('--format', '-f', dest='formato', choices=FORMATOS,
+                        help='Formato do documento (padrão: detecta pela assinatura/extensão)')
+    args = parser.parse_args(argv)
+
+    try:
+        generator = JsonGenerator()
+        json_data = generator.read_json(args.arquivo, args.formato)
+        generator.display_summary(json_data)
+
+        if 'ciclos' in json_data:
+            documentos = list(json_data['ciclos'].values())
+        else:
+            documentos = [json_data]
+        for dados in documentos:
+            por_sistema = {}
+            for novidade in dados['novidades']:
+                por_sistema[novidade['sistema']] = por_sistema.get(novidade['sistema'], 0) + 1
+            for sistema, quantidade in sorted(por_sistema.items()):
+                print(f"{dados['versao']}\t{sistema}\t{quantidade}")
+        return 0
+
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+
+def diff_source(spec, generator, db, args):
+    """
+    Novidades de um dos lados do diff
+
+    Args:
+        spec (str): Arquivo gerado (json, ndjson ou binary) ou "ciclo:N[,M...]"
+        generator (JsonGenerator): Leitor dos arquivos
+        db (Database): Conexão ativa (apenas para "ciclo:")
+        args (argparse.Namespace): Argumentos do comando (usa docs_dir)
+
+    Returns:
+        generator: Novidades, lidas sob demanda
+    """
+    if not spec.startswith('ciclo:'):
+        return generator.read_novidades(spec)
+
+    # Consulta do modo ciclo, lida em blocos do cursor (mesmas novidades de --stream)
+    ciclos = parse_id_list(spec[len('ciclo:'):])
+    normalizer = RecordNormalizer(docs_dir=args.docs_dir)
+    results = QueryExecutor().iter_sql_file(db, 'consulta_tarefas.sql', {'cicloCod': ciclos})
+    return generator.iter_novidades(normalizer.normalize_all(results))
+
+
+def run_diff(argv):
+    """
+    Comando 'diff': diferenças entre as novidades de duas saídas
+
+    As saídas são comparadas pelo numeroTarefa (src/output_diff.py) e as
+    diferenças são gravadas à medida que são calculadas. Saídas que não
+    cabem no limite de memória são ordenadas em disco.
+
+    Args:
+        argv (list): Argumentos após o nome do comando
+
+    Returns:
+        int: Código de saída
+    """
+    from contextlib import nullcontext
+    from output_diff import OutputDiff
+
+    parser = argparse.ArgumentParser(
+        prog='main.py diff',
+        description='Compara as novidades de duas saídas pelo numeroTarefa: adicionadas, '
+                    'removidas e alteradas'
+    )
+    parser.add_argument('antes', type=str,
+                        help='Primeira saída: documento gerado (json, ndjson ou binary) ou '
+                             'ciclo:N (consulta ao banco)')
+    parser.add_argument('depois', type=str,
+                        help='Segunda saída, nos mesmos formatos')
+    parser.add_argument('--output', '-o', type=str,
+                        help='Arquivo das diferenças (padrão: stdout)')
+    parser.add_argument('--format', '-f', dest='formato', choices=FORMATOS, default='json',
+                        help='Formato das diferenças (padrão: json)')
+    parser.add_argument('--memoria-mb', type=int, metavar='MB',
+                        help='Memória para a comparação antes de ordenar em disco (padrão: 256)')
+    parser.add_argument('--sqlite', type=str, metavar='ARQUIVO',
+                        help='Com ciclo:N, consulta o banco SQLite informado em vez do SQL Server do .env')
+    parser.add_argument('--docs-dir', type=str,
+                        help='Raiz dos changelogs .md, para os apelidos de sistema (com ciclo:N)')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.memoria_mb is not None and args.memoria_mb < 1:
+            raise ValueError("A memória da comparação (--memoria-mb) deve ser maior que zero")
+
+        db = None
+        if any(spec.startswith('ciclo:') for spec in (args.antes, args.depois)):
+            if args.sqlite:
+                from local_database import LocalDatabase
+                db = LocalDatabase(args.sqlite)
+            else:
+                from database import Database
+                config.validate()
+                db = Database()
+
+        generator = JsonGenerator()
+        diff = OutputDiff(memoria_bytes=args.memoria_mb * 1024 * 1024 if args.memoria_mb else None)
+        cabecalho = {'antes': args.antes, 'depois': args.depois}
+
+        # Os dois lados usam a mesma conexão: o primeiro é lido até o fim antes do segundo
+        with db or nullcontext():
+            diferencas = diff.compare(diff_source(args.antes, generator, db, args),
+                                      diff_source(args.depois, generator, db, args))
+            with metrics.stage('diff.comparar'):
+                if args.output:
+                    with open(generator.output_dir / args.output, 'wb') as f:
+                        diff.write(f, cabecalho, diferencas, args.formato)
+                else:
+                    sys.stdout.flush()
+                    diff.write(sys.stdout.buffer, cabecalho, diferencas, args.formato)
+                    sys.stdout.buffer.flush()
+
+        diff.report()
+        if args.output:
+            print(f"Diferenças gravadas em: {generator.output_dir / args.output}", file=sys.stderr)
+        return 0
+
+    except Exception as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
+
+# Subcomandos aceitos como primeiro argumento (python main.py <comando> ...)
+COMMANDS = {
+    'migrate': run_migrate,
+    'cache': run_cache,
+    'index': run_index,
+    'search-index': run_search_index,
+    'lookup': run_lookup,
+    'summary': run_summary,
+    'diff': run_diff,
+}
+
+
+def main(argv=None):
     """Função principal da aplicação"""
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
     print("=" * 70, file=sys.stderr)
     print("CHANGELOG MANAGER - Gerador de JSON para Documentação", file=sys.stderr)
     print("=" * 70, file=sys.stderr)
 
     # Parse dos argumentos
-    args = parse_arguments()
+    args = parse_arguments(argv)
+
+    if args.profile or args.metrics_out:
+        metrics.enable()
+
+    profiler = None
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        return run_generate(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"Perfil do cProfile gravado em: {args.cprofile}", file=sys.stderr)
+        if args.profile:
+            metrics.report()
+        if args.metrics_out:
+            metrics.write(args.metrics_out, {
+                'modo': args.modo,
+                'ciclo': args.ciclo,
+                'tarefa': args.tarefa_id,
+                'versao': args.versao,
+                'formato': args.formato,
+                'stream': args.stream,
+                'lazy_details': args.lazy_details,
+                'databases': args.databases,
+            })
+
 
+def run_generate(args):
+    """
+    Gera o JSON (e, conforme as opções, os .md e o registro das tarefas)
+
+    Args:
+        args (argparse.Namespace): Argumentos da linha de comando
+
+    Returns:
+        int: Código de saída
+    """
     # Valida combinação de parâmetros
-    if args.modo == 'ciclo' and not args.ciclo:
-        print("\nERRO: Modo 'ciclo' requer o parâmetro --ciclo", file=sys.stderr)
+    if args.modo in ('ciclo', 'watch') and not args.ciclo:
+        print(f"\nERRO: Modo '{args.modo}' requer o parâmetro --ciclo", file=sys.stderr)
         return 1
 
     if args.modo == 'tarefa' and not args.tarefa_id:
         print("\nERRO: Modo 'tarefa' requer o parâmetro --tarefa-id", file=sys.stderr)
         return 1
 
+    try:
+        resolve_batch_arguments(args)
+    except ValueError as e:
+        print(f"\nERRO: {e}", file=sys.stderr)
+        return 1
+
     # Exibe parâmetros
     print(f"\nParâmetros:", file=sys.stderr)
     print(f"  Modo: {args.modo}", file=sys.stderr)
-    if args.modo == 'ciclo':
+    if args.modo in ('ciclo', 'watch'):
         print(f"  Ciclo: {args.ciclo}", file=sys.stderr)
     else:
         print(f"  Tarefa ID: {args.tarefa_id}", file=sys.stderr)
     print(f"  Versão: {args.versao}", file=sys.stderr)
+    if args.formato != 'json':
+        print(f"  Formato: {args.formato}", file=sys.stderr)
+    if args.shard_by:
+        print(f"  Separação: por {args.shard_by}", file=sys.stderr)
+    if args.stream:
+        print(f"  Streaming: sim", file=sys.stderr)
+    if args.page_size:
+        print(f"  Paginação: {args.page_size} tarefa(s) por página", file=sys.stderr)
+    if args.resume:
+        print(f"  Retomar extração: sim", file=sys.stderr)
+    if args.lazy_details:
+        print(f"  Detalhes: em duas fases (sem cache local)", file=sys.stderr)
+    elif args.cache:
+        print(f"  Cache local: sim", file=sys.stderr)
+    if args.render:
+        print(f"  Markdown: sim", file=sys.stderr)
+    if args.sqlite:
+        print(f"  Banco local: {args.sqlite}", file=sys.stderr)
+    if args.databases:
+        print(f"  Bancos: {', '.join(args.databases)}", file=sys.stderr)
     if args.output:
         print(f"  Output File: {args.output}", file=sys.stderr)
     else:
@@ -114,82 +1566,87 @@ def main():
     print(file=sys.stderr)
 
     try:
-        # Valida configurações
-        print("Validando configurações do .env...", file=sys.stderr)
-        config.validate()
-        print("Configurações OK!\n", file=sys.stderr)
-
-        # Conecta ao banco de dados
-        with Database() as db:
-            results = []
-
-            # Executa de acordo com o modo
-            if args.modo == 'ciclo':
-                # Modo Ciclo - busca todas as tarefas do ciclo
-                print("Executando consulta SQL (modo ciclo)...", file=sys.stderr)
-                executor = QueryExecutor()
-                parameters = {'cicloCod': args.ciclo}
-                results = executor.execute_sql_file(db, 'consulta_tarefas.sql', parameters)
-
-            elif args.modo == 'tarefa':
-                # Modo Tarefa - busca tarefa individual
-                print(f"Buscando tarefa {args.tarefa_id}...", file=sys.stderr)
-                task_mgr = TaskManager(db)
-                results = task_mgr.get_task_by_id(args.tarefa_id)
-
-            # Valida resultados
-            if not results:
-                print("\nNENHUM RESULTADO ENCONTRADO!", file=sys.stderr)
-                if args.modo == 'ciclo':
-                    print("Verifique se:", file=sys.stderr)
-                    print("  1. O ciclo informado está correto", file=sys.stderr)
-                    print("  2. Existem tarefas para documentar neste ciclo", file=sys.stderr)
-                    print("  3. As tarefas não foram documentadas anteriormente", file=sys.stderr)
-                else:
-                    print("Verifique se:", file=sys.stderr)
-                    print("  1. O ID da tarefa está correto", file=sys.stderr)
-                    print("  2. A tarefa não foi documentada anteriormente", file=sys.stderr)
-                    print("  3. A tarefa está concluída (TrfFim ou trffeito = 1)", file=sys.stderr)
-                return 1
-
-            # Gera JSON
-            print("\nGerando JSON...", file=sys.stderr)
+        if args.databases:
+            return run_fan_out(args)
+
+        if args.sqlite:
+            from local_database import LocalDatabase
+            db = LocalDatabase(args.sqlite)
+        else:
+            # Valida configurações
+            print("Validando configurações do .env...", file=sys.stderr)
+            config.validate()
+            print("Configurações OK!\n", file=sys.stderr)
+
+            # Conecta ao banco de dados (o driver ODBC só é carregado aqui)
+            from database import Database
+            db = Database()
+
+        with db:
+            if args.modo == 'watch':
+                return run_watch(db, args)
+
+            if args.page_size is not None or args.resume:
+                return run_paged(db, args)
+
+            if args.stream:
+                return run_streaming(db, args)
+
             generator = JsonGenerator()
-            json_data = generator.generate_json(
-                versao=args.versao,
-                data_results=results,
-                modo=args.modo,
-                output_filename=args.output  # None = stdout, string = arquivo
-            )
+            output_filename = None if args.shard_by else args.output
+
+            # Cache de saída: mesma execução sobre os mesmos dados devolve o documento guardado
+            chave, json_data = lookup_output_cache(db, args) if args.cache else (None, None)
+
+            if json_data is not None:
+                with metrics.stage('main.json'):
+                    generator.save_json(json_data, output_filename, args.formato)
+                tarefas = document_tasks(json_data)
+            else:
+                with metrics.stage('main.consulta'):
+                    results = fetch_results(db, args)
+
+                # Valida resultados
+                if not results:
+                    print_no_results(args.modo)
+                    return 1
+
+                # Gera JSON
+                print("\nGerando JSON...", file=sys.stderr)
+                with metrics.stage('main.json'):
+                    json_data, tarefas = build_json(generator, args, results, output_filename)
+
+                if chave:
+                    store_output_cache(chave, json_data)
+
+            # Um documento por sistema, emitido antes do resumo/render/registro
+            if args.shard_by:
+                with metrics.stage('main.shards'):
+                    write_shards(generator, args, json_data)
 
             # Exibe resumo (em stderr)
             generator.display_summary(json_data)
 
+            # Gera os arquivos .md (se habilitado)
+            if args.render:
+                render_markdown(args, json_data)
+
             # Registra tarefas como documentadas (se habilitado)
-            if not args.no_register and 'novidades' in json_data:
-                print("Registrando tarefas como documentadas...", file=sys.stderr)
-                for novidade in json_data['novidades']:
-                    if 'numeroTarefa' in novidade:
-                        numero_tarefa = novidade['numeroTarefa']
-                        sistema = novidade['sistema']
-                        arquivo_md = f"{sistema}/{args.versao}.md"
-
-                        try:
-                            db.register_documented_task(numero_tarefa, arquivo_md)
-                        except Exception as e:
-                            print(f"  Erro ao registrar tarefa {numero_tarefa}: {e}",
-                                  file=sys.stderr)
+            if not args.no_register:
+                register_tasks(db, tarefas)
 
             print("\n" + "=" * 70, file=sys.stderr)
             print("PROCESSAMENTO CONCLUÍDO COM SUCESSO!", file=sys.stderr)
             print("=" * 70, file=sys.stderr)
 
-            # Output final em stdout (apenas se não houver --output)
-            if not args.output:
-                import json
-                print(json.dumps(json_data, ensure_ascii=False, indent=2))
-            else:
+            # Output final em stdout (apenas se não houver --output nem --shard-by)
+            if args.output:
                 print(f"\nArquivo gerado: {args.output}", file=sys.stderr)
+            elif not args.shard_by:
+                sys.stdout.flush()
+                with metrics.stage('main.saida'):
+                    generator.write_document(sys.stdout.buffer, json_data, args.formato)
+                    sys.stdout.buffer.flush()
 
             return 0
 
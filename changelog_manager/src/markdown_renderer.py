@@ -0,0 +1,218 @@
+"""
+Módulo de geração dos changelogs em Markdown
+Converte as novidades do JSON em arquivos {Sistema}/{versao}.md seguindo o
+template de convencoes.md
+"""
+import re
+import sys
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from file_utils import TAREFA_DOCUMENTADA, atomic_write, system_dirname
+
+
+# Palavras-chave do resumo que definem a categoria (a primeira que casar vence)
+CATEGORIAS = [
+    (':warning:', ('CORREÇÃO', 'CORRECAO', 'CORRIGIR', 'ERRO', 'BUG', 'FALHA', 'FALTANDO', 'AJUSTE')),
+    (':arrow_up:', ('MELHORIA', 'OTIMIZ', 'ALTERAÇÃO', 'ALTERACAO', 'ALTERAR', 'PERFORMANCE')),
+]
+CATEGORIA_PADRAO = ':star:'
+
+# Abertura do bloco <details open> de uma seção (Resumo / Detalhes)
+_BLOCO = '<details open>\n<summary>{titulo}</summary>\n'
+
+
+def markdown_path(sistema, versao):
+    """
+    Caminho relativo do changelog de um sistema/versão
+
+    Args:
+        sistema (str): Nome do sistema
+        versao (str): Versão do changelog
+
+    Returns:
+        str: "{Sistema}/{versao}.md"
+    """
+    return f"{system_dirname(sistema)}/{versao}.md"
+
+
+def categoria(novidade):
+    """
+    Emoji da categoria da novidade (campo 'categoria' ou palavras-chave do resumo)
+
+    Args:
+        novidade (dict): Novidade do JSON
+
+    Returns:
+        str: ':star:', ':warning:' ou ':arrow_up:'
+    """
+    if novidade.get('categoria'):
+        return novidade['categoria']
+
+    resumo = str(novidade.get('resumo') or '').upper()
+    for emoji, palavras in CATEGORIAS:
+        if any(palavra in resumo for palavra in palavras):
+            return emoji
+    return CATEGORIA_PADRAO
+
+
+class MarkdownRenderer:
+    """Gera e atualiza os arquivos .md de changelog a partir das novidades"""
+
+    def __init__(self, docs_dir=None, template_path=None, max_workers=4):
+        """
+        Inicializa o gerador e lê o template de convencoes.md
+
+        Args:
+            docs_dir (str, optional): Raiz dos changelogs (padrão: raiz do repositório)
+            template_path (str, optional): Arquivo de convenções (padrão: convencoes.md da raiz)
+            max_workers (int): Quantidade de arquivos escritos em paralelo
+
+        Raises:
+            Exception: Se o template não for encontrado em convencoes.md
+        """
+        if docs_dir:
+            self.docs_dir = Path(docs_dir)
+        else:
+            self.docs_dir = Path(__file__).parent.parent.parent
+
+        self.template_path = Path(template_path) if template_path else self.docs_dir / 'convencoes.md'
+        self.max_workers = max_workers
+        self.template = self._load_template()
+
+    def _load_template(self):
+        """Extrai o bloco ```markdown da seção '## Template' de convencoes.md"""
+        if not self.template_path.exists():
+            raise Exception(f"Arquivo de convenções não encontrado: {self.template_path}")
+
+        with open(self.template_path, 'r', encoding='utf-8') as f:
+            conteudo = f.read()
+
+        match = re.search(r'## Template.*?```markdown\n(.*?)\n```', conteudo, re.DOTALL)
+        if not match:
+            raise Exception(f"Template não encontrado em {self.template_path}")
+
+        template = match.group(1)
+        for titulo in ('Resumo', 'Detalhes'):
+            if _BLOCO.format(titulo=titulo) not in template:
+                raise Exception(f"Bloco '{titulo}' não encontrado no template de {self.template_path}")
+        return template
+
+    def render(self, versao, novidades):
+        """
+        Gera os changelogs de uma versão, um arquivo por sistema, em paralelo
+
+        Args:
+            versao (str): Versão do changelog
+            novidades (iterable): Novidades do JSON (sistema, resumo, detalhes, numeroTarefa)
+
+        Returns:
+            dict: {caminho_relativo: quantidade de novidades adicionadas}
+        """
+        por_arquivo = {}
+        for novidade in novidades:
+            caminho = markdown_path(novidade['sistema'], versao)
+            por_arquivo.setdefault(caminho, []).append(novidade)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futuros = {
+                caminho: pool.submit(self.write_file, caminho, versao, itens)
+                for caminho, itens in por_arquivo.items()
+            }
+            resultado = {caminho: futuro.result() for caminho, futuro in futuros.items()}
+
+        for caminho, adicionadas in resultado.items():
+            print(f"  {caminho}: {adicionadas} novidade(s) adicionada(s)", file=sys.stderr)
+        return resultado
+
+    def write_file(self, caminho, versao, novidades):
+        """
+        Cria ou complementa um changelog, sem repetir tarefas já documentadas nele
+
+        Args:
+            caminho (str): Caminho relativo "{Sistema}/{versao}.md"
+            versao (str): Versão do changelog
+            novidades (list): Novidades do mesmo sistema
+
+        Returns:
+            int: Quantidade de novidades adicionadas ao arquivo
+        """
+        destino = self.docs_dir / caminho
+
+        if destino.exists():
+            with open(destino, 'r', encoding='utf-8') as f:
+                conteudo = f.read()
+        else:
+            sistema = caminho.split('/', 1)[0]
+            conteudo = self._empty_document(sistema, versao)
+
+        existentes = set(TAREFA_DOCUMENTADA.findall(conteudo))
+        novas = []
+        for novidade in novidades:
+            numero = novidade.get('numeroTarefa')
+            if numero is not None and str(numero) in existentes:
+                continue
+            if numero is not None:
+                existentes.add(str(numero))
+            novas.append(novidade)
+
+        if not novas:
+            return 0
+
+        resumo = ''.join(f"- {categoria(n)} {self._titulo(n)}\n" for n in novas)
+        detalhes = ''.join(self._detail(n) for n in novas)
+        conteudo = self._append_to_block(conteudo, 'Resumo', resumo)
+        conteudo = self._append_to_block(conteudo, 'Detalhes', detalhes)
+
+        atomic_write(destino, conteudo)
+        return len(novas)
+
+    def _empty_document(self, sistema, versao):
+        """Template de convencoes.md com cabeçalho preenchido e blocos Resumo/Detalhes vazios"""
+        conteudo = self.template.replace('NomeSistema', sistema, 1).replace('X.XX.XX.XX', versao, 1)
+
+        for titulo in ('Resumo', 'Detalhes'):
+            inicio = conteudo.index(_BLOCO.format(titulo=titulo)) + len(_BLOCO.format(titulo=titulo))
+            fim = conteudo.index('</details>', inicio)
+            conteudo = conteudo[:inicio] + '\n' + conteudo[fim:]
+
+        return conteudo + '\n'
+
+    @staticmethod
+    def _titulo(novidade):
+        """Texto do item (resumo em uma linha)"""
+        return ' '.join(str(novidade.get('resumo') or '').split())
+
+    def _detail(self, novidade):
+        """Item da seção Detalhes: título com emoji, descrição e número da tarefa"""
+        partes = [f"{categoria(novidade)} {self._titulo(novidade)}\n\n"]
+
+        descricao = str(novidade.get('detalhes') or '').replace('\r\n', '\n').strip()
+        if descricao:
+            partes.append(f"{descricao}\n\n")
+        if novidade.get('numeroTarefa') is not None:
+            partes.append(f"Tarefa: {novidade['numeroTarefa']}\n\n")
+
+        return ''.join(partes)
+
+    @staticmethod
+    def _append_to_block(conteudo, titulo, texto):
+        """Insere o texto no fim do primeiro bloco <details> com o título informado"""
+        marcador = _BLOCO.format(titulo=titulo)
+        inicio = conteudo.find(marcador)
+        if inicio < 0:
+            # Arquivo fora do padrão: acrescenta um bloco novo ao final
+            return f"{conteudo.rstrip()}\n\n{marcador}\n{texto}</details>\n"
+
+        fim = conteudo.index('</details>', inicio)
+        corpo = conteudo[inicio + len(marcador):fim].strip('\n')
+
+        if corpo:
+            # Itens do Resumo ficam em linhas consecutivas; os de Detalhes, separados por linha em branco
+            separador = '\n' if titulo == 'Resumo' else '\n\n'
+            novo_corpo = f"\n{corpo}{separador}{texto}"
+        else:
+            novo_corpo = f"\n{texto}"
+        if not novo_corpo.endswith('\n\n'):
+            novo_corpo += '\n'
+
+        return conteudo[:inicio + len(marcador)] + novo_corpo + conteudo[fim:]
@@ -0,0 +1,136 @@
+"""
+Módulo de métricas de execução
+Temporizadores por etapa e contadores (linhas lidas, bytes emitidos, idas e
+voltas ao banco, commits) usados por --profile e --metrics-out. Desativado,
+cada ponto de medição custa apenas a verificação de um atributo.
+"""
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+# Contexto sem efeito devolvido por stage() quando as métricas estão desativadas
+_NULL = nullcontext()
+
+
+class Metrics:
+    """Acumula tempo por etapa e contadores de uma execução (seguro entre threads)"""
+
+    def __init__(self):
+        """Inicializa as métricas desativadas"""
+        self.enabled = False
+        self.etapas = {}
+        self.contadores = {}
+        self.inicio = None
+        # O servidor HTTP e a consulta em vários bancos medem de várias threads
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Ativa a coleta e zera os valores acumulados"""
+        self.enabled = True
+        self.etapas = {}
+        self.contadores = {}
+        self.inicio = time.perf_counter()
+
+    def stage(self, nome):
+        """
+        Mede o tempo de um trecho (with metrics.stage('db.executar'): ...)
+
+        Etapas são acumuladas pelo nome; o prefixo até o primeiro '.' agrupa
+        as etapas do mesmo componente (db, sql, json...).
+
+        Args:
+            nome (str): Nome da etapa
+
+        Returns:
+            context manager: Temporizador, ou um contexto vazio se desativado
+        """
+        if not self.enabled:
+            return _NULL
+        return self._timer(nome)
+
+    @contextmanager
+    def _timer(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(nome, time.perf_counter() - inicio)
+
+    def add_time(self, nome, segundos):
+        """Acumula uma duração já medida na etapa nome"""
+        if not self.enabled:
+            return
+        with self._lock:
+            etapa = self.etapas.setdefault(nome, [0, 0.0])
+            etapa[0] += 1
+            etapa[1] += segundos
+
+    def count(self, nome, valor=1):
+        """Soma valor ao contador nome"""
+        if self.enabled:
+            with self._lock:
+                self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+    def to_dict(self, contexto=None):
+        """
+        Métricas em formato serializável
+
+        Args:
+            contexto (dict, optional): Dados da execução (modo, ciclo, versão...)
+
+        Returns:
+            dict: {'timestamp', 'total_s', 'contexto', 'etapas': {nome: {chamadas, segundos}}, 'contadores'}
+        """
+        total = time.perf_counter() - self.inicio if self.inicio is not None else 0.0
+        with self._lock:
+            etapas = {
+                nome: {'chamadas': chamadas, 'segundos': round(segundos, 6)}
+                for nome, (chamadas, segundos) in self.etapas.items()
+            }
+            contadores = dict(self.contadores)
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'total_s': round(total, 6),
+            'contexto': contexto or {},
+            'etapas': etapas,
+            'contadores': contadores,
+        }
+
+    def report(self, f=None):
+        """Imprime a tabela de etapas e os contadores (padrão: stderr)"""
+        f = f or sys.stderr
+        dados = self.to_dict()
+        total = dados['total_s'] or 1e-9
+
+        print("\n" + "=" * 70, file=f)
+        print("PERFIL DA EXECUÇÃO", file=f)
+        print("=" * 70, file=f)
+        print(f"{'etapa':<28} {'chamadas':>9} {'tempo (s)':>11} {'% total':>8}", file=f)
+        for nome, etapa in dados['etapas'].items():
+            print(f"{nome:<28} {etapa['chamadas']:>9} {etapa['segundos']:>11.4f} "
+                  f"{100 * etapa['segundos'] / total:>7.1f}%", file=f)
+        print(f"{'total':<28} {'':>9} {dados['total_s']:>11.4f}", file=f)
+
+        if dados['contadores']:
+            print("\nContadores:", file=f)
+            for nome, valor in dados['contadores'].items():
+                print(f"  {nome}: {valor}", file=f)
+
+    def write(self, path, contexto=None):
+        """
+        Grava as métricas em JSON (uma execução por arquivo)
+
+        Args:
+            path (str): Arquivo de saída
+            contexto (dict, optional): Dados da execução
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(contexto), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"Métricas gravadas em: {path}", file=sys.stderr)
+
+
+# Instância global de métricas
+metrics = Metrics()
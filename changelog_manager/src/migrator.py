@@ -0,0 +1,263 @@
+"""
+Módulo de migrações versionadas do banco de dados
+Aplica em ordem os scripts de sql/migrations/<dialeto>/ e registra cada um na
+tabela TSK_ChangelogMigracoes. Os scripts de sql/migrations/<dialeto>/opcionais/
+alteram tabelas usadas por outros sistemas (ex: coluna TrfVersao em
+TSK_Tarefa) e só são aplicados quando solicitados (migrate --opcionais)
+"""
+import re
+import sys
+import hashlib
+from pathlib import Path
+
+
+MIGRATIONS_TABLE = 'TSK_ChangelogMigracoes'
+
+_CREATE_MIGRATIONS_TABLE = {
+    'sqlserver': f"""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = '{MIGRATIONS_TABLE}')
+        BEGIN
+            CREATE TABLE {MIGRATIONS_TABLE} (
+                Versao VARCHAR(20) NOT NULL PRIMARY KEY,
+                Nome VARCHAR(200) NOT NULL,
+                Checksum CHAR(64) NOT NULL,
+                DataAplicacao DATETIME NOT NULL DEFAULT GETDATE()
+            );
+        END
+    """,
+    'sqlite': f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            Versao VARCHAR(20) NOT NULL PRIMARY KEY,
+            Nome VARCHAR(200) NOT NULL,
+            Checksum CHAR(64) NOT NULL,
+            DataAplicacao DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """,
+}
+
+# Subdiretório das migrações aplicadas apenas com migrate --opcionais
+OPTIONAL_DIR = 'opcionais'
+
+# Nome do arquivo: 0001_descricao.sql
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Separador de batches do T-SQL (linha contendo apenas GO)
+_BATCH_SEPARATOR = re.compile(r'^\s*GO\s*$', re.IGNORECASE | re.MULTILINE)
+
+# Consulta por ciclo anterior às migrações (LEFT JOIN com conversão implícita),
+# mantida apenas para a comparação de planos
+LEGACY_CICLO_QUERY = """
+select
+        t.Tarefaid as NumeroTarefa,
+        t.CicloId as CicloId
+from
+        TSK_Tarefa t
+        left join TSK_TarefasDocumentadas td on (t.Tarefaid = td.NumeroTarefa)
+where
+        td.NumeroTarefa is null
+        and t.CicloId in (?)
+        and (t.TrfFim is not null or t.trffeito = 1)
+"""
+
+
+class Migration:
+    """Script de migração em disco"""
+
+    def __init__(self, path):
+        """
+        Lê o script de migração
+
+        Args:
+            path (Path): Caminho do arquivo NNNN_descricao.sql
+        """
+        match = _MIGRATION_FILE.match(path.name)
+        self.path = path
+        self.versao = match.group(1)
+        self.nome = match.group(2)
+        self.opcional = path.parent.name == OPTIONAL_DIR
+
+        with open(path, 'r', encoding='utf-8') as f:
+            self.sql = f.read()
+        self.checksum = hashlib.sha256(self.sql.encode('utf-8')).hexdigest()
+
+    def batches(self):
+        """
+        Divide o script em batches (separados por linhas GO)
+
+        Returns:
+            list: Trechos de SQL não vazios
+        """
+        return [batch.strip() for batch in _BATCH_SEPARATOR.split(self.sql) if batch.strip()]
+
+
+class Migrator:
+    """Aplica as migrações pendentes do dialeto do banco conectado"""
+
+    def __init__(self, database, migrations_dir=None):
+        """
+        Inicializa o migrador
+
+        Args:
+            database: Instância conectada de Database ou LocalDatabase
+            migrations_dir (str, optional): Diretório base (padrão: ../sql/migrations/)
+        """
+        self.db = database
+
+        if migrations_dir:
+            base_dir = Path(migrations_dir)
+        else:
+            base_dir = Path(__file__).parent.parent / 'sql' / 'migrations'
+        self.migrations_dir = base_dir / database.dialect
+
+    def available(self):
+        """
+        Lista os scripts de migração do dialeto (obrigatórios e opcionais), em ordem de versão
+
+        Returns:
+            list: Objetos Migration
+
+        Raises:
+            Exception: Se duas migrações tiverem a mesma versão
+        """
+        if not self.migrations_dir.exists():
+            raise Exception(f"Diretório de migrações não encontrado: {self.migrations_dir}")
+
+        paths = [*self.migrations_dir.glob('*.sql'), *(self.migrations_dir / OPTIONAL_DIR).glob('*.sql')]
+        migrations = [Migration(path) for path in paths if _MIGRATION_FILE.match(path.name)]
+        migrations.sort(key=lambda migration: int(migration.versao))
+
+        versoes = [migration.versao for migration in migrations]
+        duplicadas = sorted({versao for versao in versoes if versoes.count(versao) > 1})
+        if duplicadas:
+            raise Exception(f"Versões de migração duplicadas: {', '.join(duplicadas)}")
+
+        return migrations
+
+    def applied(self):
+        """
+        Retorna as migrações já registradas no banco
+
+        Returns:
+            dict: {versao: {'Nome', 'Checksum', 'DataAplicacao'}}
+        """
+        self.db.execute_script(_CREATE_MIGRATIONS_TABLE[self.db.dialect])
+        self.db.connection.commit()
+
+        rows = self.db.execute_query(
+            f"SELECT Versao, Nome, Checksum, DataAplicacao FROM {MIGRATIONS_TABLE}"
+        )
+        return {str(row['Versao']): row for row in rows}
+
+    def status(self):
+        """
+        Situação de cada migração disponível
+
+        Returns:
+            list: Tuplas (migration, situacao) com situacao em 'aplicada',
+                  'pendente', 'opcional' (opcional ainda não aplicada) ou
+                  'alterada' (checksum diferente)
+        """
+        aplicadas = self.applied()
+        situacao = []
+
+        for migration in self.available():
+            registro = aplicadas.get(migration.versao)
+            if registro is None:
+                situacao.append((migration, 'opcional' if migration.opcional else 'pendente'))
+            elif registro['Checksum'].strip() != migration.checksum:
+                situacao.append((migration, 'alterada'))
+            else:
+                situacao.append((migration, 'aplicada'))
+
+        return situacao
+
+    def migrate(self, opcionais=False):
+        """
+        Aplica as migrações pendentes, cada uma em sua própria transação
+
+        Args:
+            opcionais (bool): Se True, aplica também as migrações opcionais
+
+        Returns:
+            list: Migrações aplicadas nesta execução
+
+        Raises:
+            Exception: Se alguma migração falhar (a migração é desfeita e as
+                       seguintes não são aplicadas)
+        """
+        aplicadas = []
+
+        for migration, situacao in self.status():
+            if situacao == 'alterada':
+                print(f"AVISO: A migração {migration.path.name} foi alterada após ser aplicada",
+                      file=sys.stderr)
+                continue
+            if situacao == 'aplicada' or (situacao == 'opcional' and not opcionais):
+                continue
+
+            try:
+                for batch in migration.batches():
+                    self.db.execute_script(batch)
+                self.db.cursor.execute(
+                    f"INSERT INTO {MIGRATIONS_TABLE} (Versao, Nome, Checksum) VALUES (?, ?, ?)",
+                    (migration.versao, migration.nome, migration.checksum)
+                )
+                self.db.connection.commit()
+            except Exception as e:
+                self.db.connection.rollback()
+                raise Exception(f"Erro ao aplicar a migração {migration.path.name}: {e}")
+
+            print(f"Migração aplicada: {migration.path.name}", file=sys.stderr)
+            aplicadas.append(migration)
+
+        return aplicadas
+
+
+def explain(database, query, params=None):
+    """
+    Plano de execução de uma query no banco local (EXPLAIN QUERY PLAN)
+
+    Args:
+        database: Instância conectada de LocalDatabase
+        query (str): Query SQL
+        params (list, optional): Valores dos marcadores '?'
+
+    Returns:
+        list: Linhas do plano (texto)
+    """
+    database.cursor.execute(f"EXPLAIN QUERY PLAN {query}", params or [])
+    return [row[3] for row in database.cursor.fetchall()]
+
+
+def compare_plans(ciclo=1):
+    """
+    Compara o plano da consulta por ciclo antes e depois das migrações
+
+    Usa um banco SQLite em memória como substituto do SQL Server: o plano
+    "antes" é o da consulta com LEFT JOIN sobre a estrutura da migração 0001,
+    e o plano "depois" é o de consulta_tarefas.sql com todas as migrações.
+
+    Args:
+        ciclo (int): Valor usado no parâmetro {cicloCod}
+
+    Returns:
+        dict: {'antes': [linhas do plano], 'depois': [linhas do plano]}
+    """
+    from local_database import LocalDatabase
+    from query_catalog import get_catalog
+
+    planos = {}
+    with LocalDatabase() as db:
+        migrator = Migrator(db)
+        baseline = migrator.available()[0]
+        db.execute_script(baseline.sql)
+        db.connection.commit()
+        planos['antes'] = explain(db, LEGACY_CICLO_QUERY, [ciclo])
+
+        for migration in migrator.available()[1:]:
+            db.execute_script(migration.sql)
+            db.connection.commit()
+        sql, valores = get_catalog().bind('consulta_tarefas.sql', {'cicloCod': [ciclo]})
+        planos['depois'] = explain(db, sql, valores)
+
+    return planos
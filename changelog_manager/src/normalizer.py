@@ -0,0 +1,196 @@
+"""
+Módulo de normalização dos registros de tarefas
+Separa o TrfNome bruto em Sistema/Resumo no cliente, remove espaços, aplica
+normalização Unicode e converte apelidos de sistema no nome canônico do
+diretório de documentação
+"""
+import os
+import re
+import sys
+import json
+import unicodedata
+from pathlib import Path
+from config import config
+from file_utils import IGNORED_DIRS
+from records import Record, record_type
+
+# Sequências de espaços (inclusive tabulações e quebras de linha) no nome do sistema
+_ESPACOS = re.compile(r'\s+')
+
+
+def _chave(texto):
+    """Chave de comparação de nomes de sistema: NFC, espaços simples, maiúsculas"""
+    return _ESPACOS.sub(' ', unicodedata.normalize('NFC', texto)).strip().upper()
+
+
+class RecordNormalizer:
+    """Normaliza Sistema/Resumo/Detalhes dos registros vindos do banco"""
+
+    def __init__(self, docs_dir=None, alias_path=None):
+        """
+        Inicializa o normalizador e carrega a tabela de apelidos
+
+        Args:
+            docs_dir (str, optional): Raiz dos changelogs; os nomes dos diretórios de
+                                      sistema são os nomes canônicos (padrão: raiz do repositório)
+            alias_path (str, optional): Tabela de apelidos (padrão: SISTEMAS_ALIAS_PATH)
+
+        Raises:
+            Exception: Se a tabela de apelidos existir e for inválida
+        """
+        self.docs_dir = Path(docs_dir) if docs_dir else Path(__file__).parent.parent.parent
+        self.alias_path = Path(alias_path or config.sistemas_alias_path)
+        self.aliases, self.padroes = self._load_aliases()
+        self.diretorios = self._system_dirs()
+
+        # Sistema bruto -> nome canônico (internado), calculado uma vez por valor distinto
+        self._sistemas = {}
+
+        # Tipo de registro de entrada -> (tipo de saída, posições das colunas)
+        self._layouts = {}
+
+    def _load_aliases(self):
+        """
+        Lê a tabela de apelidos
+
+        Formato: {"aliases": {"APELIDO": "Canonico"}, "padroes": [["regex", "Canonico"]]}
+        """
+        if not self.alias_path.exists():
+            return {}, []
+
+        try:
+            with open(self.alias_path, 'r', encoding='utf-8') as f:
+                tabela = json.load(f)
+            aliases = {_chave(apelido): canonico for apelido, canonico in tabela.get('aliases', {}).items()}
+            padroes = [(re.compile(padrao, re.IGNORECASE), canonico) for padrao, canonico in tabela.get('padroes', [])]
+        except (OSError, ValueError, re.error) as e:
+            raise Exception(f"Tabela de apelidos de sistema inválida ({self.alias_path}): {e}")
+
+        return aliases, padroes
+
+    def _system_dirs(self):
+        """Diretórios de sistema existentes: {chave: nome do diretório}"""
+        if not self.docs_dir.is_dir():
+            return {}
+        return {
+            _chave(entrada.name): entrada.name
+            for entrada in os.scandir(self.docs_dir)
+            if entrada.is_dir() and not entrada.name.startswith('.') and entrada.name not in IGNORED_DIRS
+        }
+
+    def canonical_system(self, sistema):
+        """
+        Nome canônico de um sistema
+
+        Ordem: apelido exato, primeiro padrão que casar e, por fim, o nome de
+        diretório existente com a mesma grafia (sem diferenciar maiúsculas).
+
+        Args:
+            sistema (str): Nome como veio do banco (ex: "ICRMIMPRESSOR ")
+
+        Returns:
+            str: Nome canônico internado (ex: "CRMImpressor")
+        """
+        canonico = self._sistemas.get(sistema)
+        if canonico is not None:
+            return canonico
+
+        chave = _chave(sistema or '')
+        nome = self.aliases.get(chave)
+        if nome is None:
+            nome = next((destino for padrao, destino in self.padroes if padrao.fullmatch(chave)), None)
+        if nome is None:
+            nome = _ESPACOS.sub(' ', unicodedata.normalize('NFC', sistema or '')).strip()
+        nome = self.diretorios.get(_chave(nome), nome)
+
+        canonico = sys.intern(nome)
+        self._sistemas[sistema] = canonico
+        return canonico
+
+    def normalize(self, record):
+        """
+        Normaliza um registro
+
+        Registros com a coluna 'Nome' (TrfNome bruto, "Sistema - Resumo") são
+        separados no primeiro '-'; registros que já trazem Sistema/Resumo
+        (SQL personalizado) apenas passam pela limpeza.
+
+        Args:
+            record (Record | dict): Registro do banco
+
+        Returns:
+            Record | dict: Novo registro (Record) com Sistema, Resumo e Detalhes
+                           normalizados, ou o próprio dicionário alterado
+        """
+        if isinstance(record, Record):
+            return self._normalize_record(record)
+
+        if 'Nome' in record:
+            nome = record.pop('Nome') or ''
+            sistema, separador, resumo = nome.partition('-')
+            record['Sistema'] = sistema
+            record['Resumo'] = resumo if separador else nome
+
+        if 'Sistema' in record:
+            record['Sistema'] = self.canonical_system(record['Sistema'])
+        if record.get('Resumo') is not None:
+            record['Resumo'] = unicodedata.normalize('NFC', record['Resumo']).strip()
+        if record.get('Detalhes') is not None:
+            record['Detalhes'] = unicodedata.normalize('NFC', record['Detalhes'])
+
+        return record
+
+    def _normalize_record(self, record):
+        """Normaliza um Record, usando as posições calculadas uma vez por tipo de registro"""
+        layout = self._layouts.get(record.__class__)
+        if layout is None:
+            layout = self._layouts[record.__class__] = self._layout(record._fields)
+        saida, nome, sistema, resumo, detalhes = layout
+
+        valores = list(record)
+        if nome is not None:
+            texto = valores[nome] or ''
+            antes, separador, depois = texto.partition('-')
+            valores[nome] = antes
+            valores.insert(nome + 1, depois if separador else texto)
+
+        if sistema is not None:
+            valores[sistema] = self.canonical_system(valores[sistema])
+        if resumo is not None and valores[resumo] is not None:
+            valores[resumo] = unicodedata.normalize('NFC', valores[resumo]).strip()
+        if detalhes is not None and valores[detalhes] is not None:
+            valores[detalhes] = unicodedata.normalize('NFC', valores[detalhes])
+
+        return tuple.__new__(saida, valores)
+
+    @staticmethod
+    def _layout(colunas):
+        """
+        Tipo de saída e posições das colunas para um tipo de registro de entrada
+
+        Returns:
+            tuple: (tipo de saída, posição de Nome na entrada, posições de
+                    Sistema, Resumo e Detalhes na saída - None se ausentes)
+        """
+        nome = colunas.index('Nome') if 'Nome' in colunas else None
+        if nome is not None:
+            colunas = colunas[:nome] + ('Sistema', 'Resumo') + colunas[nome + 1:]
+
+        def posicao(coluna):
+            return colunas.index(coluna) if coluna in colunas else None
+
+        return record_type(colunas), nome, posicao('Sistema'), posicao('Resumo'), posicao('Detalhes')
+
+    def normalize_all(self, records):
+        """
+        Normaliza os registros à medida que são consumidos
+
+        Args:
+            records (iterable): Registros do banco (lista ou gerador)
+
+        Returns:
+            list | generator: Lista, se a entrada for lista; caso contrário, gerador
+        """
+        if isinstance(records, list):
+            return [self.normalize(record) for record in records]
+        return (self.normalize(record) for record in records)
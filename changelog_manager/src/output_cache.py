@@ -0,0 +1,304 @@
+"""
+Módulo do cache de saída (documentos gerados)
+Guarda em um arquivo SQLite o JSON de generate_json, endereçado pelo conteúdo
+de tudo que define o resultado: modo, parâmetros, versão, arquivos SQL do
+caminho de execução, tabela de apelidos, diretórios de sistema, banco de
+origem e a marca d'água dos dados. Uma execução repetida
+com os mesmos dados custa uma única consulta (a marca d'água)
+"""
+import sys
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+from pathlib import Path
+from config import config
+from query_executor import QueryExecutor
+from normalizer import RecordNormalizer
+
+
+class OutputCache:
+    """Cache dos documentos gerados, limitado por tamanho (descarta os usados há mais tempo)"""
+
+    # Versão do esquema do arquivo e do formato da chave; caches anteriores são recriados
+    SCHEMA_VERSION = 2
+
+    # IDs por consulta da marca d'água no modo tarefa (limite de parâmetros do SQL Server)
+    WATERMARK_BATCH_SIZE = 1000
+
+    # Consulta principal e marca d'água de cada modo
+    QUERIES = {
+        'ciclo': ('consulta_tarefas.sql', 'consulta_marca_ciclo.sql'),
+        'tarefa': ('consulta_tarefa_individual.sql', 'consulta_marca_tarefas.sql'),
+    }
+
+    # Consultas de cada caminho de execução do modo ciclo (fetch_results)
+    CYCLE_QUERIES = {
+        # Cache local de tarefas, com a consulta completa se o cache falhar
+        'cache': ('consulta_tarefas_chaves.sql', 'consulta_tarefas_cache.sql', 'consulta_tarefas.sql'),
+        'lazy_details': ('consulta_tarefas_leve.sql', 'consulta_detalhes.sql'),
+    }
+
+    def __init__(self, path=None, max_bytes=None):
+        """
+        Inicializa o cache (o arquivo é aberto no connect)
+
+        Args:
+            path (str, optional): Arquivo SQLite do cache (padrão: OUTPUT_CACHE_PATH)
+            max_bytes (int, optional): Tamanho máximo dos documentos guardados,
+                                       compactados (padrão: OUTPUT_CACHE_MAX_MB)
+        """
+        self.path = str(path or config.output_cache_path)
+        self.max_bytes = max_bytes if max_bytes is not None else config.output_cache_max_mb * 1024 * 1024
+        self.executor = QueryExecutor()
+        self.connection = None
+
+    def connect(self):
+        """Abre o arquivo do cache e cria as tabelas na primeira execução"""
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+
+        # O cache é descartável: um arquivo com esquema antigo é recriado
+        versao = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if versao != self.SCHEMA_VERSION:
+            self.connection.executescript(f"""
+                DROP TABLE IF EXISTS Documentos;
+                DROP TABLE IF EXISTS Estatisticas;
+                PRAGMA user_version = {self.SCHEMA_VERSION};
+            """)
+
+        self.connection.executescript("""
+            PRAGMA auto_vacuum = INCREMENTAL;
+
+            CREATE TABLE IF NOT EXISTS Documentos (
+                Chave TEXT PRIMARY KEY,
+                Documento BLOB NOT NULL,
+                Bytes INTEGER NOT NULL,
+                Novidades INTEGER NOT NULL,
+                Criado REAL NOT NULL,
+                UltimoUso REAL NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS IX_Documentos_UltimoUso ON Documentos (UltimoUso);
+
+            CREATE TABLE IF NOT EXISTS Estatisticas (
+                Nome TEXT PRIMARY KEY,
+                Valor INTEGER NOT NULL
+            );
+        """)
+
+    def close(self):
+        """Fecha o arquivo do cache"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        """Suporte para context manager (with statement)"""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Fecha o cache automaticamente ao sair do context manager"""
+        self.close()
+
+    def watermark(self, database, args):
+        """
+        Consulta a marca d'água dos dados (uma linha; no modo tarefa, uma
+        consulta a cada WATERMARK_BATCH_SIZE IDs)
+
+        Args:
+            database: Instância conectada de Database ou LocalDatabase
+            args (argparse.Namespace): Argumentos já resolvidos (usa modo, ciclos, tarefa_ids)
+
+        Returns:
+            dict: Tarefas, VersaoTarefas, Documentadas e UltimaDocumentada
+        """
+        arquivo = self.QUERIES[args.modo][1]
+        if args.modo == 'ciclo':
+            linhas = self.executor.execute_sql_file(database, arquivo, {'cicloCod': args.ciclos})
+            return {coluna: int(valor or 0) for coluna, valor in linhas[0].items()}
+
+        marca = None
+        for inicio in range(0, len(args.tarefa_ids), self.WATERMARK_BATCH_SIZE):
+            lote = args.tarefa_ids[inicio:inicio + self.WATERMARK_BATCH_SIZE]
+            linhas = self.executor.execute_sql_file(database, arquivo, {'tarefaId': lote})
+            parcial = {coluna: int(valor or 0) for coluna, valor in linhas[0].items()}
+            if marca is None:
+                marca = parcial
+            else:
+                marca['Tarefas'] += parcial['Tarefas']
+                marca['VersaoTarefas'] = max(marca['VersaoTarefas'], parcial['VersaoTarefas'])
+        return marca
+
+    def key(self, args, origem, marca):
+        """
+        Chave do documento: hash de tudo que define o seu conteúdo
+
+        Args:
+            args (argparse.Namespace): Argumentos já resolvidos
+            origem (str): Identificação do banco (Database.identity)
+            marca (dict): Marca d'água de watermark()
+
+        Returns:
+            str: SHA-256 em hexadecimal
+        """
+        alias_path = Path(config.sistemas_alias_path)
+        conteudo = {
+            'esquema': self.SCHEMA_VERSION,
+            'modo': args.modo,
+            'ciclos': args.ciclos,
+            'tarefas': args.tarefa_ids,
+            'versoes': {str(ciclo): versao for ciclo, versao in args.versoes.items()},
+            'versao': args.versao,
+            'cache': bool(args.cache),
+            'lazyDetails': bool(args.lazy_details),
+            'docsDir': args.docs_dir,
+            # Os nomes canônicos dos sistemas vêm dos diretórios existentes
+            'sistemas': sorted(RecordNormalizer(docs_dir=args.docs_dir).diretorios.values()),
+            'sql': {nome: self._file_hash(self.executor.sql_dir / nome) for nome in self._queries(args)},
+            'apelidos': self._file_hash(alias_path),
+            'origem': origem,
+            'marca': marca,
+        }
+        return hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _queries(self, args):
+        """Arquivos SQL executados para gerar o documento (mesma escolha de fetch_results)"""
+        if args.modo != 'ciclo':
+            return (self.QUERIES[args.modo][0],)
+        if args.lazy_details:
+            return self.CYCLE_QUERIES['lazy_details']
+        if args.cache:
+            return self.CYCLE_QUERIES['cache']
+        return (self.QUERIES['ciclo'][0],)
+
+    @staticmethod
+    def _file_hash(path):
+        """SHA-256 do conteúdo de um arquivo (None se não existir)"""
+        try:
+            return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def get(self, chave):
+        """
+        Documento guardado para a chave (conta acerto ou falta)
+
+        Args:
+            chave (str): Chave de key()
+
+        Returns:
+            dict | None: Documento no formato de generate_json, ou None
+        """
+        row = self.connection.execute(
+            "SELECT Documento FROM Documentos WHERE Chave = ?", (chave,)
+        ).fetchone()
+
+        with self.connection:
+            if row is None:
+                self._count('faltas')
+                return None
+            self.connection.execute(
+                "UPDATE Documentos SET UltimoUso = ? WHERE Chave = ?", (time.time(), chave)
+            )
+            self._count('acertos')
+
+        return json.loads(zlib.decompress(row['Documento']))
+
+    def put(self, chave, documento, novidades):
+        """
+        Guarda um documento e descarta os usados há mais tempo além do limite
+
+        Args:
+            chave (str): Chave de key()
+            documento (dict): Documento gerado
+            novidades (int): Quantidade de novidades (para o status)
+
+        Returns:
+            int: Documentos descartados
+        """
+        dados = zlib.compress(json.dumps(documento, ensure_ascii=False).encode('utf-8'))
+        if len(dados) > self.max_bytes:
+            print(f"Cache de saída: documento de {len(dados) / 1024:.1f} KB maior que o limite; não guardado",
+                  file=sys.stderr)
+            return 0
+
+        agora = time.time()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO Documentos (Chave, Documento, Bytes, Novidades, Criado, UltimoUso) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (chave, dados, len(dados), novidades, agora, agora)
+            )
+        return self.evict(manter=chave)
+
+    def evict(self, manter=None):
+        """
+        Remove os documentos usados há mais tempo até o cache caber em max_bytes
+
+        Args:
+            manter (str, optional): Chave que não deve ser removida (recém-guardada)
+
+        Returns:
+            int: Documentos removidos
+        """
+        documentos = self.connection.execute(
+            "SELECT Chave, Bytes FROM Documentos ORDER BY UltimoUso"
+        ).fetchall()
+
+        total = sum(documento['Bytes'] for documento in documentos)
+        removidas = []
+        for documento in documentos:
+            if total <= self.max_bytes:
+                break
+            if documento['Chave'] == manter:
+                continue
+            removidas.append(documento['Chave'])
+            total -= documento['Bytes']
+
+        if removidas:
+            with self.connection:
+                self.connection.executemany("DELETE FROM Documentos WHERE Chave = ?", [(c,) for c in removidas])
+                self._count('descartes', len(removidas))
+            self.connection.execute("PRAGMA incremental_vacuum")
+
+        return len(removidas)
+
+    def invalidate(self):
+        """Descarta todos os documentos (as estatísticas são mantidas)"""
+        with self.connection:
+            self.connection.execute("DELETE FROM Documentos")
+        self.connection.execute("PRAGMA incremental_vacuum")
+
+    def _count(self, nome, valor=1):
+        """Soma valor à estatística nome (dentro da transação de quem chamou)"""
+        self.connection.execute(
+            "INSERT INTO Estatisticas (Nome, Valor) VALUES (?, ?) "
+            "ON CONFLICT (Nome) DO UPDATE SET Valor = Valor + excluded.Valor",
+            (nome, valor)
+        )
+
+    def stats(self):
+        """
+        Totais acumulados e ocupação do cache
+
+        Returns:
+            dict: acertos, faltas, descartes, documentos e bytes
+        """
+        totais = {'acertos': 0, 'faltas': 0, 'descartes': 0}
+        for row in self.connection.execute("SELECT Nome, Valor FROM Estatisticas"):
+            totais[row['Nome']] = row['Valor']
+
+        documentos, tamanho = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(Bytes), 0) FROM Documentos"
+        ).fetchone()
+        return {**totais, 'documentos': documentos, 'bytes': tamanho}
+
+    def report(self, situacao, chave):
+        """Registra em stderr o resultado da consulta ao cache e os totais"""
+        totais = self.stats()
+        print(f"Cache de saída: {situacao} ({chave[:12]}) - {totais['acertos']} acerto(s), "
+              f"{totais['faltas']} falta(s), {totais['descartes']} descarte(s); "
+              f"{totais['documentos']} documento(s), {totais['bytes'] / 1024:.1f} KB", file=sys.stderr)
@@ -0,0 +1,292 @@
+"""
+Módulo da comparação entre saídas (comando diff)
+Compara as novidades de duas saídas (documentos gravados ou consultas ao
+banco) pelo numeroTarefa: junção por hash em memória enquanto a primeira
+saída (e as chaves já vistas da segunda) couberem no limite de memória;
+acima dele, o que falta comparar é gravado em disco em sequências
+ordenadas pela chave e intercaladas
+"""
+import sys
+import json
+import heapq
+import tempfile
+import itertools
+from operator import itemgetter
+from json_generator import BINARY_MAGIC, JsonGenerator
+from metrics import metrics
+
+
+# Estimativa do custo fixo de uma novidade em memória (dicionário, chave, referências), em bytes
+CUSTO_NOVIDADE = 400
+
+# Estimativa do custo de uma chave guardada no conjunto das já vistas, em bytes
+CUSTO_CHAVE = 100
+
+
+class OutputDiff:
+    """Diferenças entre as novidades de duas saídas: adicionadas, removidas e alteradas"""
+
+    # Limite padrão das novidades em memória antes de ordenar em disco (sem ler o .env)
+    MEMORIA_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, memoria_bytes=None, tmp_dir=None):
+        """
+        Inicializa a comparação
+
+        Args:
+            memoria_bytes (int, optional): Limite aproximado das novidades mantidas
+                                           em memória (padrão: MEMORIA_BYTES)
+            tmp_dir (str, optional): Diretório das sequências gravadas em disco
+                                     (padrão: diretório temporário do sistema)
+        """
+        self.memoria_bytes = memoria_bytes or self.MEMORIA_BYTES
+        self.tmp_dir = tmp_dir
+        self.totais = {'adicionadas': 0, 'removidas': 0, 'alteradas': 0, 'iguais': 0,
+                       'semNumero': 0, 'repetidas': 0}
+        self.sequencias = 0
+
+    @staticmethod
+    def _size(novidade):
+        """Tamanho aproximado de uma novidade em memória (marcadores None não contam)"""
+        if novidade is None:
+            return 0
+        return CUSTO_NOVIDADE + sum(len(valor) for valor in novidade.values() if isinstance(valor, str))
+
+    def _keyed(self, novidades):
+        """Pares (chave, novidade); novidades sem numeroTarefa são contadas e ignoradas"""
+        for novidade in novidades:
+            numero = novidade.get('numeroTarefa')
+            if numero is None:
+                self.totais['semNumero'] += 1
+                continue
+            yield str(numero), novidade
+
+    def compare(self, antigas, novas):
+        """
+        Compara duas sequências de novidades pelo numeroTarefa
+
+        Com a primeira saída em memória (junção por hash), as adicionadas e
+        alteradas saem na ordem da segunda saída e as removidas no final; com
+        as saídas em disco, todas saem em ordem de numeroTarefa (como texto).
+        Se as chaves já vistas da segunda saída passarem do limite durante a
+        junção por hash, o restante segue em disco, em ordem de numeroTarefa.
+        Um numeroTarefa repetido na mesma saída vale pela primeira ocorrência.
+
+        Args:
+            antigas (iterable): Novidades da primeira saída (ex: ciclo 275)
+            novas (iterable): Novidades da segunda saída (ex: ciclo 277)
+
+        Yields:
+            dict: {'tipo': 'adicionada'|'removida', 'numeroTarefa', 'novidade'} ou
+                  {'tipo': 'alterada', 'numeroTarefa', 'campos', 'antes', 'depois'}
+        """
+        antigas = self._keyed(antigas)
+        novas = self._keyed(novas)
+
+        indice = {}
+        tamanho = 0
+        for chave, novidade in antigas:
+            if chave in indice:
+                self.totais['repetidas'] += 1
+                continue
+            indice[chave] = novidade
+            tamanho += self._size(novidade)
+            if tamanho > self.memoria_bytes:
+                break
+        else:
+            yield from self._hash_join(indice, novas, tamanho)
+            return
+
+        print(f"Diff: primeira saída acima de {self.memoria_bytes / 1024 / 1024:.0f} MB; "
+              f"ordenando em disco...", file=sys.stderr)
+        yield from self._disk_join(indice, antigas, novas)
+
+    def _hash_join(self, indice, novas, tamanho):
+        """
+        Junção com a primeira saída em memória: uma passada pela segunda
+
+        As chaves já vistas da segunda saída (para ignorar repetições) entram
+        na conta da memória, no lugar das novidades retiradas do índice; se o
+        total passar do limite, o restante da comparação segue em disco.
+        """
+        vistas = set()
+        for chave, novidade in novas:
+            if chave in vistas:
+                self.totais['repetidas'] += 1
+                continue
+            vistas.add(chave)
+            tamanho += CUSTO_CHAVE + len(chave)
+
+            anterior = indice.pop(chave, None)
+            if anterior is not None:
+                tamanho -= self._size(anterior)
+            diferenca = self._diff(anterior, novidade)
+            if diferenca:
+                yield diferenca
+
+            if tamanho > self.memoria_bytes:
+                print(f"Diff: chaves da segunda saída acima de {self.memoria_bytes / 1024 / 1024:.0f} MB; "
+                      f"ordenando o restante em disco...", file=sys.stderr)
+                # As chaves já comparadas vão para o disco antes do restante,
+                # para que as repetições seguintes continuem sendo ignoradas
+                yield from self._disk_join(indice, (), itertools.chain(self._seen(vistas), novas))
+                return
+
+        for anterior in indice.values():
+            yield self._diff(anterior, None)
+
+    @staticmethod
+    def _seen(vistas):
+        """Marcadores (chave, None) das chaves já comparadas, esvaziando o conjunto"""
+        while vistas:
+            yield vistas.pop(), None
+
+    def _disk_join(self, indice, antigas, novas):
+        """Grava as duas saídas em sequências ordenadas (liberando o índice) e as intercala"""
+        with tempfile.TemporaryDirectory(prefix='diff_', dir=self.tmp_dir) as tmp:
+            with metrics.stage('diff.ordenar'):
+                lado_antigo = self._spill(itertools.chain(indice.items(), antigas), tmp, 'antigas')
+                indice.clear()
+                lado_novo = self._spill(novas, tmp, 'novas')
+            yield from self._merge_join(lado_antigo, lado_novo)
+
+    def _spill(self, pares, tmp, nome):
+        """
+        Grava os pares (chave, novidade) em sequências ordenadas pela chave
+
+        Cada sequência reúne até memoria_bytes de novidades; a ordenação é
+        estável, então a ordem original se mantém entre chaves iguais.
+
+        Returns:
+            list: Caminhos das sequências gravadas
+        """
+        caminhos = []
+        lote = []
+        tamanho = 0
+        for par in pares:
+            lote.append(par)
+            tamanho += self._size(par[1])
+            if tamanho > self.memoria_bytes:
+                caminhos.append(self._write_run(lote, tmp, f"{nome}_{len(caminhos)}"))
+                lote = []
+                tamanho = 0
+        if lote or not caminhos:
+            caminhos.append(self._write_run(lote, tmp, f"{nome}_{len(caminhos)}"))
+        return caminhos
+
+    def _write_run(self, lote, tmp, nome):
+        """Ordena um lote e grava como NDJSON ([chave, novidade] por linha)"""
+        lote.sort(key=itemgetter(0))
+        caminho = f"{tmp}/{nome}.ndjson"
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for par in lote:
+                f.write(json.dumps(par, ensure_ascii=False))
+                f.write('\n')
+        self.sequencias += 1
+        metrics.count('diff.sequencias')
+        return caminho
+
+    @staticmethod
+    def _read_run(caminho):
+        """Pares (chave, novidade) de uma sequência gravada"""
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                yield tuple(json.loads(linha))
+
+    def _merged(self, caminhos):
+        """Intercala as sequências de uma saída, com uma novidade por chave (a primeira)"""
+        # heapq.merge é estável entre as sequências: a primeira ocorrência vem primeiro
+        pares = heapq.merge(*(self._read_run(caminho) for caminho in caminhos), key=itemgetter(0))
+        for chave, grupo in itertools.groupby(pares, key=itemgetter(0)):
+            yield chave, next(grupo)[1]
+            self.totais['repetidas'] += sum(1 for _ in grupo)
+
+    def _merge_join(self, lado_antigo, lado_novo):
+        """Junção das duas saídas ordenadas: uma passada por cada uma"""
+        antigas = self._merged(lado_antigo)
+        novas = self._merged(lado_novo)
+        antiga = next(antigas, None)
+        nova = next(novas, None)
+
+        while antiga is not None or nova is not None:
+            if nova is None or (antiga is not None and antiga[0] < nova[0]):
+                diferenca = self._diff(antiga[1], None)
+                antiga = next(antigas, None)
+            elif antiga is None or nova[0] < antiga[0]:
+                # None: chave já comparada na junção por hash (só marca as repetições)
+                diferenca = self._diff(None, nova[1]) if nova[1] is not None else None
+                nova = next(novas, None)
+            else:
+                diferenca = self._diff(antiga[1], nova[1])
+                antiga = next(antigas, None)
+                nova = next(novas, None)
+            if diferenca:
+                yield diferenca
+
+    def _diff(self, anterior, novidade):
+        """Diferença entre as duas versões de uma novidade (None se iguais)"""
+        if anterior is None:
+            self.totais['adicionadas'] += 1
+            return {'tipo': 'adicionada', 'numeroTarefa': novidade['numeroTarefa'], 'novidade': novidade}
+        if novidade is None:
+            self.totais['removidas'] += 1
+            return {'tipo': 'removida', 'numeroTarefa': anterior['numeroTarefa'], 'novidade': anterior}
+        if anterior == novidade:
+            self.totais['iguais'] += 1
+            return None
+
+        self.totais['alteradas'] += 1
+        campos = [campo for campo in dict.fromkeys(itertools.chain(anterior, novidade))
+                  if anterior.get(campo) != novidade.get(campo)]
+        return {'tipo': 'alterada', 'numeroTarefa': novidade['numeroTarefa'], 'campos': campos,
+                'antes': anterior, 'depois': novidade}
+
+    def write(self, f, cabecalho, diferencas, formato='json'):
+        """
+        Grava as diferenças à medida que são calculadas
+
+        Em JSON, um documento {..cabeçalho, "diferencas": [...], "totais": {...}};
+        em NDJSON/binário, o cabeçalho, uma diferença por registro e, por
+        último, um registro {"totais": {...}}.
+
+        Args:
+            f (file): Destino aberto em modo binário (ex: sys.stdout.buffer)
+            cabecalho (dict): Identificação das saídas comparadas ('antes', 'depois')
+            diferencas (iterable): Diferenças de compare()
+            formato (str): 'json', 'ndjson' ou 'binary'
+
+        Returns:
+            int: Quantidade de diferenças gravadas
+        """
+        quantidade = 0
+        if formato == 'json':
+            inicio = json.dumps(cabecalho, ensure_ascii=False, indent=2)[:-2]
+            f.write(f'{inicio},\n  "diferencas": ['.encode('utf-8'))
+            for diferenca in diferencas:
+                item = json.dumps(diferenca, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+                f.write((('\n    ' if not quantidade else ',\n    ') + item).encode('utf-8'))
+                quantidade += 1
+            totais = json.dumps(self.totais, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            fim = '\n  ]' if quantidade else ']'
+            f.write(f'{fim},\n  "totais": {totais}\n}}\n'.encode('utf-8'))
+            return quantidade
+
+        if formato == 'binary':
+            f.write(BINARY_MAGIC)
+        f.write(JsonGenerator.encode_record(cabecalho, formato))
+        for diferenca in diferencas:
+            f.write(JsonGenerator.encode_record(diferenca, formato))
+            quantidade += 1
+        f.write(JsonGenerator.encode_record({'totais': self.totais}, formato))
+        return quantidade
+
+    def report(self):
+        """Exibe os totais da comparação em stderr"""
+        totais = self.totais
+        print(f"Diff: {totais['adicionadas']} adicionada(s), {totais['removidas']} removida(s), "
+              f"{totais['alteradas']} alterada(s), {totais['iguais']} igual(is)", file=sys.stderr)
+        if totais['semNumero'] or totais['repetidas']:
+            print(f"  Ignoradas: {totais['semNumero']} novidade(s) sem numeroTarefa, "
+                  f"{totais['repetidas']} numeroTarefa repetido(s)", file=sys.stderr)
+        if self.sequencias:
+            print(f"  Ordenação em disco: {self.sequencias} sequência(s)", file=sys.stderr)
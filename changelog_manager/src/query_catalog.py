@@ -0,0 +1,188 @@
+"""
+Módulo de catálogo de queries SQL
+Carrega os arquivos de sql/ uma única vez e converte as tags {nome} em
+parâmetros posicionais (?), para que o SQL Server reutilize o plano em cache
+"""
+import re
+import threading
+from pathlib import Path
+
+
+# Máximo de parâmetros por comando aceito pelo SQL Server
+MAX_PARAMETROS = 2100
+
+# Comentários e literais são preservados; apenas tags fora deles viram parâmetros
+_TOKEN_PATTERN = re.compile(
+    r"(--[^\n]*|/\*.*?\*/|'(?:''|[^'])*')|\{(\w+)\}",
+    re.DOTALL
+)
+
+
+class PreparedQuery:
+    """Query já analisada: trechos de SQL intercalados com nomes de parâmetros"""
+
+    def __init__(self, filename, sql_content, mtime):
+        """
+        Analisa o conteúdo SQL
+
+        Args:
+            filename (str): Nome do arquivo de origem
+            sql_content (str): Conteúdo SQL com tags {nome}
+            mtime (float): Data de modificação do arquivo (para recarga)
+        """
+        self.filename = filename
+        self.mtime = mtime
+        self.segments = []
+        self.param_names = []
+
+        posicao = 0
+        for match in _TOKEN_PATTERN.finditer(sql_content):
+            if match.group(2) is None:
+                continue
+            self.segments.append(sql_content[posicao:match.start()])
+            self.param_names.append(match.group(2))
+            posicao = match.end()
+        self.segments.append(sql_content[posicao:])
+
+        # SQL com um '?' por tag (forma usada quando nenhum valor é uma lista)
+        self.sql = '?'.join(self.segments)
+
+    def bind(self, parameters=None):
+        """
+        Gera o SQL com marcadores '?' e a lista ordenada de valores
+
+        Valores do tipo lista/tupla são expandidos em '?, ?, ...' (IN-lists).
+
+        Args:
+            parameters (dict, optional): Valores por nome de tag
+
+        Returns:
+            tuple: (sql, valores)
+
+        Raises:
+            ValueError: Se alguma tag do SQL não tiver valor informado ou se
+                        o total de valores passar de MAX_PARAMETROS
+        """
+        parameters = parameters or {}
+        faltando = [nome for nome in self.param_names if nome not in parameters]
+        if faltando:
+            raise ValueError(
+                f"Parâmetro(s) sem valor para {self.filename}: {', '.join(sorted(set(faltando)))}"
+            )
+
+        valores = []
+        partes = [self.segments[0]]
+        for nome, segmento in zip(self.param_names, self.segments[1:]):
+            valor = parameters[nome]
+            if isinstance(valor, (list, tuple)):
+                if not valor:
+                    raise ValueError(f"Lista vazia para o parâmetro {{{nome}}} em {self.filename}")
+                partes.append(', '.join('?' for _ in valor))
+                valores.extend(valor)
+            else:
+                partes.append('?')
+                valores.append(valor)
+            partes.append(segmento)
+
+        if len(valores) > MAX_PARAMETROS:
+            raise ValueError(
+                f"{len(valores)} parâmetros para {self.filename}; o SQL Server aceita até "
+                f"{MAX_PARAMETROS} por consulta (divida a lista em lotes)"
+            )
+
+        return ''.join(partes), valores
+
+
+class QueryCatalog:
+    """Catálogo dos arquivos .sql, carregado uma vez e recarregado se o arquivo mudar"""
+
+    def __init__(self, sql_dir=None, auto_reload=True):
+        """
+        Inicializa o catálogo e carrega todos os arquivos .sql do diretório
+
+        Args:
+            sql_dir (str, optional): Diretório dos arquivos SQL (padrão: ../sql/)
+            auto_reload (bool): Se True, recarrega o arquivo quando o mtime mudar
+        """
+        if sql_dir:
+            self.sql_dir = Path(sql_dir)
+        else:
+            self.sql_dir = Path(__file__).parent.parent / 'sql'
+
+        self.auto_reload = auto_reload
+        self._queries = {}
+        self._lock = threading.Lock()
+
+        if self.sql_dir.exists():
+            for sql_path in sorted(self.sql_dir.glob('*.sql')):
+                self._load(sql_path)
+
+    def _load(self, sql_path):
+        """Lê e analisa um arquivo SQL"""
+        mtime = sql_path.stat().st_mtime
+        with open(sql_path, 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+
+        query = PreparedQuery(sql_path.name, sql_content, mtime)
+        self._queries[sql_path.name] = query
+        return query
+
+    def get(self, filename):
+        """
+        Retorna a query preparada de um arquivo
+
+        Args:
+            filename (str): Nome do arquivo SQL (ex: 'consulta_tarefas.sql')
+
+        Returns:
+            PreparedQuery: Query analisada
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+        """
+        sql_path = self.sql_dir / filename
+
+        with self._lock:
+            query = self._queries.get(filename)
+
+            if query is not None and not self.auto_reload:
+                return query
+
+            if not sql_path.exists():
+                raise FileNotFoundError(
+                    f"Arquivo SQL não encontrado: {sql_path}\n"
+                    f"Certifique-se de criar o arquivo no diretório: {self.sql_dir}"
+                )
+
+            if query is None or sql_path.stat().st_mtime != query.mtime:
+                query = self._load(sql_path)
+
+            return query
+
+    def bind(self, filename, parameters=None):
+        """
+        Atalho para get(filename).bind(parameters)
+
+        Returns:
+            tuple: (sql, valores)
+        """
+        return self.get(filename).bind(parameters)
+
+
+_catalogs = {}
+
+
+def get_catalog(sql_dir=None):
+    """
+    Retorna o catálogo compartilhado do diretório (criado no primeiro uso)
+
+    Args:
+        sql_dir (str, optional): Diretório dos arquivos SQL (padrão: ../sql/)
+
+    Returns:
+        QueryCatalog: Catálogo do diretório
+    """
+    chave = str(Path(sql_dir).resolve()) if sql_dir else None
+    if chave not in _catalogs:
+        _catalogs[chave] = QueryCatalog(sql_dir)
+    return _catalogs[chave]
@@ -1,7 +1,69 @@
 """
 Módulo para executar queries SQL a partir de arquivos
 """
+import sys
 from pathlib import Path
+from query_catalog import get_catalog
+from metrics import metrics
+
+
+# Máximo de IDs em uma lista da linha de comando (intervalos inclusive)
+MAX_IDS = 100000
+
+
+def parse_id_list(value):
+    """
+    Converte uma lista de IDs informada na linha de comando em inteiros
+
+    Aceita valores separados por vírgula e intervalos inclusivos com hífen,
+    até MAX_IDS no total. A conversão para int garante que apenas números
+    cheguem ao SQL.
+
+    Args:
+        value (str): Lista de IDs (ex: "124", "124,125,126", "12345-12350,12360")
+
+    Returns:
+        list: IDs inteiros, sem repetição, na ordem informada
+
+    Raises:
+        ValueError: Se algum item não for um número ou intervalo válido, ou
+                    se a lista passar de MAX_IDS
+
+    Example:
+        >>> parse_id_list("124,126-128")
+        [124, 126, 127, 128]
+    """
+    ids = []
+    vistos = set()
+
+    for item in str(value).split(','):
+        item = item.strip()
+        if not item:
+            continue
+
+        try:
+            if '-' in item:
+                inicio, fim = (int(parte) for parte in item.split('-', 1))
+                if fim < inicio:
+                    raise ValueError
+                valores = range(inicio, fim + 1)
+            else:
+                valores = [int(item)]
+        except ValueError:
+            raise ValueError(f"Valor inválido na lista de IDs: '{item}'")
+
+        if len(ids) + len(valores) > MAX_IDS:
+            raise ValueError(f"A lista de IDs passa de {MAX_IDS} itens (em: '{item}')")
+
+        for valor in valores:
+            if valor not in vistos:
+                vistos.add(valor)
+                ids.append(valor)
+
+    if not ids:
+        raise ValueError(f"Nenhum ID informado em: '{value}'")
+
+    return ids
 
 
 class QueryExecutor:
@@ -21,6 +83,9 @@ class QueryExecutor:
             # Diretório padrão: ../sql/ relativo ao arquivo atual
             self.sql_dir = Path(__file__).parent.parent / 'sql'
 
+        # Catálogo compartilhado: cada arquivo é lido e analisado uma única vez
+        self.catalog = get_catalog(sql_dir)
+
     def load_sql_file(self, filename):
         """
         Carrega conteúdo de um arquivo SQL
@@ -45,12 +110,15 @@ class QueryExecutor:
         with open(sql_path, 'r', encoding='utf-8') as f:
             sql_content = f.read()
 
-        print(f"Arquivo SQL carregado: {filename}")
+        print(f"Arquivo SQL carregado: {filename}", file=sys.stderr)
         return sql_content
 
     def replace_parameters(self, sql_content, parameters):
         """
-        Substitui tags de parâmetros no SQL
+        Substitui tags de parâmetros no SQL (texto literal)
+
+        Mantido por compatibilidade. As consultas da aplicação usam prepare(),
+        que vincula os valores como parâmetros e preserva o plano em cache.
 
         Args:
             sql_content (str): Conteúdo SQL com tags
@@ -73,12 +141,39 @@ class QueryExecutor:
             tag = f"{{{key}}}"
             if tag in result:
                 result = result.replace(tag, str(value))
-                print(f"Parâmetro substituído: {tag} -> {value}")
+                print(f"Parâmetro substituído: {tag} -> {value}", file=sys.stderr)
             else:
-                print(f"AVISO: Tag {tag} não encontrada no SQL")
+                print(f"AVISO: Tag {tag} não encontrada no SQL", file=sys.stderr)
 
         return result
 
+    def prepare(self, filename, parameters=None):
+        """
+        Obtém do catálogo o SQL com marcadores '?' e os valores na ordem das tags
+
+        Args:
+            filename (str): Nome do arquivo SQL
+            parameters (dict, optional): Valores das tags (listas viram IN-lists)
+
+        Returns:
+            tuple: (sql, valores)
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+            ValueError: Se alguma tag do SQL não tiver valor informado
+        """
+        with metrics.stage('sql.preparar'):
+            query = self.catalog.get(filename)
+
+            for key in parameters or {}:
+                if key not in query.param_names:
+                    print(f"AVISO: Tag {{{key}}} não encontrada no SQL", file=sys.stderr)
+
+            sql_content, values = query.bind(parameters)
+        print(f"Query preparada: {filename} ({len(values)} parâmetro(s) vinculado(s))",
+              file=sys.stderr)
+        return sql_content, values
+
     def execute_sql_file(self, database, filename, parameters=None):
         """
         Carrega e executa um arquivo SQL
@@ -86,7 +181,7 @@ class QueryExecutor:
         Args:
             database (Database): Instância da classe Database conectada
             filename (str): Nome do arquivo SQL
-            parameters (dict, optional): Parâmetros para substituir no SQL
+            parameters (dict, optional): Valores das tags do SQL
 
         Returns:
             list: Resultados da query (lista de dicionários)
@@ -94,15 +189,28 @@ class QueryExecutor:
         Raises:
             Exception: Se houver erro ao carregar ou executar o SQL
         """
-        # Carrega o arquivo SQL
-        sql_content = self.load_sql_file(filename)
-
-        # Substitui parâmetros se fornecidos
-        if parameters:
-            sql_content = self.replace_parameters(sql_content, parameters)
+        sql_content, values = self.prepare(filename, parameters)
 
         # Executa a query
-        print("Executando query SQL...")
-        results = database.execute_query(sql_content)
+        print("Executando query SQL...", file=sys.stderr)
+        results = database.execute_query(sql_content, values)
 
         return results
+
+    def iter_sql_file(self, database, filename, parameters=None, chunk_size=500):
+        """
+        Carrega e executa um arquivo SQL, entregando os resultados sob demanda
+
+        Args:
+            database (Database): Instância da classe Database conectada
+            filename (str): Nome do arquivo SQL
+            parameters (dict, optional): Valores das tags do SQL
+            chunk_size (int): Quantidade de linhas lidas por vez do cursor
+
+        Returns:
+            generator: Registros (dicionários) lidos em blocos do cursor
+        """
+        sql_content, values = self.prepare(filename, parameters)
+
+        print("Executando query SQL (streaming)...", file=sys.stderr)
+        return database.iter_query(sql_content, values, chunk_size=chunk_size)
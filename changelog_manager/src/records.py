@@ -0,0 +1,80 @@
+"""
+Módulo do tipo de registro das consultas
+Gera, uma vez por conjunto de colunas (cursor.description), uma classe
+compacta (namedtuple, sem __dict__) usada no lugar de um dicionário por linha
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+
+class Record(tuple):
+    """
+    Base dos registros: tupla imutável com acesso por nome de coluna
+
+    Aceita o mesmo acesso de leitura usado com os dicionários de antes
+    (registro['Coluna'], registro.get('Coluna'), 'Coluna' in registro,
+    dict(registro)), além de registro.Coluna. Como em um dicionário,
+    'x in registro' testa nomes de coluna, e não valores; diferente de um
+    dicionário, iterar o registro percorre os valores.
+    """
+
+    __slots__ = ()
+
+    # Preenchidos por record_type: nomes das colunas e {nome: posição}
+    _fields = ()
+    _positions = {}
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            try:
+                chave = self._positions[chave]
+            except KeyError:
+                raise KeyError(chave) from None
+        return tuple.__getitem__(self, chave)
+
+    def get(self, chave, padrao=None):
+        """Valor da coluna, ou o padrão se a coluna não existir"""
+        posicao = self._positions.get(chave)
+        return padrao if posicao is None else tuple.__getitem__(self, posicao)
+
+    def __contains__(self, chave):
+        """Se a coluna existe no registro (não procura entre os valores, como tuple faria)"""
+        return chave in self._positions
+
+    def keys(self):
+        """Nomes das colunas"""
+        return self._fields
+
+    def items(self):
+        """Pares (coluna, valor)"""
+        return zip(self._fields, self)
+
+    def to_dict(self):
+        """Cópia do registro como dicionário"""
+        return dict(zip(self._fields, self))
+
+
+@lru_cache(maxsize=128)
+def record_type(columns):
+    """
+    Classe de registro para um conjunto de colunas (criada uma única vez)
+
+    Nomes de coluna que não são identificadores válidos (ex: expressão sem
+    alias) são renomeados para _0, _1, ... pela namedtuple.
+
+    Args:
+        columns (tuple): Nomes das colunas, na ordem do cursor
+
+    Returns:
+        type: Subclasse de Record; use Classe._make(linha) para criar registros
+    """
+    base = namedtuple('Registro', columns, rename=True)
+    return type('Registro', (Record, base), {
+        '__slots__': (),
+        # _make sem a conferência de tamanho da namedtuple (feita em Python a
+        # cada linha): as linhas vêm do mesmo cursor que definiu as colunas
+        '_make': classmethod(tuple.__new__),
+        '_fields': base._fields,
+        '_positions': {nome: posicao for posicao, nome in enumerate(base._fields)},
+    })
+
@@ -0,0 +1,253 @@
+"""
+Módulo do índice de busca da documentação
+Gera, fora do navegador, um índice invertido por sistema (search/{Sistema}.json)
+e um dicionário de termos (search/indice.json) usados pelo index.html
+"""
+import re
+import sys
+import json
+import unicodedata
+from pathlib import Path
+from file_utils import atomic_write
+from index_builder import IndexBuilder, version_key
+
+
+# Palavras muito comuns que não ajudam a distinguir um changelog de outro
+STOPWORDS = {
+    'a', 'ao', 'aos', 'as', 'com', 'como', 'da', 'das', 'de', 'do', 'dos', 'e',
+    'em', 'foi', 'for', 'mais', 'na', 'nas', 'nao', 'no', 'nos', 'o', 'os', 'ou',
+    'para', 'pela', 'pelo', 'por', 'que', 'se', 'sem', 'ser', 'um', 'uma',
+}
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# Trechos do Markdown que não são texto: tags HTML, códigos de emoji e URLs de links
+_MARKUP = re.compile(r'<[^>]+>|:[a-z0-9_]+:|\]\([^)]*\)')
+
+# Bloco Resumo de "O que foi alterado?" e seus itens ("- :star: Descrição")
+_RESUMO_BLOCO = re.compile(r'<summary>Resumo</summary>(.*?)</details>', re.DOTALL)
+_RESUMO_ITEM = re.compile(r'^- (?::[a-z0-9_]+: )?(.+)$', re.MULTILINE)
+
+
+def fold(texto):
+    """
+    Remove acentos e converte para minúsculas ("Correção" -> "correcao")
+
+    O index.html aplica a mesma transformação à consulta digitada.
+
+    Args:
+        texto (str): Texto original
+
+    Returns:
+        str: Texto sem acentos, em minúsculas
+    """
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def tokenize(texto):
+    """
+    Termos de um texto Markdown, com a contagem de ocorrências
+
+    Args:
+        texto (str): Conteúdo do changelog
+
+    Returns:
+        dict: {termo: quantidade}
+    """
+    frequencias = {}
+    for termo in _TOKEN.findall(fold(_MARKUP.sub(' ', texto))):
+        if len(termo) < 2 or termo in STOPWORDS:
+            continue
+        frequencias[termo] = frequencias.get(termo, 0) + 1
+    return frequencias
+
+
+def summary_lines(texto, limite=5):
+    """
+    Primeiros itens do bloco Resumo, exibidos nos resultados da busca
+
+    Args:
+        texto (str): Conteúdo do changelog
+        limite (int): Quantidade máxima de itens
+
+    Returns:
+        list: Textos dos itens
+    """
+    bloco = _RESUMO_BLOCO.search(texto)
+    if not bloco:
+        return []
+    return [item.strip() for item in _RESUMO_ITEM.findall(bloco.group(1))[:limite]]
+
+
+class SearchIndexBuilder:
+    """Mantém os shards do índice de busca em dia com os arquivos de changelog"""
+
+    def __init__(self, docs_dir=None, output_dir=None, manifest_path=None):
+        """
+        Inicializa o construtor do índice de busca
+
+        Args:
+            docs_dir (str, optional): Raiz dos changelogs (padrão: raiz do repositório)
+            output_dir (str, optional): Diretório dos shards (padrão: {docs_dir}/search)
+            manifest_path (str, optional): Manifesto de mtimes/hashes
+                                           (padrão: changelog_manager/busca_manifest.json)
+        """
+        if not manifest_path:
+            manifest_path = Path(__file__).parent.parent / 'busca_manifest.json'
+
+        self.scanner = IndexBuilder(docs_dir=docs_dir, manifest_path=manifest_path)
+        self.docs_dir = self.scanner.docs_dir
+        self.output_dir = Path(output_dir) if output_dir else self.docs_dir / 'search'
+        self.indice_path = self.output_dir / 'indice.json'
+
+    def _read_json(self, caminho, padrao):
+        """Lê um arquivo JSON gerado anteriormente (padrão se não existir ou estiver inválido)"""
+        if not caminho.exists():
+            return padrao
+
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"AVISO: Arquivo de índice inválido, reconstruindo: {caminho}", file=sys.stderr)
+            return padrao
+
+    @staticmethod
+    def _write_json(caminho, dados):
+        """Grava o JSON em formato compacto"""
+        atomic_write(caminho, json.dumps(dados, ensure_ascii=False, separators=(',', ':')))
+
+    def shard_path(self, sistema):
+        """Arquivo do shard de um sistema"""
+        return self.output_dir / f"{sistema}.json"
+
+    def build(self, force=False):
+        """
+        Atualiza os shards dos sistemas alterados e o dicionário de termos
+
+        Dentro de um sistema alterado, só os arquivos com hash diferente do
+        guardado no shard são lidos e tokenizados novamente.
+
+        Args:
+            force (bool): Se True, tokeniza todos os arquivos novamente
+
+        Returns:
+            list: Sistemas cujo shard foi reescrito ou removido
+        """
+        if force:
+            self.scanner.manifest['sistemas'] = {}
+
+        alterados, removidos = self.scanner.scan(check_files=True)
+        sistemas = self.scanner.manifest['sistemas']
+
+        # Shards ausentes (ex: diretório search/ apagado) também são gerados
+        alterados += [
+            sistema for sistema in sistemas
+            if sistema not in alterados and not self.shard_path(sistema).exists()
+        ]
+
+        indice = self._read_json(self.indice_path, {'sistemas': [], 'termos': {}})
+        vocabularios = self._vocabularies(indice)
+
+        # Sistemas do dicionário que não existem mais (inclusive sem manifesto anterior)
+        removidos += [
+            sistema for sistema in vocabularios
+            if sistema not in sistemas and sistema not in removidos
+        ]
+
+        for sistema in removidos:
+            vocabularios.pop(sistema, None)
+            if self.shard_path(sistema).exists():
+                self.shard_path(sistema).unlink()
+            print(f"  Busca: shard removido ({sistema})", file=sys.stderr)
+
+        for sistema in alterados:
+            shard, reindexados = self._build_shard(sistema, sistemas[sistema]['arquivos'], force)
+            self._write_json(self.shard_path(sistema), shard)
+            vocabularios[sistema] = set(shard['termos'])
+            print(f"  Busca: {sistema} ({reindexados} arquivo(s) reindexado(s))", file=sys.stderr)
+
+        if alterados or removidos or not self.indice_path.exists():
+            self._write_json(self.indice_path, self._dictionary(vocabularios))
+        else:
+            print("Índice de busca já está atualizado.", file=sys.stderr)
+
+        self.scanner.save_manifest()
+        return alterados + removidos
+
+    def _build_shard(self, sistema, arquivos, force):
+        """
+        Monta o shard de um sistema reaproveitando os documentos com hash igual
+
+        Returns:
+            tuple: (shard, quantidade de arquivos tokenizados)
+        """
+        anterior = {} if force else self._read_json(self.shard_path(sistema), {})
+        frequencias_anteriores = self._document_frequencies(anterior)
+
+        documentos = []
+        reindexados = 0
+        for nome, info in arquivos.items():
+            versao = nome[:-len('.md')]
+            antigo = frequencias_anteriores.get(versao)
+
+            if antigo is not None and antigo[0]['hash'] == info['hash']:
+                documentos.append(antigo)
+                continue
+
+            with open(self.docs_dir / sistema / nome, 'r', encoding='utf-8') as f:
+                texto = f.read()
+            documento = {'versao': versao, 'hash': info['hash'], 'resumo': summary_lines(texto)}
+            documentos.append((documento, tokenize(texto)))
+            reindexados += 1
+
+        documentos.sort(key=lambda item: version_key(item[0]['versao']), reverse=True)
+
+        termos = {}
+        for posicao, (_, frequencias) in enumerate(documentos):
+            for termo, quantidade in frequencias.items():
+                termos.setdefault(termo, []).append([posicao, quantidade])
+
+        shard = {
+            'sistema': sistema,
+            'docs': [documento for documento, _ in documentos],
+            'termos': dict(sorted(termos.items())),
+        }
+        return shard, reindexados
+
+    @staticmethod
+    def _document_frequencies(shard):
+        """Reconstrói, a partir das listas de postings, os termos de cada documento do shard"""
+        docs = shard.get('docs', [])
+        frequencias = [{} for _ in docs]
+
+        for termo, postings in shard.get('termos', {}).items():
+            for posicao, quantidade in postings:
+                frequencias[posicao][termo] = quantidade
+
+        return {documento['versao']: (documento, frequencias[i]) for i, documento in enumerate(docs)}
+
+    @staticmethod
+    def _vocabularies(indice):
+        """Termos de cada sistema a partir do dicionário: {sistema: set(termos)}"""
+        sistemas = indice.get('sistemas', [])
+        vocabularios = {sistema: set() for sistema in sistemas}
+
+        for termo, posicoes in indice.get('termos', {}).items():
+            for posicao in posicoes:
+                vocabularios[sistemas[posicao]].add(termo)
+
+        return vocabularios
+
+    @staticmethod
+    def _dictionary(vocabularios):
+        """Dicionário de termos: {'sistemas': [...], 'termos': {termo: [posições dos sistemas]}}"""
+        sistemas = sorted(vocabularios)
+        termos = {}
+
+        for posicao, sistema in enumerate(sistemas):
+            for termo in vocabularios[sistema]:
+                termos.setdefault(termo, []).append(posicao)
+
+        return {'sistemas': sistemas, 'termos': dict(sorted(termos.items()))}
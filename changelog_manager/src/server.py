@@ -0,0 +1,252 @@
+"""
+Changelog Manager - Modo Servidor
+Mantém conexões aquecidas com o banco e atende os modos ciclo/tarefa via HTTP local
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona o diretório src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import config
+from connection_pool import ConnectionPool
+from json_generator import JsonGenerator
+from main import fetch_results, build_json, register_tasks, resolve_batch_arguments
+
+
+class ChangelogService:
+    """Executa as consultas de changelog usando conexões emprestadas do pool"""
+
+    def __init__(self, pool, snapshot=None):
+        """
+        Inicializa o serviço
+
+        Args:
+            pool (ConnectionPool): Pool de conexões com o banco
+            snapshot (DocumentedSnapshot, optional): Tarefas documentadas em memória,
+                compartilhadas entre as requisições e atualizadas em cada uma
+        """
+        self.pool = pool
+        self.snapshot = snapshot
+        self.generator = JsonGenerator()
+
+    def generate(self, modo, versao, ciclo=None, tarefa_id=None, no_register=False):
+        """
+        Gera o mesmo JSON que main.py produziria para os parâmetros informados
+
+        Args:
+            modo (str): 'ciclo' ou 'tarefa'
+            versao (str): Versão(ões) do changelog
+            ciclo (str, optional): Ciclo(s) (obrigatório no modo ciclo)
+            tarefa_id (str, optional): ID(s) da tarefa (obrigatório no modo tarefa)
+            no_register (bool): Se True, não registra as tarefas como documentadas
+
+        Returns:
+            dict: JSON gerado (vazio em 'novidades' se nada for encontrado)
+
+        Raises:
+            ValueError: Se os parâmetros forem inválidos
+            Exception: Se o registro das tarefas falhar
+        """
+        if modo not in ('ciclo', 'tarefa'):
+            raise ValueError("Parâmetro 'modo' deve ser 'ciclo' ou 'tarefa'")
+        if not versao:
+            raise ValueError("Parâmetro 'versao' é obrigatório")
+        if modo == 'ciclo' and not ciclo:
+            raise ValueError("Modo 'ciclo' requer o parâmetro 'ciclo'")
+        if modo == 'tarefa' and not tarefa_id:
+            raise ValueError("Modo 'tarefa' requer o parâmetro 'tarefa_id'")
+
+        args = SimpleNamespace(
+            modo=modo, versao=versao, ciclo=ciclo, tarefa_id=tarefa_id, stream=False,
+            cache=False, render=False, formato='json', shard_by=None, docs_dir=None,
+            page_size=None, resume=False, lazy_details=False, databases=None, snapshot=False
+        )
+        resolve_batch_arguments(args)
+
+        with self.pool.connection() as db:
+            if self.snapshot is not None:
+                # Traz apenas as linhas registradas desde a requisição anterior
+                self.snapshot.refresh(db)
+            results = fetch_results(db, args, snapshot=self.snapshot)
+            json_data, tarefas = build_json(self.generator, args, results)
+
+            if not no_register and tarefas:
+                # Uma falha no registro vira erro da requisição (500), e não um 200 com o JSON
+                register_tasks(db, tarefas, propagar=True, snapshot=self.snapshot)
+
+        return json_data
+
+
+class ChangelogRequestHandler(BaseHTTPRequestHandler):
+    """
+    Atende as rotas do servidor:
+
+        GET /health                                  -> status do pool
+        GET /ciclo?ciclo=124&versao=09.91.47.20      -> JSON do modo ciclo
+        GET /tarefa?tarefa_id=12345&versao=...       -> JSON do modo tarefa
+        POST /ciclo, POST /tarefa                    -> JSON e registro das tarefas
+
+    GET apenas consulta (equivale a --no-register), para que uma URL aberta
+    no navegador, um prefetch ou uma nova tentativa não marquem tarefas como
+    documentadas. POST registra as tarefas, salvo no_register=1; os
+    parâmetros vão na URL ou no corpo (application/x-www-form-urlencoded).
+    """
+
+    server_version = 'ChangelogManager/1.0'
+
+    def do_GET(self):
+        """Despacha a requisição para a rota correspondente (sem registro)"""
+        url = urlparse(self.path)
+        params = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+        rota = url.path.rstrip('/')
+
+        if rota == '/health':
+            self._handle_health()
+        elif rota in ('/ciclo', '/tarefa'):
+            self._handle_generate(rota.lstrip('/'), params, registrar=False)
+        else:
+            self._send_json(404, {'erro': f"Rota não encontrada: {url.path}"})
+
+    def do_POST(self):
+        """Gera o JSON e registra as tarefas (parâmetros da URL e do corpo)"""
+        url = urlparse(self.path)
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        corpo = self.rfile.read(tamanho).decode('utf-8') if tamanho else ''
+        params = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+        params.update({chave: valores[-1] for chave, valores in parse_qs(corpo).items()})
+        rota = url.path.rstrip('/')
+
+        if rota in ('/ciclo', '/tarefa'):
+            registrar = params.get('no_register', '0').lower() not in ('1', 'true', 'sim')
+            self._handle_generate(rota.lstrip('/'), params, registrar=registrar)
+        else:
+            self._send_json(404, {'erro': f"Rota não encontrada: {url.path}"})
+
+    def _handle_health(self):
+        """Verifica se o pool consegue fornecer uma conexão que responde"""
+        try:
+            with self.server.service.pool.connection(timeout=5) as db:
+                ativo = db.ping()
+        except Exception as e:
+            self._send_json(503, {'status': 'erro', 'erro': str(e)})
+            return
+
+        self._send_json(200 if ativo else 503, {'status': 'ok' if ativo else 'erro'})
+
+    def _handle_generate(self, modo, params, registrar):
+        """Gera o JSON do modo solicitado (e registra as tarefas, se registrar)"""
+        try:
+            json_data = self.server.service.generate(
+                modo=modo,
+                versao=params.get('versao'),
+                ciclo=params.get('ciclo'),
+                tarefa_id=params.get('tarefa_id'),
+                no_register=not registrar
+            )
+        except ValueError as e:
+            self._send_json(400, {'erro': str(e)})
+            return
+        except TimeoutError as e:
+            self._send_json(503, {'erro': str(e)})
+            return
+        except Exception as e:
+            print(f"ERRO ao processar {self.path}: {e}", file=sys.stderr)
+            self._send_json(500, {'erro': str(e)})
+            return
+
+        self._send_json(200, json_data)
+
+    def _send_json(self, status, payload):
+        """Envia a resposta JSON (mesma formatação do main.py)"""
+        body = json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def parse_arguments():
+    """
+    Processa argumentos da linha de comando
+
+    Returns:
+        argparse.Namespace: Argumentos processados
+    """
+    parser = argparse.ArgumentParser(
+        description='Servidor local do Changelog Manager com pool de conexões',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+  Servidor com SQL Server (.env):
+    python server.py --porta 8765 --pool 4
+
+  Servidor com banco local SQLite (testes):
+    python server.py --sqlite local.db
+        """
+    )
+
+    parser.add_argument('--host', type=str, default=config.server_host,
+                        help='Endereço de escuta (padrão: SERVER_HOST ou 127.0.0.1)')
+    parser.add_argument('--porta', '-p', type=int, default=config.server_port,
+                        help='Porta de escuta (padrão: SERVER_PORT ou 8765)')
+    parser.add_argument('--pool', type=int, default=config.pool_size,
+                        help='Quantidade máxima de conexões abertas (padrão: DB_POOL_SIZE ou 4)')
+    parser.add_argument('--sqlite', type=str,
+                        help='Usa um arquivo SQLite local em vez do SQL Server')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Mantém as tarefas documentadas em memória, atualizadas pela '
+                             'DataExportacao a cada requisição')
+
+    return parser.parse_args()
+
+
+def main():
+    """Inicia o servidor e atende requisições até Ctrl+C"""
+    args = parse_arguments()
+
+    if args.sqlite:
+        from local_database import LocalDatabase
+
+        def factory():
+            return LocalDatabase(args.sqlite)
+    else:
+        try:
+            config.validate()
+        except ValueError as e:
+            print(f"\nERRO DE CONFIGURAÇÃO: {e}", file=sys.stderr)
+            return 1
+
+        from database import Database
+        factory = Database
+
+    pool = ConnectionPool(factory, size=args.pool)
+    server = ThreadingHTTPServer((args.host, args.porta), ChangelogRequestHandler)
+    snapshot = None
+    if args.snapshot:
+        from documented_snapshot import DocumentedSnapshot
+        snapshot = DocumentedSnapshot()
+    server.service = ChangelogService(pool, snapshot=snapshot)
+
+    print(f"Servidor do Changelog Manager em http://{args.host}:{args.porta} "
+          f"(pool: {args.pool} conexões)", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando servidor...", file=sys.stderr)
+    finally:
+        server.server_close()
+        pool.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Módulo de cache local das tarefas por ciclo
+Guarda em um arquivo SQLite as colunas projetadas de consulta_tarefas.sql e,
+a cada execução, busca no banco apenas as tarefas novas ou alteradas. As
+tarefas são separadas pelo banco de origem (Database.identity): números de
+tarefa e versões (TrfVersao) só valem dentro do mesmo banco
+"""
+import sys
+import time
+import sqlite3
+from config import config
+from query_executor import QueryExecutor
+from records import record_type
+
+
+class TaskCache:
+    """Cache incremental das tarefas concluídas de cada ciclo"""
+
+    # Quantidade máxima de IDs por consulta de detalhes
+    FETCH_BATCH_SIZE = 1000
+
+    # Versão do esquema do arquivo; caches de versões anteriores são recriados
+    SCHEMA_VERSION = 3
+
+    def __init__(self, path=None, max_bytes=None):
+        """
+        Inicializa o cache (o arquivo é aberto no connect)
+
+        Args:
+            path (str, optional): Arquivo SQLite do cache (padrão: CACHE_PATH)
+            max_bytes (int, optional): Tamanho máximo dos textos guardados
+                                       (padrão: CACHE_MAX_MB)
+        """
+        self.path = str(path or config.cache_path)
+        self.max_bytes = max_bytes if max_bytes is not None else config.cache_max_mb * 1024 * 1024
+        self.executor = QueryExecutor()
+        self.connection = None
+
+    def connect(self):
+        """Abre o arquivo do cache e cria as tabelas na primeira execução"""
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+
+        # O cache é descartável: um arquivo com esquema antigo é recriado
+        versao = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if versao != self.SCHEMA_VERSION:
+            self.connection.executescript(f"""
+                DROP TABLE IF EXISTS Tarefas;
+                DROP TABLE IF EXISTS Ciclos;
+                PRAGMA user_version = {self.SCHEMA_VERSION};
+            """)
+
+        self.connection.executescript("""
+            PRAGMA auto_vacuum = INCREMENTAL;
+
+            CREATE TABLE IF NOT EXISTS Ciclos (
+                Banco TEXT NOT NULL,
+                CicloId INTEGER NOT NULL,
+                Versao INTEGER NOT NULL DEFAULT 0,
+                Bytes INTEGER NOT NULL DEFAULT 0,
+                UltimoUso REAL NOT NULL,
+                PRIMARY KEY (Banco, CicloId)
+            );
+
+            CREATE TABLE IF NOT EXISTS Tarefas (
+                Banco TEXT NOT NULL,
+                NumeroTarefa INTEGER NOT NULL,
+                CicloId INTEGER NOT NULL,
+                Versao INTEGER NOT NULL,
+                Nome TEXT,
+                Detalhes TEXT,
+                PRIMARY KEY (Banco, NumeroTarefa)
+            );
+
+            CREATE INDEX IF NOT EXISTS IX_Tarefas_CicloId ON Tarefas (Banco, CicloId);
+        """)
+
+    def close(self):
+        """Fecha o arquivo do cache"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        """Suporte para context manager (with statement)"""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Fecha o cache automaticamente ao sair do context manager"""
+        self.close()
+
+    def fetch_cycles(self, database, ciclos):
+        """
+        Retorna as tarefas pendentes de documentação dos ciclos, atualizando o cache
+
+        Consulta no banco apenas chaves, versões e a marca de documentada
+        (consulta_tarefas_chaves.sql). Os textos são transferidos somente para
+        tarefas novas ou com versão diferente da guardada; tarefas que saíram
+        do ciclo ou deixaram de estar concluídas são removidas do cache. As
+        tarefas guardadas de outro banco (Database.identity) não são usadas.
+
+        Args:
+            database: Instância conectada de Database ou LocalDatabase
+            ciclos (list): IDs inteiros dos ciclos
+
+        Returns:
+            list: Registros no formato de consulta_tarefas.sql
+                  (Nome, Detalhes, NumeroTarefa, CicloId)
+        """
+        chaves = self.executor.execute_sql_file(
+            database, 'consulta_tarefas_chaves.sql', {'cicloCod': list(ciclos)}
+        )
+
+        banco = database.identity()
+        versoes = self._cached_versions(banco, ciclos)
+        alteradas = [
+            int(chave['NumeroTarefa']) for chave in chaves
+            if versoes.get(int(chave['NumeroTarefa'])) != int(chave['Versao'])
+        ]
+
+        novos = []
+        for inicio in range(0, len(alteradas), self.FETCH_BATCH_SIZE):
+            lote = alteradas[inicio:inicio + self.FETCH_BATCH_SIZE]
+            novos.extend(self.executor.execute_sql_file(
+                database, 'consulta_tarefas_cache.sql', {'tarefaId': lote}
+            ))
+
+        self._store(banco, ciclos, chaves, novos)
+        print(f"Cache local: {len(chaves)} tarefa(s) no(s) ciclo(s), "
+              f"{len(novos)} transferida(s) do banco", file=sys.stderr)
+
+        pendentes = {int(chave['NumeroTarefa']) for chave in chaves if not chave['Documentada']}
+        return self._read(banco, ciclos, pendentes)
+
+    def _cached_versions(self, banco, ciclos):
+        """Versões guardadas das tarefas dos ciclos no banco: {NumeroTarefa: Versao}"""
+        marcadores = ', '.join('?' for _ in ciclos)
+        rows = self.connection.execute(
+            f"SELECT NumeroTarefa, Versao FROM Tarefas WHERE Banco = ? AND CicloId IN ({marcadores})",
+            [banco] + list(ciclos)
+        )
+        return {row['NumeroTarefa']: row['Versao'] for row in rows}
+
+    def _store(self, banco, ciclos, chaves, novos):
+        """Aplica no cache as tarefas novas/alteradas e remove as que saíram dos ciclos"""
+        marcadores = ', '.join('?' for _ in ciclos)
+        agora = time.time()
+
+        with self.connection:
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS Chaves (NumeroTarefa INTEGER PRIMARY KEY)")
+            self.connection.execute("DELETE FROM Chaves")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO Chaves (NumeroTarefa) VALUES (?)",
+                [(int(chave['NumeroTarefa']),) for chave in chaves]
+            )
+            self.connection.execute(
+                f"DELETE FROM Tarefas WHERE Banco = ? AND CicloId IN ({marcadores}) "
+                f"AND NumeroTarefa NOT IN (SELECT NumeroTarefa FROM Chaves)",
+                [banco] + list(ciclos)
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO Tarefas "
+                "(Banco, NumeroTarefa, CicloId, Versao, Nome, Detalhes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (banco, int(row['NumeroTarefa']), int(row['CicloId']), int(row['Versao']),
+                     row['Nome'], row['Detalhes'])
+                    for row in novos
+                ]
+            )
+            self.connection.execute(
+                f"""
+                INSERT OR REPLACE INTO Ciclos (Banco, CicloId, Versao, Bytes, UltimoUso)
+                -- Bytes em UTF-8 (LENGTH sobre o texto contaria caracteres)
+                SELECT Banco, CicloId, MAX(Versao),
+                       SUM(COALESCE(LENGTH(CAST(Nome AS BLOB)), 0) + COALESCE(LENGTH(CAST(Detalhes AS BLOB)), 0)),
+                       ?
+                FROM Tarefas
+                WHERE Banco = ? AND CicloId IN ({marcadores})
+                GROUP BY Banco, CicloId
+                """,
+                [agora, banco] + list(ciclos)
+            )
+
+        self.evict(manter=[(banco, ciclo) for ciclo in ciclos])
+
+    def _read(self, banco, ciclos, pendentes):
+        """Lê do cache as tarefas pendentes dos ciclos do banco, na ordem dos ciclos informados"""
+        marcadores = ', '.join('?' for _ in ciclos)
+        rows = self.connection.execute(
+            f"SELECT Nome, Detalhes, NumeroTarefa, CicloId FROM Tarefas "
+            f"WHERE Banco = ? AND CicloId IN ({marcadores}) ORDER BY NumeroTarefa",
+            [banco] + list(ciclos)
+        )
+
+        tipo = record_type(('Nome', 'Detalhes', 'NumeroTarefa', 'CicloId'))
+        por_ciclo = {ciclo: [] for ciclo in ciclos}
+        for row in rows:
+            if row['NumeroTarefa'] in pendentes:
+                por_ciclo[row['CicloId']].append(tipo._make(row))
+
+        return [registro for ciclo in ciclos for registro in por_ciclo[ciclo]]
+
+    def evict(self, manter=()):
+        """
+        Remove os ciclos usados há mais tempo até o cache caber em max_bytes
+
+        Args:
+            manter (iterable): Pares (banco, ciclo) que não devem ser removidos (em uso)
+
+        Returns:
+            list: Pares (banco, ciclo) removidos
+        """
+        manter = set(manter)
+        ciclos = self.connection.execute(
+            "SELECT Banco, CicloId, Bytes FROM Ciclos ORDER BY UltimoUso"
+        ).fetchall()
+
+        total = sum(ciclo['Bytes'] for ciclo in ciclos)
+        removidos = []
+        for ciclo in ciclos:
+            if total <= self.max_bytes:
+                break
+            if (ciclo['Banco'], ciclo['CicloId']) in manter:
+                continue
+            removidos.append((ciclo['Banco'], ciclo['CicloId']))
+            total -= ciclo['Bytes']
+
+        if removidos:
+            with self.connection:
+                self.connection.executemany(
+                    "DELETE FROM Tarefas WHERE Banco = ? AND CicloId = ?", removidos
+                )
+                self.connection.executemany(
+                    "DELETE FROM Ciclos WHERE Banco = ? AND CicloId = ?", removidos
+                )
+            self.connection.execute("PRAGMA incremental_vacuum")
+            print(f"Cache local: {len(removidos)} ciclo(s) antigo(s) removido(s)", file=sys.stderr)
+
+        return removidos
+
+    def invalidate(self, ciclos=None):
+        """
+        Descarta ciclos do cache (todos, se nenhum for informado), de todos os bancos
+
+        Args:
+            ciclos (list, optional): IDs dos ciclos a descartar
+        """
+        with self.connection:
+            if ciclos is None:
+                self.connection.execute("DELETE FROM Tarefas")
+                self.connection.execute("DELETE FROM Ciclos")
+            else:
+                marcadores = ', '.join('?' for _ in ciclos)
+                self.connection.execute(
+                    f"DELETE FROM Tarefas WHERE CicloId IN ({marcadores})", list(ciclos)
+                )
+                self.connection.execute(
+                    f"DELETE FROM Ciclos WHERE CicloId IN ({marcadores})", list(ciclos)
+                )
+        self.connection.execute("PRAGMA incremental_vacuum")
+
+    def status(self):
+        """
+        Ciclos guardados no cache
+
+        Returns:
+            list: Dicionários com Banco, CicloId, Tarefas, Bytes, Versao e UltimoUso
+        """
+        rows = self.connection.execute("""
+            SELECT c.Banco, c.CicloId, COUNT(t.NumeroTarefa) AS Tarefas, c.Bytes, c.Versao, c.UltimoUso
+            FROM Ciclos c
+                LEFT JOIN Tarefas t ON (t.Banco = c.Banco AND t.CicloId = c.CicloId)
+            GROUP BY c.Banco, c.CicloId
+            ORDER BY c.UltimoUso DESC
+        """)
+        return [dict(row) for row in rows]
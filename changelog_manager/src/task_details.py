@@ -0,0 +1,130 @@
+"""
+Módulo da busca dos detalhes em duas fases (--lazy-details)
+A consulta do ciclo traz apenas as colunas leves e o tamanho de
+TrfObservacao2; os textos são buscados depois, em lotes por ID, somente para
+as tarefas que têm detalhes
+"""
+import sys
+from query_executor import QueryExecutor
+from records import record_type
+from metrics import metrics
+
+
+class DetailsFetcher:
+    """Completa os registros da consulta leve com o texto dos detalhes"""
+
+    # Limites de cada consulta de detalhes: quantidade de IDs e soma dos tamanhos (bytes)
+    BATCH_SIZE = 500
+    BATCH_BYTES = 1024 * 1024
+
+    def __init__(self, database, compartilhar=True):
+        """
+        Inicializa a busca de detalhes
+
+        Args:
+            database: Instância conectada de Database ou LocalDatabase
+            compartilhar (bool): Se True, textos idênticos viram um único objeto
+                                 em toda a execução; se False (streaming), apenas
+                                 dentro de cada lote, para a memória não crescer
+        """
+        self.database = database
+        self.compartilhar = compartilhar
+        self.executor = QueryExecutor()
+        self.tipo = record_type(('Nome', 'Detalhes', 'NumeroTarefa', 'CicloId'))
+        self.textos = {}
+        self.consultas = 0
+        self.transferidos = 0
+        self.repetidos = 0
+        self.vazios = 0
+
+    def batches(self, registros):
+        """
+        Agrupa os registros leves em lotes
+
+        Um lote fecha ao atingir BATCH_SIZE registros ou BATCH_BYTES de
+        detalhes, então um texto muito longo é transferido em uma consulta
+        pequena, sem arrastar outros textos longos junto.
+
+        Args:
+            registros (iterable): Registros de consulta_tarefas_leve.sql
+
+        Yields:
+            list: Registros do lote
+        """
+        lote = []
+        tamanho = 0
+        for registro in registros:
+            lote.append(registro)
+            tamanho += registro['TamanhoDetalhes'] or 0
+            if len(lote) >= self.BATCH_SIZE or tamanho >= self.BATCH_BYTES:
+                yield lote
+                lote = []
+                tamanho = 0
+        if lote:
+            yield lote
+
+    def fetch(self, lote):
+        """
+        Busca os detalhes das tarefas do lote que têm texto
+
+        Args:
+            lote (list): Registros leves
+
+        Returns:
+            dict: {NumeroTarefa: Detalhes}
+        """
+        ids = [int(registro['NumeroTarefa']) for registro in lote if registro['TamanhoDetalhes']]
+        self.vazios += len(lote) - len(ids)
+        if not ids:
+            return {}
+
+        with metrics.stage('detalhes.buscar'):
+            linhas = self.executor.execute_sql_file(self.database, 'consulta_detalhes.sql', {'tarefaId': ids})
+        self.consultas += 1
+
+        detalhes = {}
+        for linha in linhas:
+            texto = linha['Detalhes']
+            if texto:
+                # Textos repetidos (modelos, "Conforme solicitado" ...) passam a
+                # apontar para a mesma string
+                unico = self.textos.setdefault(texto, texto)
+                if unico is not texto:
+                    self.repetidos += 1
+                texto = unico
+            detalhes[int(linha['NumeroTarefa'])] = texto
+        self.transferidos += len(linhas)
+        return detalhes
+
+    def attach(self, registros):
+        """
+        Completa os registros leves com os detalhes, lote a lote
+
+        Tarefas sem detalhes não são consultadas: TamanhoDetalhes 0 vira
+        texto vazio e NULL continua None, como na consulta completa.
+
+        Args:
+            registros (iterable): Registros de consulta_tarefas_leve.sql
+
+        Yields:
+            Record: Registros no formato de consulta_tarefas.sql
+                    (Nome, Detalhes, NumeroTarefa, CicloId)
+        """
+        for lote in self.batches(registros):
+            detalhes = self.fetch(lote)
+            for registro in lote:
+                tamanho = registro['TamanhoDetalhes']
+                if tamanho:
+                    texto = detalhes.get(int(registro['NumeroTarefa']))
+                else:
+                    texto = '' if tamanho == 0 else None
+                yield self.tipo._make((registro['Nome'], texto, registro['NumeroTarefa'], registro['CicloId']))
+
+            if not self.compartilhar:
+                self.textos.clear()
+
+        metrics.count('detalhes.transferidos', self.transferidos)
+        metrics.count('detalhes.repetidos', self.repetidos)
+        print(f"Detalhes: {self.transferidos} texto(s) em {self.consultas} consulta(s), "
+              f"{self.vazios} tarefa(s) sem detalhes, {self.repetidos} texto(s) repetido(s) compartilhado(s)",
+              file=sys.stderr)
@@ -0,0 +1,328 @@
+"""
+Módulo de consulta reversa de tarefas
+Mantém um índice SQLite local de número de tarefa e texto para
+(sistema, versão, arquivo, posição), construído a partir dos changelogs .md
+e dos output_*.json
+"""
+import re
+import sys
+import json
+import sqlite3
+from pathlib import Path
+from index_builder import changelog_files, version_key
+from file_utils import TAREFA_DOCUMENTADA
+
+
+# Item da seção Detalhes: linha iniciada pelo emoji da categoria
+_DETALHE_ITEM = re.compile(rb'^:(?:star|warning|arrow_up):[ \t]', re.MULTILINE)
+
+# Bloco Detalhes de "O que foi alterado?"
+_DETALHES_BLOCO = re.compile(rb'<summary>Detalhes</summary>(.*?)</details>', re.DOTALL)
+
+# Referência à tarefa dentro do changelog (mesmo padrão do renderizador, sobre bytes)
+_TAREFA = re.compile(TAREFA_DOCUMENTADA.pattern.encode('utf-8'))
+
+# Número da tarefa dentro de um output_*.json
+_TAREFA_JSON = re.compile(rb'"numeroTarefa":\s*(\d+)')
+
+
+class TaskLookupIndex:
+    """Índice local: número da tarefa / texto -> (sistema, versão, arquivo, posição)"""
+
+    # Versão do esquema e da extração dos arquivos; índices anteriores são recriados
+    SCHEMA_VERSION = 2
+
+    def __init__(self, docs_dir=None, index_path=None):
+        """
+        Inicializa o índice (o arquivo é aberto no connect)
+
+        Args:
+            docs_dir (str, optional): Raiz dos changelogs (padrão: raiz do repositório)
+            index_path (str, optional): Arquivo SQLite do índice
+                                        (padrão: changelog_manager/tarefas_indice.db)
+        """
+        self.base_dir = Path(__file__).parent.parent
+        self.docs_dir = Path(docs_dir) if docs_dir else self.base_dir.parent
+        self.index_path = str(index_path or self.base_dir / 'tarefas_indice.db')
+        self.connection = None
+        self.fts = True
+
+    def connect(self):
+        """Abre o índice e cria as tabelas na primeira execução"""
+        self.connection = sqlite3.connect(self.index_path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+
+        # O índice é derivado dos arquivos: um índice de versão anterior é recriado
+        versao = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if versao != self.SCHEMA_VERSION:
+            self.connection.executescript(f"""
+                DROP TABLE IF EXISTS TrechosBusca;
+                DROP TABLE IF EXISTS Trechos;
+                DROP TABLE IF EXISTS Tarefas;
+                DROP TABLE IF EXISTS Arquivos;
+                PRAGMA user_version = {self.SCHEMA_VERSION};
+            """)
+
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS Arquivos (
+                Caminho TEXT PRIMARY KEY,
+                Mtime REAL NOT NULL,
+                Tamanho INTEGER NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS Tarefas (
+                NumeroTarefa INTEGER NOT NULL,
+                Sistema TEXT NOT NULL,
+                Versao TEXT NOT NULL,
+                Caminho TEXT NOT NULL,
+                Posicao INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS IX_Tarefas_NumeroTarefa ON Tarefas (NumeroTarefa);
+            CREATE INDEX IF NOT EXISTS IX_Tarefas_Caminho ON Tarefas (Caminho);
+
+            CREATE TABLE IF NOT EXISTS Trechos (
+                Id INTEGER PRIMARY KEY,
+                Sistema TEXT NOT NULL,
+                Versao TEXT NOT NULL,
+                Caminho TEXT NOT NULL,
+                Posicao INTEGER NOT NULL,
+                Texto TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS IX_Trechos_Caminho ON Trechos (Caminho);
+        """)
+
+        try:
+            # Índice de texto sobre Trechos, sincronizado por gatilhos
+            self.connection.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS TrechosBusca USING fts5(
+                    Texto, content='Trechos', content_rowid='Id',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS TR_Trechos_Insert AFTER INSERT ON Trechos BEGIN
+                    INSERT INTO TrechosBusca (rowid, Texto) VALUES (NEW.Id, NEW.Texto);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS TR_Trechos_Delete AFTER DELETE ON Trechos BEGIN
+                    INSERT INTO TrechosBusca (TrechosBusca, rowid, Texto) VALUES ('delete', OLD.Id, OLD.Texto);
+                END;
+            """)
+        except sqlite3.OperationalError:
+            self.fts = False
+            print("AVISO: SQLite sem FTS5; a busca por texto ficará indisponível", file=sys.stderr)
+
+    def close(self):
+        """Fecha o índice"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        """Suporte para context manager (with statement)"""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Fecha o índice automaticamente ao sair do context manager"""
+        self.close()
+
+    def sources(self):
+        """
+        Arquivos indexados: changelogs .md e output_*.json
+
+        Returns:
+            dict: {caminho relativo: (Path, sistema ou None, versao ou None)}
+        """
+        fontes = {}
+        for sistema, versao, caminho in changelog_files(self.docs_dir):
+            fontes[caminho.relative_to(self.docs_dir).as_posix()] = (caminho, sistema, versao)
+
+        # JSONs gerados ficam em changelog_manager/; fora do docs_dir, o caminho é absoluto
+        raiz = self.docs_dir.resolve()
+        for caminho in self.base_dir.resolve().glob('output_*.json'):
+            try:
+                relativo = caminho.relative_to(raiz)
+            except ValueError:
+                relativo = caminho
+            fontes[relativo.as_posix()] = (caminho, None, None)
+
+        return fontes
+
+    def refresh(self):
+        """
+        Reindexa apenas os arquivos novos, alterados (mtime/tamanho) ou removidos
+
+        Returns:
+            int: Quantidade de arquivos reindexados ou removidos
+        """
+        fontes = self.sources()
+        indexados = {
+            row['Caminho']: (row['Mtime'], row['Tamanho'])
+            for row in self.connection.execute("SELECT Caminho, Mtime, Tamanho FROM Arquivos")
+        }
+
+        alterados = []
+        for relativo, (caminho, sistema, versao) in fontes.items():
+            stat = caminho.stat()
+            if indexados.get(relativo) != (stat.st_mtime, stat.st_size):
+                alterados.append((relativo, caminho, sistema, versao, stat))
+        removidos = [relativo for relativo in indexados if relativo not in fontes]
+
+        with self.connection:
+            for relativo in removidos + [alterado[0] for alterado in alterados]:
+                self.connection.execute("DELETE FROM Tarefas WHERE Caminho = ?", (relativo,))
+                self.connection.execute("DELETE FROM Trechos WHERE Caminho = ?", (relativo,))
+                self.connection.execute("DELETE FROM Arquivos WHERE Caminho = ?", (relativo,))
+
+            for relativo, caminho, sistema, versao, stat in alterados:
+                with open(caminho, 'rb') as f:
+                    conteudo = f.read()
+
+                if caminho.suffix == '.md':
+                    trechos = self._markdown_entries(conteudo)
+                    registros = [(sistema, versao, posicao, texto, tarefas)
+                                 for posicao, texto, tarefas in trechos]
+                else:
+                    registros = self._json_entries(conteudo)
+
+                for sistema_item, versao_item, posicao, texto, tarefas in registros:
+                    self.connection.execute(
+                        "INSERT INTO Trechos (Sistema, Versao, Caminho, Posicao, Texto) VALUES (?, ?, ?, ?, ?)",
+                        (sistema_item, versao_item, relativo, posicao, texto)
+                    )
+                    self.connection.executemany(
+                        "INSERT INTO Tarefas (NumeroTarefa, Sistema, Versao, Caminho, Posicao) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [(numero, sistema_item, versao_item, relativo, posicao) for numero in tarefas]
+                    )
+
+                self.connection.execute(
+                    "INSERT INTO Arquivos (Caminho, Mtime, Tamanho) VALUES (?, ?, ?)",
+                    (relativo, stat.st_mtime, stat.st_size)
+                )
+
+        total = len(alterados) + len(removidos)
+        if total:
+            print(f"Índice de tarefas: {total} arquivo(s) atualizado(s)", file=sys.stderr)
+        return total
+
+    @staticmethod
+    def _markdown_entries(conteudo):
+        """
+        Itens da seção Detalhes de um changelog
+
+        Returns:
+            list: Tuplas (posicao_em_bytes, texto, [numeros de tarefa])
+        """
+        bloco = _DETALHES_BLOCO.search(conteudo)
+        inicio_bloco, fim_bloco = (bloco.start(1), bloco.end(1)) if bloco else (0, len(conteudo))
+        inicios = [m.start() for m in _DETALHE_ITEM.finditer(conteudo, inicio_bloco, fim_bloco)]
+
+        # Arquivo fora do padrão: o bloco inteiro é um único trecho
+        if not inicios:
+            inicios = [inicio_bloco]
+
+        trechos = []
+        for i, inicio in enumerate(inicios):
+            fim = inicios[i + 1] if i + 1 < len(inicios) else fim_bloco
+            trecho = conteudo[inicio:fim]
+            tarefas = sorted({int(numero) for numero in _TAREFA.findall(trecho)})
+            trechos.append((inicio, trecho.decode('utf-8', 'replace').strip(), tarefas))
+
+        return trechos
+
+    @staticmethod
+    def _json_entries(conteudo):
+        """
+        Novidades de um output_*.json (formato simples ou agrupado por ciclo)
+
+        Returns:
+            list: Tuplas (sistema, versao, posicao_em_bytes, texto, [numero])
+        """
+        try:
+            dados = json.loads(conteudo)
+        except ValueError:
+            print("AVISO: JSON inválido ignorado no índice de tarefas", file=sys.stderr)
+            return []
+
+        if 'ciclos' in dados:
+            grupos = [(item['versao'], item['novidades']) for item in dados['ciclos'].values()]
+        else:
+            grupos = [(dados.get('versao', ''), dados.get('novidades', []))]
+
+        posicoes = {}
+        for match in _TAREFA_JSON.finditer(conteudo):
+            posicoes.setdefault(int(match.group(1)), match.start())
+
+        registros = []
+        for versao, novidades in grupos:
+            for novidade in novidades:
+                numero = novidade.get('numeroTarefa')
+                texto = f"{novidade.get('resumo') or ''}\n{novidade.get('detalhes') or ''}".strip()
+                tarefas = [int(numero)] if numero is not None else []
+                posicao = posicoes.get(int(numero), 0) if numero is not None else 0
+                registros.append((str(novidade.get('sistema', '')).strip(), versao, posicao, texto, tarefas))
+
+        return registros
+
+    def lookup(self, numero_tarefa):
+        """
+        Onde a tarefa foi publicada (busca pelo índice de NumeroTarefa)
+
+        Args:
+            numero_tarefa (int): Número da tarefa
+
+        Returns:
+            list: Dicionários com Sistema, Versao, Caminho e Posicao, da versão
+                  mais recente para a mais antiga
+        """
+        rows = self.connection.execute(
+            "SELECT Sistema, Versao, Caminho, Posicao FROM Tarefas WHERE NumeroTarefa = ?",
+            (int(numero_tarefa),)
+        )
+        return sorted((dict(row) for row in rows), key=self._version_order, reverse=True)
+
+    def search(self, texto, limite=20):
+        """
+        Busca por texto livre nos itens dos changelogs (sem diferenciar acentos)
+
+        Args:
+            texto (str): Termos da busca (o último aceita prefixo)
+            limite (int): Quantidade máxima de resultados
+
+        Returns:
+            list: Dicionários com Sistema, Versao, Caminho, Posicao e Trecho
+
+        Raises:
+            Exception: Se o SQLite não tiver suporte a FTS5
+        """
+        if not self.fts:
+            raise Exception("Busca por texto indisponível: SQLite sem suporte a FTS5")
+
+        termos = re.findall(r'\w+', texto)
+        if not termos:
+            return []
+
+        # Cada termo entre aspas (sem operadores FTS); o último com prefixo
+        consulta = ' '.join(f'"{termo}"' for termo in termos) + '*'
+        rows = self.connection.execute(
+            """
+            SELECT t.Sistema, t.Versao, t.Caminho, t.Posicao,
+                   snippet(TrechosBusca, 0, '[', ']', '...', 12) AS Trecho
+            FROM TrechosBusca
+                INNER JOIN Trechos t ON (t.Id = TrechosBusca.rowid)
+            WHERE TrechosBusca MATCH ?
+            ORDER BY bm25(TrechosBusca)
+            LIMIT ?
+            """,
+            (consulta, limite)
+        )
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _version_order(registro):
+        """Chave de ordenação por versão (versões fora do padrão ficam por último)"""
+        try:
+            return version_key(registro['Versao'])
+        except ValueError:
+            return ()
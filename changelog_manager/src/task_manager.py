@@ -4,20 +4,33 @@ Responsável por buscar e validar tarefas específicas por ID
 """
 import sys
 from pathlib import Path
+from query_executor import QueryExecutor
+from normalizer import RecordNormalizer
+from metrics import metrics
 
 
 class TaskManager:
     """Gerencia busca e validação de tarefas individuais"""
 
-    def __init__(self, database):
+    # IDs por consulta (o SQL Server aceita até 2100 parâmetros por comando)
+    QUERY_BATCH_SIZE = 1000
+
+    def __init__(self, database, snapshot=None, normalizer=None):
         """
         Inicializa o gerenciador de tarefas
 
         Args:
             database: Instância da classe Database conectada
+            snapshot (DocumentedSnapshot, optional): Snapshot em memória das
+                tarefas documentadas. Se informado, as verificações não consultam o banco
+            normalizer (RecordNormalizer, optional): Normalizador dos registros
+                (padrão: um novo RecordNormalizer)
         """
         self.db = database
+        self.snapshot = snapshot
         self.sql_dir = Path(__file__).parent.parent / 'sql'
+        self.executor = QueryExecutor(self.sql_dir)
+        self.normalizer = normalizer or RecordNormalizer()
 
     def get_task_by_id(self, task_id):
         """
@@ -29,30 +42,60 @@ class TaskManager:
         Returns:
             list: Lista com dados da tarefa (vazia se não encontrada)
         """
-        sql_file = self.sql_dir / 'consulta_tarefa_individual.sql'
+        results = self._query_tasks([int(task_id)])
 
-        if not sql_file.exists():
-            raise FileNotFoundError(
-                f"Arquivo SQL não encontrado: {sql_file}\n"
-                "Certifique-se de que 'consulta_tarefa_individual.sql' existe no diretório sql/"
-            )
+        if not results:
+            print(f"AVISO: Tarefa {task_id} não encontrada ou já foi documentada",
+                  file=sys.stderr)
 
-        # Lê o arquivo SQL
-        with open(sql_file, 'r', encoding='utf-8') as f:
-            query = f.read()
+        return results
 
-        # Substitui o parâmetro {tarefaId}
-        query = query.replace('{tarefaId}', str(task_id))
+    def get_tasks_by_ids(self, task_ids):
+        """
+        Busca várias tarefas por ID (IN-list, uma consulta a cada QUERY_BATCH_SIZE IDs)
 
-        # Executa a query
-        results = self.db.execute_query(query)
+        Args:
+            task_ids (list): IDs inteiros das tarefas
 
-        if not results:
-            print(f"AVISO: Tarefa {task_id} não encontrada ou já foi documentada",
-                  file=sys.stderr)
+        Returns:
+            list: Lista com dados das tarefas encontradas
+        """
+        results = self._query_tasks([int(task_id) for task_id in task_ids])
+
+        encontradas = {str(record.get('NumeroTarefa')) for record in results}
+        ausentes = [task_id for task_id in task_ids if str(task_id) not in encontradas]
+
+        # Uma única verificação para separar "já documentada" de "não encontrada";
+        # se ela falhar, vale a mensagem genérica (as tarefas encontradas seguem)
+        try:
+            documentadas = self.documented_tasks(ausentes) if ausentes else set()
+        except Exception as e:
+            print(f"AVISO: Erro ao verificar tarefas documentadas: {e}", file=sys.stderr)
+            documentadas = None
+
+        for task_id in ausentes:
+            if documentadas is None:
+                print(f"AVISO: Tarefa {task_id} não encontrada ou já foi documentada",
+                      file=sys.stderr)
+            elif str(task_id) in documentadas:
+                print(f"AVISO: Tarefa {task_id} já foi documentada", file=sys.stderr)
+            else:
+                print(f"AVISO: Tarefa {task_id} não encontrada ou não concluída",
+                      file=sys.stderr)
 
         return results
 
+    def _query_tasks(self, task_ids):
+        """Executa consulta_tarefa_individual.sql com os IDs como parâmetros vinculados, em lotes"""
+        resultados = []
+        with metrics.stage('tarefas.consultar'):
+            for inicio in range(0, len(task_ids), self.QUERY_BATCH_SIZE):
+                lote = task_ids[inicio:inicio + self.QUERY_BATCH_SIZE]
+                resultados.extend(self.normalizer.normalize_all(self.executor.execute_sql_file(
+                    self.db, 'consulta_tarefa_individual.sql', {'tarefaId': lote}
+                )))
+        return resultados
+
     def is_task_documented(self, task_id):
         """
         Verifica se tarefa já foi documentada
@@ -63,8 +106,28 @@ class TaskManager:
         Returns:
             bool: True se já documentada, False caso contrário
         """
+        if self.snapshot is not None:
+            return task_id in self.snapshot
         return self.db.check_task_documented(task_id)
 
+    def documented_tasks(self, task_ids):
+        """
+        Retorna quais das tarefas informadas já foram documentadas
+
+        Usa o snapshot em memória, se houver; caso contrário faz uma única
+        consulta em lote no banco.
+
+        Args:
+            task_ids (iterable): IDs das tarefas
+
+        Returns:
+            set: IDs (str) já documentados
+        """
+        with metrics.stage('tarefas.verificar_documentadas'):
+            if self.snapshot is not None:
+                return self.snapshot.documented_subset(task_ids)
+            return self.db.documented_subset(task_ids)
+
     def validate_task_data(self, task_data):
         """
         Valida se os dados da tarefa estão completos
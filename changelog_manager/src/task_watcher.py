@@ -0,0 +1,199 @@
+"""
+Módulo do acompanhamento contínuo de ciclos (--modo watch)
+Mantém uma conexão aberta e consulta periodicamente apenas as tarefas
+alteradas desde a última consulta (TrfVersao maior que a marca), emitindo
+as recém-concluídas como eventos incrementais
+"""
+import sys
+import time
+from query_executor import QueryExecutor
+from json_generator import JsonGenerator
+from normalizer import RecordNormalizer
+from metrics import metrics
+
+
+class TaskWatcher:
+    """Consulta as tarefas concluídas desde a última marca, com intervalo adaptativo"""
+
+    def __init__(self, database, versoes, normalizer=None, intervalo=None, intervalo_max=None,
+                 lote=None, marca=0, snapshot=None):
+        """
+        Inicializa o acompanhamento
+
+        Args:
+            database: Instância conectada de Database ou LocalDatabase
+            versoes (dict): {ciclo: versão} dos ciclos acompanhados
+            normalizer (RecordNormalizer, optional): Normalizador dos registros
+            intervalo (float, optional): Intervalo mínimo entre consultas, em
+                                         segundos (padrão: WATCH_INTERVALO)
+            intervalo_max (float, optional): Intervalo máximo sem novidades e
+                                             após falhas (padrão: WATCH_INTERVALO_MAX)
+            lote (int, optional): Linhas por consulta (padrão: WATCH_LOTE)
+            marca (int): Última versão já emitida (0: todas as pendentes)
+            snapshot (DocumentedSnapshot, optional): Tarefas documentadas em memória;
+                se informado, é atualizado a cada lote e as tarefas já registradas
+                (ex: por outra execução desde a consulta) não são emitidas
+        """
+        from config import config
+
+        self.database = database
+        self.versoes = {int(ciclo): versao for ciclo, versao in versoes.items()}
+        self.normalizer = normalizer or RecordNormalizer()
+        self.intervalo = intervalo if intervalo is not None else config.watch_intervalo
+        self.intervalo_max = max(self.intervalo, intervalo_max if intervalo_max is not None
+                                 else config.watch_intervalo_max)
+        self.lote = lote or config.watch_lote
+        self.marca = marca
+        self.snapshot = snapshot
+        self.executor = QueryExecutor()
+        self.generator = JsonGenerator()
+
+    def poll(self):
+        """
+        Consulta as tarefas concluídas com versão maior que a marca
+
+        O índice por TrfVersao (migração 0005) faz o custo depender apenas da
+        quantidade de tarefas alteradas desde a consulta anterior.
+
+        Returns:
+            list: Até 'lote' registros, em ordem de Versao
+        """
+        with metrics.stage('watch.consultar'):
+            return self.executor.execute_sql_file(self.database, 'consulta_tarefas_novas.sql', {
+                'cicloCod': list(self.versoes),
+                'ultimaVersao': self.marca,
+                'tamanhoLote': self.lote,
+            })
+
+    def check(self):
+        """
+        Verifica se a consulta pode ser executada (coluna TrfVersao presente)
+
+        Raises:
+            Exception: Se a consulta falhar (ex: migração opcional 0004 não aplicada)
+        """
+        try:
+            self.executor.execute_sql_file(self.database, 'consulta_tarefas_novas.sql', {
+                'cicloCod': list(self.versoes),
+                'ultimaVersao': self.marca,
+                'tamanhoLote': 0,
+            })
+        except Exception as e:
+            raise Exception(f"O modo watch requer a coluna TrfVersao em TSK_Tarefa "
+                            f"(migração opcional 0004: migrate --opcionais): {e}")
+
+    def events(self, registros, marca):
+        """
+        Agrupa um lote de registros em eventos, um por ciclo
+
+        Args:
+            registros (list): Registros de consulta_tarefas_novas.sql
+            marca (int): Maior Versao do lote (para retomar com --since)
+
+        Yields:
+            dict: {'evento', 'ciclo', 'versao', 'marca', 'novidades'}
+        """
+        if self.snapshot is not None:
+            # Só as linhas registradas desde a consulta anterior (marca d'água DataExportacao)
+            self.snapshot.refresh()
+            documentadas = self.snapshot.documented_subset(
+                registro['NumeroTarefa'] for registro in registros
+            )
+            if documentadas:
+                registros = [registro for registro in registros
+                             if str(registro['NumeroTarefa']) not in documentadas]
+                metrics.count('watch.ja_documentadas', len(documentadas))
+
+        por_ciclo = {}
+        for registro in self.normalizer.normalize_all(registros):
+            por_ciclo.setdefault(int(registro['CicloId']), []).append(registro)
+
+        for ciclo, itens in por_ciclo.items():
+            yield {
+                'evento': 'novidades',
+                'ciclo': str(ciclo),
+                'versao': self.versoes[ciclo],
+                'marca': marca,
+                'novidades': list(self.generator.iter_novidades(itens)),
+            }
+
+    def run(self, emitir, max_consultas=None):
+        """
+        Consulta até ser interrompido (Ctrl+C) ou atingir max_consultas
+
+        O intervalo dobra a cada consulta sem novidades, até intervalo_max, e
+        volta ao mínimo quando chegam novidades; um lote cheio é seguido de
+        nova consulta imediata. Falhas na consulta ou na emissão (ex: registro
+        das tarefas) aumentam a espera exponencialmente e reabrem a conexão
+        antes da próxima tentativa; como a marca não avança, o lote inteiro é
+        consultado e emitido de novo (eventos já gravados podem se repetir).
+
+        Args:
+            emitir (callable): Recebe cada evento; a marca só avança depois
+                               que todos os eventos do lote foram emitidos sem erro
+            max_consultas (int, optional): Encerra após esta quantidade de consultas
+
+        Returns:
+            int: Quantidade de eventos emitidos
+        """
+        intervalo = self.intervalo
+        falhas = 0
+        consultas = 0
+        eventos = 0
+
+        while max_consultas is None or consultas < max_consultas:
+            consultas += 1
+            try:
+                registros = self.poll()
+                metrics.count('watch.consultas')
+                if registros:
+                    marca = int(registros[-1]['Versao'])
+                    for evento in self.events(registros, marca):
+                        emitir(evento)
+                        eventos += 1
+                        print(f"{len(evento['novidades'])} nova(s) tarefa(s) no ciclo {evento['ciclo']} "
+                              f"(marca {marca})", file=sys.stderr)
+            except BrokenPipeError:
+                # O leitor da saída foi encerrado: não há para quem emitir
+                raise
+            except Exception as e:
+                falhas += 1
+                espera = min(self.intervalo_max, self.intervalo * 2 ** falhas)
+                print(f"AVISO: Falha na consulta ou no registro ({e}); nova tentativa em {espera:.0f}s "
+                      f"a partir da marca {self.marca}", file=sys.stderr)
+                metrics.count('watch.falhas')
+                self._wait(espera, consultas, max_consultas)
+                self._reconnect()
+                continue
+
+            falhas = 0
+            if registros:
+                self.marca = marca
+                metrics.count('watch.tarefas', len(registros))
+                intervalo = self.intervalo
+                if len(registros) >= self.lote:
+                    # Ainda há alterações pendentes: consulta de novo sem esperar
+                    continue
+            else:
+                intervalo = min(intervalo * 2, self.intervalo_max)
+
+            self._wait(intervalo, consultas, max_consultas)
+
+        return eventos
+
+    @staticmethod
+    def _wait(segundos, consultas, max_consultas):
+        """Aguarda até a próxima consulta (não aguarda depois da última)"""
+        if max_consultas is None or consultas < max_consultas:
+            time.sleep(segundos)
+
+    def _reconnect(self):
+        """Reabre a conexão após uma falha (erros ficam para a próxima consulta)"""
+        try:
+            self.database.disconnect()
+        except Exception:
+            pass
+        try:
+            self.database.connect()
+        except Exception as e:
+            print(f"AVISO: Falha ao reconectar: {e}", file=sys.stderr)